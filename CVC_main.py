@@ -1,21 +1,26 @@
-import cv2
-import mediapipe as mp
-import pyautogui
-pyautogui.FAILSAFE = False # Disable the failsafe feature
+import time
+_MODULE_LOAD_START = time.perf_counter() # Origin of the startup profile (--startup-profile)
 import sys
 import json
 import os
-import time
+import threading
 import numpy as np
-from collections import deque
+from collections import deque, namedtuple
 import platform
+import argparse
+import fnmatch
+import re
+import ctypes
+import ctypes.util
+from contextlib import contextmanager
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QComboBox, QSlider, QCheckBox, QFrame, QGridLayout, QSizePolicy, QErrorMessage,
-    QInputDialog, QMessageBox, QSpacerItem, QStackedWidget, QScrollArea
+    QInputDialog, QMessageBox, QSpacerItem, QStackedWidget, QScrollArea, QFileDialog
 )
 from PyQt6.QtGui import QImage, QPixmap, QIcon, QPainter, QPen, QColor, QScreen, QFont
-from PyQt6.QtCore import Qt, QTimer, QSize, QPoint, QRect
+from PyQt6.QtCore import Qt, QTimer, QSize, QRect, QObject, QEvent, pyqtSignal, QCoreApplication
+_BASE_IMPORTS_END = time.perf_counter()
 
 # --- Platform Specific Imports (for Button Sticking) ---
 IS_WINDOWS = platform.system() == "Windows"
@@ -31,6 +36,80 @@ else:
     print("Button sticking feature is only available on Windows.")
 # --- End Platform Specific Imports ---
 
+
+# --- Startup Profiling ---
+class StartupProfiler:
+    """Collects named startup stages as (name, thread, start, end) in seconds since module load, from any thread."""
+    def __init__(self, origin):
+        self.origin = origin
+        self.stages = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end):
+        with self._lock: self.stages.append((name, threading.current_thread().name, start - self.origin, end - self.origin))
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block as stage `name`."""
+        start = time.perf_counter()
+        try: yield
+        finally: self.add(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """Records a milestone (zero-length stage) and returns its time."""
+        now = time.perf_counter(); self.add(name, now, now)
+        return now - self.origin
+
+STARTUP_PROFILER = StartupProfiler(_MODULE_LOAD_START)
+STARTUP_PROFILER.add("import numpy/PyQt6", _MODULE_LOAD_START, _BASE_IMPORTS_END)
+# --- End Startup Profiling ---
+
+
+# --- Deferred Heavy Imports ---
+# cv2, mediapipe and pyautogui dominate import time (mediapipe alone takes about a second), so they are
+# imported by the first code that needs them: the startup workers, the CLI modes and the classes using them.
+cv2 = None; mp = None; pyautogui = None
+MP_FACE_MESH = None; FACE_OVAL_LANDMARKS = None # Set by import_mediapipe()
+_pyautogui_error = None # Why pyautogui could not be imported, once tried
+_deferred_import_locks = {"cv2": threading.Lock(), "mediapipe": threading.Lock(), "pyautogui": threading.Lock()} # One each: imports run in parallel
+
+def import_cv2():
+    """Imports OpenCV on first call (from any thread) and returns it."""
+    global cv2
+    with _deferred_import_locks["cv2"]:
+        if cv2 is None:
+            with STARTUP_PROFILER.stage("import cv2"): import cv2 as cv2_module
+            cv2 = cv2_module
+    return cv2
+
+def import_mediapipe():
+    """Imports MediaPipe (after OpenCV, which it loads anyway) on first call and returns it."""
+    global mp, MP_FACE_MESH, FACE_OVAL_LANDMARKS
+    import_cv2()
+    with _deferred_import_locks["mediapipe"]:
+        if mp is None:
+            with STARTUP_PROFILER.stage("import mediapipe"): import mediapipe as mp_module
+            MP_FACE_MESH = mp_module.solutions.face_mesh
+            FACE_OVAL_LANDMARKS = sorted({idx for edge in MP_FACE_MESH.FACEMESH_FACE_OVAL for idx in edge}) # Outline used for the ROI box
+            mp = mp_module
+    return mp
+
+def import_pyautogui():
+    """Imports pyautogui on first call and returns it, or None if it is unavailable (e.g. no display)."""
+    global pyautogui, _pyautogui_error
+    with _deferred_import_locks["pyautogui"]:
+        if pyautogui is None and _pyautogui_error is None:
+            with STARTUP_PROFILER.stage("import pyautogui"):
+                try:
+                    import pyautogui as pyautogui_module
+                    pyautogui_module.FAILSAFE = False # Disable the failsafe feature
+                    pyautogui = pyautogui_module
+                except Exception as e_pyautogui: # No display to attach to (e.g. headless benchmark runs)
+                    _pyautogui_error = e_pyautogui
+                    print(f"Warning: pyautogui unavailable ({e_pyautogui}). Real cursor control disabled.")
+    return pyautogui
+# --- End Deferred Heavy Imports ---
+
 # Configuration file for saving user settings and profiles
 CONFIG_FILE = "cursorviacam_profiles.json"
 
@@ -64,6 +143,143 @@ DOUBLE_BLINK_INTERVAL = 0.45 # Max time IN SECONDS between the end of first blin
 # --- Edge Mapping Margin ---
 EDGE_MAP_MARGIN_PX = 10 # Adjust this value as needed (e.g., 5, 10, 15, 20)
 
+# --- Capture Thread Constants ---
+CAPTURE_RING_BUFFER_SIZE = 3 # Number of most recent frames kept by the capture thread
+CAPTURE_MAX_READ_FAILURES = 30 # Consecutive failed reads before the feed is reported as broken
+CAPTURE_RETRY_DELAY = 0.01 # Seconds to wait after a failed read before retrying
+CAPTURE_DEVICE_TS_MAX_LAG = 0.5 # Driver buffer timestamps (CAP_PROP_POS_MSEC) further behind than this are treated as unusable
+
+# --- Frame Scheduler Constants ---
+# The frame loop is woken by frame arrival: every frame while a face is tracked, fewer otherwise
+FRAME_RATE_IDLE_HZ = 10 # Tracking stopped (and no tutorial): preview only
+FRAME_RATE_NO_FACE_HZ = 5 # Tracking/tutorial, but no face for FRAME_NO_FACE_GRACE seconds
+FRAME_NO_FACE_GRACE = 1.0 # Seconds without a face before dropping to FRAME_RATE_NO_FACE_HZ
+FRAME_WATCHDOG_INTERVAL_MS = 500 # Runs the frame loop when no frame has arrived for this long (detects dead feeds)
+
+# --- Capture Mode Negotiation Constants ---
+# Tried in order; low resolutions first since tracking only needs ~640x480 and rect_padding is in frame pixels
+PREFERRED_CAPTURE_MODES = [
+    {"width": 640, "height": 480, "fps": 60, "fourcc": "MJPG"},
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG"},
+    {"width": 1280, "height": 720, "fps": 60, "fourcc": "MJPG"},
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "YUYV"},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG"},
+]
+# Tried before PREFERRED_CAPTURE_MODES when a profile enables high-res capture (sharper preview; inference keeps its own resolution)
+HIGH_RES_CAPTURE_MODES = [
+    {"width": 1280, "height": 720, "fps": 60, "fourcc": "MJPG"},
+    {"width": 1920, "height": 1080, "fps": 30, "fourcc": "MJPG"},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG"},
+]
+CAPTURE_PROBE_SECONDS = 0.5 # How long each candidate mode is read to measure its real frame rate
+CAPTURE_PROBE_WARMUP_FRAMES = 3 # Frames discarded after a mode change before measuring
+CAPTURE_FPS_ACCEPT_RATIO = 0.9 # A mode delivering at least this fraction of its nominal fps is accepted immediately
+
+# --- Camera Discovery Constants ---
+CAMERA_DISCOVERY_MAX_INDEX = 5 # Device indices 0..N-1 are probed
+CAMERA_PROBE_TIMEOUT = 3.0 # Seconds a device gets to open and deliver a frame before it is skipped
+
+# --- Inference Worker Constants ---
+INFERENCE_WORKER_COUNT = 1 # FaceMesh instances (frames in flight); >1 pipelines inference across threads
+INFERENCE_MAX_RESULT_AGE = 0.25 # Results are dropped as stale when their frame is older than this (seconds)...
+INFERENCE_STALE_AGE_FACTOR = 3.0 # ...and than this many times the typical capture-to-result age, so slow machines still track
+INFERENCE_AGE_EMA_WEIGHT = 0.1 # Weight of each result in that typical age
+INFERENCE_BACKENDS = {"face_mesh": "FaceMesh", "face_landmarker": "FaceLandmarker (async)"}
+FACE_LANDMARKER_MODEL_PATH = "face_landmarker.task" # MediaPipe Tasks model bundle used by the "face_landmarker" backend
+FACE_LANDMARKER_MAX_IN_FLIGHT = 8 # Submitted frames remembered while their results are pending (older ones count as dropped)
+# Width (px) frames are downscaled to before inference, keeping their aspect ratio; 0 = capture resolution.
+# Landmarks come back normalized, so gaze mapping still works in capture pixels.
+INFERENCE_RESOLUTIONS = {0: "Capture", 960: "960 px", 640: "640 px", 480: "480 px", 320: "320 px"}
+
+# --- Load Shedding Constants ---
+# Quality levels stepped through when per-frame work exceeds its budget; each level keeps the reductions before it
+LOAD_LEVELS = ("Full", "Reduced Preview", "Low-Res Inference", "No Iris Refinement", "Frame Skipping")
+LOAD_SHED_BUDGET_FRACTION = 0.8 # Per-frame work budget (the slower of inference and frame handling) as a fraction of the camera frame interval
+LOAD_SHED_DEFAULT_FPS = 30.0 # Camera frame rate assumed when the capture mode doesn't report one
+LOAD_SHED_TARGET_FPS = 30.0 # Processed frame rate the budget plans for; faster cameras' surplus frames are skipped by the inference queue instead
+LOAD_SHED_EMA_WEIGHT = 0.1 # Weight of each frame's work time in the running average
+LOAD_SHED_DOWN_HOLD = 1.0 # Seconds over budget before stepping down a level
+LOAD_SHED_UP_HOLD = 5.0 # Seconds with headroom before stepping back up; doubles after each quick relapse
+LOAD_SHED_MAX_UP_HOLD = 60.0
+LOAD_SHED_HEADROOM_FRACTION = 0.6 # Average work below this fraction of the budget counts as headroom
+LOAD_SHED_INPUT_SCALE = 0.5 # Inference input scale from the "Low-Res Inference" level on
+LOAD_SHED_SKIP_DIVISOR = 2 # "Frame Skipping" divides the processed frame rate by this
+
+# --- Face Region-of-Interest Constants ---
+ENABLE_FACE_ROI_CROP = True # Run FaceMesh on a crop around the previous face instead of the full frame
+ROI_PADDING_FACTOR = 0.35 # Margin added on each side of the previous face box, as a fraction of its larger side
+ROI_MIN_SIZE_PX = 64 # Face boxes smaller than this (e.g. bad detections) fall back to the full frame
+ROI_MAX_FRAME_FRACTION = 0.7 # Crops covering more than this fraction of the frame area use the full frame instead
+ROI_RESUME_FRAME_FRACTION = 0.55 # While tracking on the full frame, cropping resumes once the crop would cover less than this
+
+# --- Cursor Output Backend Constants ---
+CURSOR_BACKEND = "auto" # "auto" (fastest available: win32 on Windows, xtest on Linux/X11, then pyautogui), "win32", "xtest" or "pyautogui"
+CURSOR_BENCHMARK_CALLS = 2000 # Calls per operation in --cursor-benchmark
+
+# --- Cursor Output Rate Constants ---
+# The cursor glides to each per-frame target in steps at this rate instead of jumping once per camera frame (0 = jump)
+CURSOR_OUTPUT_RATES = {0: "Per Frame", 60: "60 Hz", 120: "120 Hz", 240: "240 Hz"}
+CURSOR_GLIDE_MAX_INTERVAL = 0.2 # Frame gaps longer than this (seconds) are not used for the glide duration estimate
+CURSOR_GLIDE_DEFAULT_INTERVAL = 1.0 / 30 # Glide duration until the frame interval is known
+
+# --- Smoothing Filter Constants ---
+SMOOTHING_FILTERS = {"moving_average": "Moving Average", "one_euro": "One Euro", "kalman": "Kalman"}
+ONE_EURO_MIN_CUTOFF = 1.0 # Hz; cutoff while the gaze is still (lower = steadier)
+ONE_EURO_BETA = 0.005 # Cutoff increase per px/s of gaze speed (higher = less lag when moving)
+ONE_EURO_D_CUTOFF = 1.0 # Hz; cutoff of the speed estimate
+KALMAN_ACCEL_NOISE = 3000.0 # px/s^2; how quickly the gaze velocity may change (higher = more responsive)
+KALMAN_MEASUREMENT_NOISE = 20.0 # px; standard deviation of the mapped gaze jitter (higher = steadier)
+MOVING_AVERAGE_RESUM_INTERVAL = 4096 # Samples between exact re-sums of the running sum (bounds float drift)
+FILTER_COMPARE_MAX_LAG_FRAMES = 30 # Largest delay (in frames) searched when measuring a filter's lag in --compare-filters
+
+# --- Motion Prediction Constants ---
+PREDICTION_DEFAULT_LATENCY = 0.06 # Seconds from capture to cursor move assumed until the live pipeline has measured it
+PREDICTION_MAX_HORIZON = 0.15 # Longest extrapolation (seconds); latency + filter lag beyond this is not compensated
+PREDICTION_MAX_SHIFT_PX = 250 # Largest distance the predicted target may lead the smoothed one
+PREDICTION_MIN_SPEED = 200.0 # px/s; slower estimated gaze motion is treated as a fixation and not extrapolated
+PREDICTION_VELOCITY_SMOOTHING = 0.3 # EMA weight of the newest finite-difference velocity (lower = steadier, slower)
+PREDICTION_ACCEL_SMOOTHING = 0.1 # EMA weight of the newest acceleration estimate
+PREDICTION_LATENCY_SMOOTHING = 0.1 # EMA weight of each measured capture-to-cursor latency
+
+# --- Button Sticking Target Constants ---
+STICK_TARGET_REFRESH_INTERVAL = 1.0 # Seconds the background worker waits between clickable-window enumerations
+STICK_TARGET_STAGES = ("enumeration", "snapshot_age") # Sticking target metrics (ms): time per enumeration, age of the snapshot each check used
+STICK_TARGET_GRID_CELL_PX = 128 # Cell size of the clickable-target grid (about the sticking search radius)
+STICK_TARGET_MIN_SIZE_PX = 5 # Smaller windows are not sticking targets
+STICK_TARGET_MAX_SCREEN_FRACTION = 0.80 # Wider/taller windows are backgrounds or main windows, not targets
+STICK_TARGET_BENCHMARK_COUNT = 2000 # Synthetic targets used by --target-benchmark
+STICK_TARGET_BENCHMARK_QUERIES = 5000
+STICK_TARGET_BENCHMARK_DELAY = 0.2 # Simulated enumeration time (seconds) for the inline vs. background comparison
+
+# --- Cursor State Model Constants ---
+CURSOR_RECONCILE_INTERVAL = 0.25 # Seconds between OS cursor position queries; moves we issue update the model in between
+CURSOR_MODEL_MAX_DRIFT_PX = 3 # OS vs model difference treated as an outside move (user's mouse, clamping); re-queried every call until it settles
+
+# --- Camera Preview Constants ---
+# Full: every frame, smooth scaling. Reduced: at most PREVIEW_REDUCED_RATE_HZ. Fast: every frame, nearest-neighbour
+# downscale before color conversion. Off: nothing drawn. The preview is also skipped while the window is minimized/hidden.
+PREVIEW_MODES = {"Full": "Full Rate", "Reduced": "Reduced Rate", "Fast": "Fast Scaling", "Off": "Off"}
+PREVIEW_REDUCED_RATE_HZ = 10
+
+# --- Latency Statistics Constants ---
+LATENCY_STATS_WINDOW = 600 # Most recent samples kept per stage (~10-20 s of tracking)
+LATENCY_PANEL_REFRESH_MS = 500 # How often the open "Stages" panel recomputes its percentiles
+# Live pipeline stages in order: capture read (incl. waiting for the device), flip, wait for a free inference
+# thread, FaceMesh, signal delivery to the GUI thread, GazeClickProcessor stages, status/click dispatch,
+# overlay drawing, preview display, and the whole GUI-thread handling of a result
+# "flip" covers the mirror flip plus the single BGR->RGB conversion of the shared frame buffer
+LIVE_LATENCY_STAGES = ("read", "flip", "queue", "inference", "deliver", "mapping", "smoothing", "clicks", "ui", "overlay", "display", "total")
+# End-to-end path of a cursor move: driver buffer -> cam.read() returned (only with driver timestamps),
+# -> picked up by the frame loop, -> result back on the GUI thread, -> moveTo returned (or, with a cursor output rate, the glide reached the target); capture_to_cursor is
+# frame time -> moveTo, and effective adds smoothing_lag (the averaged target is older than the newest frame)
+END_TO_END_STAGES = ("driver", "buffer", "inference_path", "to_cursor", "capture_to_cursor", "smoothing_lag", "effective")
+LATENCY_HISTOGRAM_EDGES_MS = [0.0, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266, 1000] # Histogram bins in exported reports
+
+# --- Landmark Recording Constants ---
+LANDMARK_RECORD_DIR = "recordings" # Where "Record Landmarks" writes its files
+LANDMARK_RECORD_FULL_MESH = False # Store all 478 mesh points per frame instead of only the EYE_LANDMARK_INDICES points (14) the app uses
+LANDMARK_RECORD_HEADER_BYTES = 256 # Fixed .npy header size so the record count can be rewritten in place
+
 # --- Tutorial Constants (Highlight Info ADDED, Renumbered) ---
 TUTORIAL_STATE_IDLE = 0
 TUTORIAL_STATE_SHOWING_INTRO = 1
@@ -87,8 +303,9 @@ COLOR_START = "#FFD700"; COLOR_INFO_BLUE = "#4682B4"; COLOR_TUTORIAL = "#DA70D6"
 # --- Cursor Highlighter Overlay Window ---
 class CursorHighlighterWindow(QWidget):
     """A transparent overlay window to draw a ring around the cursor."""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, cursor_position=None):
         super().__init__(parent)
+        self.cursor_position = cursor_position or (lambda: pyautogui.position()) # e.g. CursorStateModel.position
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |       # No border or title bar
             Qt.WindowType.WindowStaysOnTopHint |      # Always on top
@@ -138,7 +355,7 @@ class CursorHighlighterWindow(QWidget):
             # print("Highlighter: Showing") # Debug
             # Try to move to current cursor pos before showing to avoid initial jump
             try:
-                cx, cy = pyautogui.position()
+                cx, cy = self.cursor_position()
                 self.update_position(cx, cy)
             except Exception: pass # Ignore if fails
             self.show()
@@ -148,11 +365,857 @@ class CursorHighlighterWindow(QWidget):
 # --- End Cursor Highlighter Overlay Window ---
 
 
+# --- Threaded Camera Capture ---
+# timestamp: the driver's buffer time when it is on our clock (V4L2), else when cam.read() returned.
+# driver_ms: delay from the buffer time to cam.read() returning (None without a usable driver timestamp).
+CapturedFrame = namedtuple("CapturedFrame", ["seq", "timestamp", "frame", "read_ms", "driver_ms"])
+
+class CameraCaptureThread(threading.Thread):
+    """Continuously reads frames from a cv2.VideoCapture into a small ring buffer.
+
+    The GUI thread never blocks on cam.read(); it just takes the newest frame.
+    Frames that were overwritten before being consumed are counted as dropped.
+    """
+    def __init__(self, cam, buffer_size=CAPTURE_RING_BUFFER_SIZE, on_frame=None):
+        super().__init__(name="CameraCapture", daemon=True)
+        self.cam = cam
+        self.on_frame = on_frame # Called on this thread after each stored frame (e.g. FrameArrivalScheduler.notify)
+        self._ring = deque(maxlen=max(1, int(buffer_size)))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._next_seq = 1 # Sequence number assigned to the next captured frame
+        self._last_consumed_seq = 0
+        self.dropped_frames = 0 # Frames captured but never handed to the consumer
+        self.consecutive_read_failures = 0
+
+    def run(self):
+        """Capture loop: read, timestamp and store frames until stopped."""
+        while not self._stop_event.is_set():
+            read_start = time.perf_counter()
+            try:
+                ret, frame = self.cam.read()
+            except Exception as e_read:
+                print(f"Capture thread: Error reading frame: {e_read}")
+                ret, frame = False, None
+            capture_time = time.perf_counter()
+
+            if not ret or frame is None:
+                self.consecutive_read_failures += 1
+                self._stop_event.wait(CAPTURE_RETRY_DELAY) # Avoid spinning on a dead device
+                continue
+
+            self.consecutive_read_failures = 0
+            timestamp, driver_ms = self._frame_timestamp(capture_time)
+            with self._lock:
+                self._ring.append(CapturedFrame(self._next_seq, timestamp, frame, (capture_time - read_start) * 1000, driver_ms))
+                self._next_seq += 1
+            if self.on_frame is not None: self.on_frame()
+
+    def _frame_timestamp(self, capture_time):
+        """Returns (timestamp, driver_ms), preferring the driver's buffer timestamp when it is usable.
+
+        V4L2 reports CLOCK_MONOTONIC buffer times through CAP_PROP_POS_MSEC; other backends use
+        stream-relative times (or 0), which fail the lag check and fall back to capture_time.
+        """
+        try: pos_ms = self.cam.get(cv2.CAP_PROP_POS_MSEC)
+        except Exception: pos_ms = 0
+        if pos_ms > 0:
+            device_time = pos_ms / 1000.0 + (time.perf_counter() - time.monotonic()) # Monotonic -> perf_counter clock
+            lag = capture_time - device_time
+            if 0 <= lag <= CAPTURE_DEVICE_TS_MAX_LAG: return device_time, lag * 1000
+        return capture_time, None
+
+    def get_latest_frame(self, count_dropped=True):
+        """Returns the newest CapturedFrame not yet consumed, or None if nothing new arrived.
+
+        count_dropped=False when frames are skipped on purpose (reduced frame rate).
+        """
+        with self._lock:
+            if not self._ring: return None
+            newest = self._ring[-1]
+            if newest.seq <= self._last_consumed_seq: return None
+            # Every frame between the last consumed one and the newest was skipped
+            if count_dropped: self.dropped_frames += newest.seq - self._last_consumed_seq - 1
+            self._last_consumed_seq = newest.seq
+            return newest
+
+    @property
+    def feed_broken(self):
+        """True if the device has failed to deliver frames for a sustained period."""
+        return self.consecutive_read_failures >= CAPTURE_MAX_READ_FAILURES
+
+    def stop(self, timeout=1.0):
+        """Signals the capture loop to exit and waits for it (cam.read() may block up to a frame)."""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+            if self.is_alive(): print("Warning: Capture thread did not stop within timeout.")
+
+class FrameArrivalScheduler(QObject):
+    """Wakes the GUI frame loop when the capture thread stores a frame, at a rate chosen by the app.
+
+    notify() runs on the capture thread. At most one wake-up is queued at a time; with a rate
+    limit, frames arriving sooner than 1/rate after the last wake-up are left in the ring buffer
+    and the next wake-up takes the newest frame.
+    """
+    frame_ready = pyqtSignal() # Queued to the receiver's (GUI) thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._queued = False
+        self._min_interval = 0.0 # Seconds between wake-ups; 0 = every frame
+        self.last_wake_time = 0.0
+
+    @property
+    def full_rate(self): return self._min_interval == 0.0
+
+    def set_rate(self, rate_hz):
+        """Limits wake-ups to rate_hz; None wakes on every frame."""
+        self._min_interval = 1.0 / rate_hz if rate_hz else 0.0
+
+    def notify(self):
+        now = time.perf_counter()
+        with self._lock:
+            if self._queued or now - self.last_wake_time < self._min_interval: return
+            self._queued = True; self.last_wake_time = now
+        self.frame_ready.emit()
+
+    def acknowledge(self):
+        """Called by the frame loop when it runs, so the next frame can queue a new wake-up."""
+        with self._lock: self._queued = False
+# --- End Threaded Camera Capture ---
+
+
+# --- Capture Mode Negotiation ---
+def _fourcc_to_str(fourcc_value):
+    """Decodes a CAP_PROP_FOURCC value into its 4-character code."""
+    code = int(fourcc_value)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+def validate_capture_mode(mode):
+    """Returns a clean capture mode dict, or None if the value is missing or malformed."""
+    if not isinstance(mode, dict): return None
+    try:
+        clean_mode = {"width": int(mode["width"]), "height": int(mode["height"]), "fps": int(mode["fps"]), "fourcc": str(mode["fourcc"])}
+    except (KeyError, ValueError, TypeError): return None
+    if clean_mode["width"] <= 0 or clean_mode["height"] <= 0 or clean_mode["fps"] <= 0 or len(clean_mode["fourcc"]) != 4: return None
+    return clean_mode
+
+def apply_capture_mode(cap, mode):
+    """Requests a mode from the driver. Returns True if the resolution was accepted and frames still arrive."""
+    try:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode["fourcc"])) # FOURCC first: some drivers limit sizes per format
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode["width"]); cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode["height"])
+        cap.set(cv2.CAP_PROP_FPS, mode["fps"])
+        actual_w, actual_h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if (actual_w, actual_h) != (mode["width"], mode["height"]): return False
+        ret, frame = cap.read()
+        return bool(ret) and frame is not None and frame.shape[1] == mode["width"] and frame.shape[0] == mode["height"]
+    except Exception as e_mode:
+        print(f"    Capture mode {mode}: Error applying: {e_mode}")
+        return False
+
+def measure_capture_fps(cap, duration=CAPTURE_PROBE_SECONDS):
+    """Reads frames for about `duration` seconds and returns the delivered frame rate."""
+    for _ in range(CAPTURE_PROBE_WARMUP_FRAMES): cap.read()
+    frames = 0; start = time.perf_counter(); elapsed = 0.0
+    while elapsed < duration:
+        ret, frame = cap.read()
+        elapsed = time.perf_counter() - start
+        if not ret or frame is None: break
+        frames += 1
+    return frames / elapsed if elapsed > 0 else 0.0
+
+def negotiate_capture_mode(cap, stored_mode=None, high_res=False):
+    """Selects a capture mode for an opened device and returns it (None if the driver accepts none).
+
+    A valid stored mode is re-applied without probing. Otherwise PREFERRED_CAPTURE_MODES (preceded
+    by HIGH_RES_CAPTURE_MODES if high_res) are tried in order and the first one that delivers close
+    to its nominal fps wins; failing that, the mode with the highest measured fps is used.
+    """
+    stored_mode = validate_capture_mode(stored_mode)
+    if stored_mode is not None:
+        if apply_capture_mode(cap, stored_mode):
+            print(f"    Using stored capture mode {stored_mode['width']}x{stored_mode['height']}@{stored_mode['fps']} {stored_mode['fourcc']}")
+            return stored_mode
+        print(f"    Stored capture mode {stored_mode} rejected by device. Renegotiating...")
+
+    best_mode = None; best_fps = 0.0
+    for mode in (HIGH_RES_CAPTURE_MODES if high_res else []) + PREFERRED_CAPTURE_MODES:
+        if not apply_capture_mode(cap, mode): continue
+        measured_fps = measure_capture_fps(cap)
+        actual_fourcc = _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC))
+        print(f"    Probed {mode['width']}x{mode['height']}@{mode['fps']} {mode['fourcc']} (driver: {actual_fourcc}): {measured_fps:.1f} fps")
+        if measured_fps >= mode["fps"] * CAPTURE_FPS_ACCEPT_RATIO: return dict(mode)
+        if measured_fps > best_fps: best_mode, best_fps = mode, measured_fps
+
+    if best_mode is not None and apply_capture_mode(cap, best_mode): return dict(best_mode)
+    print("    Warning: No preferred capture mode accepted; using driver defaults.")
+    return None
+
+def open_camera(index, preferred_backend="Default", capture_mode=None, high_res=False):
+    """Opens camera `index` and negotiates its capture mode (see negotiate_capture_mode).
+
+    Returns (cap, mode), or (None, None) if no backend could open the device and read a frame.
+    Touches no Qt objects, so it can run on a startup worker thread.
+    """
+    import_cv2()
+    print(f"Attempting camera index {index} (Preferred Backend: {preferred_backend})...")
+    cam = None; success = False
+    # Define potential backend APIs to try
+    backends_to_try = []
+    if IS_WINDOWS: backends_to_try.append((cv2.CAP_DSHOW, "DSHOW"))
+    backends_to_try.append((cv2.CAP_ANY, "CAP_ANY")) # Always try default
+    # Try the backend that worked during discovery first ("OS Default" is CAP_ANY)
+    preferred_api_name = "CAP_ANY" if preferred_backend == "OS Default" else preferred_backend
+    backends_to_try.sort(key=lambda b: b[1] != preferred_api_name)
+
+    with STARTUP_PROFILER.stage("open camera"):
+        for api, backend_str in backends_to_try:
+            # Only retry CAP_ANY if it wasn't the preferred backend that failed
+            if preferred_backend != "Default" and api == cv2.CAP_ANY and any(b[1] == preferred_backend for b in backends_to_try):
+                 if cam is None: # Check if preferred backend failed
+                     print(f"  Skipping CAP_ANY retry as preferred backend {preferred_backend} already tried.")
+                     # Continue # Actually, let's allow trying CAP_ANY anyway as a fallback
+                 else: pass # Preferred succeeded or wasn't tried yet.
+
+            print(f"  Trying backend: {backend_str} ({api})")
+            try:
+                cam = cv2.VideoCapture(index, api)
+                if cam and cam.isOpened():
+                    ret_test, frame_test = cam.read()
+                    if not ret_test or frame_test is None:
+                        print(f"    Backend {backend_str}: Failed initial frame read.")
+                        cam.release(); cam = None; continue
+                    h, w, _ = frame_test.shape
+                    if w <= 0 or h <= 0:
+                        print(f"    Backend {backend_str}: Invalid resolution {w}x{h}.")
+                        cam.release(); cam = None; continue
+                    print(f"    Camera {index} OK ({w}x{h}). Using Backend: {backend_str}")
+                    success = True; break # Success!
+                else:
+                    print(f"    Backend {backend_str}: Failed to open.")
+                    if cam: cam.release(); cam = None;
+            except Exception as e_cam_try:
+                print(f"    Backend {backend_str}: Error during init/read: {e_cam_try}")
+                if cam: cam.release(); cam = None;
+
+    if not success:
+        print(f"Error: Failed to open camera {index} with all attempted backends.")
+        return None, None
+    mode = None
+    with STARTUP_PROFILER.stage("negotiate capture mode"):
+        try: mode = negotiate_capture_mode(cam, capture_mode, high_res=high_res)
+        except Exception as e_mode: print(f"    Capture mode negotiation failed: {e_mode}")
+    return cam, mode
+# --- End Capture Mode Negotiation ---
+
+
+# --- Camera Discovery ---
+def _discovery_backends():
+    """Returns (api, backend_name) pairs in the order a device is tried during discovery."""
+    if IS_WINDOWS: return [(cv2.CAP_DSHOW, "DSHOW"), (cv2.CAP_ANY, "CAP_ANY")] # Prefer DSHOW on Windows
+    return [(cv2.CAP_ANY, "OS Default")]
+
+def probe_camera(index):
+    """Opens camera `index` and reads one frame. Returns its info dict, or None if it is unusable."""
+    import_cv2()
+    for api, backend_name in _discovery_backends():
+        cap_test = None
+        try:
+            cap_test = cv2.VideoCapture(index, api)
+            if not (cap_test and cap_test.isOpened()): continue # Try the next backend
+            name = f"Camera {index} ({backend_name})"
+            ret, frame = cap_test.read()
+            if not ret or frame is None: print(f"  Skipping {name}: Failed to read frame"); return None
+            h, w = frame.shape[:2]
+            if w <= 0 or h <= 0: print(f"  Skipping {name}: Invalid resolution {w}x{h}"); return None
+            print(f"  Found: {name} ({w}x{h})")
+            return {'index': index, 'name': name, 'backend': backend_name}
+        except Exception as e: print(f"Error checking camera {index} ({backend_name}): {e}")
+        finally:
+            if cap_test is not None: cap_test.release() # Ensure camera is released
+    return None
+
+def discover_cameras(max_to_check=CAMERA_DISCOVERY_MAX_INDEX, timeout=CAMERA_PROBE_TIMEOUT, skip_indices=()):
+    """Probes camera indices concurrently and returns the working ones sorted by index.
+
+    Each index is probed on its own daemon thread. A device that has not answered within `timeout`
+    seconds is reported as unavailable; its thread finishes (and releases the device) on its own.
+    """
+    import_cv2() # Once, before the probe threads need it
+    found = {}; found_lock = threading.Lock()
+    def probe(index):
+        info = probe_camera(index)
+        if info:
+            with found_lock: found[index] = info
+
+    probes = []
+    for i in range(max_to_check):
+        if i in skip_indices: continue
+        probe_thread = threading.Thread(target=probe, args=(i,), name=f"CameraProbe-{i}", daemon=True)
+        probe_thread.start(); probes.append((i, probe_thread))
+    deadline = time.perf_counter() + timeout
+    for i, probe_thread in probes:
+        probe_thread.join(max(0.0, deadline - time.perf_counter()))
+        if probe_thread.is_alive(): print(f"  Skipping Camera {i}: No answer within {timeout:.1f}s")
+    with found_lock: return [found[i] for i in sorted(found)]
+
+def validate_camera_cache(cache):
+    """Returns a clean camera cache ({"cameras": [{index, name, backend}, ...]}), dropping malformed entries."""
+    cameras = []
+    if isinstance(cache, dict) and isinstance(cache.get("cameras"), list):
+        for entry in cache["cameras"]:
+            if not isinstance(entry, dict): continue
+            index, name, backend = entry.get("index"), entry.get("name"), entry.get("backend")
+            if isinstance(index, int) and not isinstance(index, bool) and index >= 0 and isinstance(name, str) and isinstance(backend, str):
+                cameras.append({'index': index, 'name': name, 'backend': backend})
+    return {"cameras": cameras}
+
+class CameraDiscoveryWorker(QObject):
+    """Runs discover_cameras on a background thread and emits the result on the GUI thread."""
+    finished = pyqtSignal(list) # List of camera info dicts
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, skip_indices=()):
+        """Starts a discovery pass unless one is already running. Returns True if started."""
+        if self.is_running(): return False
+        self._thread = threading.Thread(target=lambda: self.finished.emit(discover_cameras(skip_indices=skip_indices)),
+                                        name="CameraDiscovery", daemon=True)
+        self._thread.start()
+        return True
+# --- End Camera Discovery ---
+
+
+# --- Background Startup ---
+STARTUP_TASK_LABELS = {"inference": "face model", "cameras": "camera list", "camera": "camera", "cursor": "cursor"}
+
+class StartupWorker(QObject):
+    """Runs slow startup steps (MediaPipe, camera, cursor backend) on daemon threads so the window can show first.
+
+    task_finished is emitted with (name, result, exception or None) and is delivered on the GUI thread.
+    """
+    task_finished = pyqtSignal(str, object, object)
+
+    def start(self, name, task):
+        def run():
+            try: result, error = task(), None
+            except Exception as e: result, error = None, e
+            self.task_finished.emit(name, result, error)
+        threading.Thread(target=run, name=f"Startup-{name}", daemon=True).start()
+# --- End Background Startup ---
+
+
+# --- Cursor Output Sinks ---
+class PyAutoGuiCursorSink:
+    """Moves and clicks the real system cursor through pyautogui."""
+    def __init__(self): import_pyautogui()
+    def position(self): return pyautogui.position()
+    def size(self): return pyautogui.size()
+    def move_to(self, x, y): pyautogui.moveTo(x, y, duration=0, _pause=False)
+    def click(self): pyautogui.click(_pause=False)
+    def double_click(self): pyautogui.doubleClick(_pause=False)
+    def middle_click(self): pyautogui.middleClick(_pause=False)
+
+class Win32CursorSink:
+    """Moves and clicks through win32api directly (no pyautogui argument handling or fail-safe checks)."""
+    MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP, MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP = 0x02, 0x04, 0x20, 0x40
+    def __init__(self):
+        if not IS_WINDOWS: raise OSError("win32api not available")
+    def position(self): return win32api.GetCursorPos()
+    def size(self): return win32api.GetSystemMetrics(0), win32api.GetSystemMetrics(1)
+    def move_to(self, x, y): win32api.SetCursorPos((int(x), int(y)))
+    def _press(self, down, up): win32api.mouse_event(down, 0, 0, 0, 0); win32api.mouse_event(up, 0, 0, 0, 0)
+    def click(self): self._press(self.MOUSEEVENTF_LEFTDOWN, self.MOUSEEVENTF_LEFTUP)
+    def double_click(self): self.click(); self.click()
+    def middle_click(self): self._press(self.MOUSEEVENTF_MIDDLEDOWN, self.MOUSEEVENTF_MIDDLEUP)
+
+class XTestCursorSink:
+    """Moves and clicks through libX11/libXtst via ctypes (X11, including XWayland apps' view of the pointer).
+
+    Raises OSError if the libraries or the X display are unavailable. Calls are serialized with a
+    lock because Xlib connections are not thread-safe without XInitThreads.
+    """
+    BUTTON_LEFT, BUTTON_MIDDLE = 1, 2
+    def __init__(self, display_name=None):
+        x11_path, xtst_path = ctypes.util.find_library("X11"), ctypes.util.find_library("Xtst")
+        if not (x11_path and xtst_path): raise OSError("libX11/libXtst not found")
+        self._x11 = ctypes.CDLL(x11_path); self._xtst = ctypes.CDLL(xtst_path)
+        x11, xtst, c = self._x11, self._xtst, ctypes
+        x11.XOpenDisplay.argtypes = [c.c_char_p]; x11.XOpenDisplay.restype = c.c_void_p
+        x11.XDefaultScreen.argtypes = [c.c_void_p]; x11.XDefaultScreen.restype = c.c_int
+        x11.XDisplayWidth.argtypes = x11.XDisplayHeight.argtypes = [c.c_void_p, c.c_int]
+        x11.XDefaultRootWindow.argtypes = [c.c_void_p]; x11.XDefaultRootWindow.restype = c.c_ulong
+        x11.XQueryPointer.argtypes = [c.c_void_p, c.c_ulong, c.POINTER(c.c_ulong), c.POINTER(c.c_ulong),
+                                      c.POINTER(c.c_int), c.POINTER(c.c_int), c.POINTER(c.c_int), c.POINTER(c.c_int), c.POINTER(c.c_uint)]
+        x11.XFlush.argtypes = [c.c_void_p]
+        xtst.XTestFakeMotionEvent.argtypes = [c.c_void_p, c.c_int, c.c_int, c.c_int, c.c_ulong]
+        xtst.XTestFakeButtonEvent.argtypes = [c.c_void_p, c.c_uint, c.c_int, c.c_ulong]
+        self._display = x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display: raise OSError("Cannot open X display")
+        self._screen = x11.XDefaultScreen(self._display); self._root = x11.XDefaultRootWindow(self._display)
+        self._lock = threading.Lock()
+        self._pointer_out = [c.c_ulong(), c.c_ulong(), c.c_int(), c.c_int(), c.c_int(), c.c_int(), c.c_uint()] # Reused XQueryPointer outputs
+
+    def position(self):
+        root, child, root_x, root_y, win_x, win_y, mask = self._pointer_out
+        with self._lock:
+            self._x11.XQueryPointer(self._display, self._root, ctypes.byref(root), ctypes.byref(child), ctypes.byref(root_x),
+                                    ctypes.byref(root_y), ctypes.byref(win_x), ctypes.byref(win_y), ctypes.byref(mask))
+            return root_x.value, root_y.value
+    def size(self): return self._x11.XDisplayWidth(self._display, self._screen), self._x11.XDisplayHeight(self._display, self._screen)
+    def move_to(self, x, y):
+        with self._lock:
+            self._xtst.XTestFakeMotionEvent(self._display, -1, int(x), int(y), 0); self._x11.XFlush(self._display)
+    def _press(self, button, count=1):
+        with self._lock:
+            for _ in range(count):
+                self._xtst.XTestFakeButtonEvent(self._display, button, 1, 0); self._xtst.XTestFakeButtonEvent(self._display, button, 0, 0)
+            self._x11.XFlush(self._display)
+    def click(self): self._press(self.BUTTON_LEFT)
+    def double_click(self): self._press(self.BUTTON_LEFT, count=2)
+    def middle_click(self): self._press(self.BUTTON_MIDDLE)
+
+class FakeCursorSink:
+    """In-memory cursor for headless runs: keeps a position and counts moves and clicks."""
+    def __init__(self, width=1920, height=1080):
+        self.width, self.height = width, height
+        self.x, self.y = width // 2, height // 2
+        self.moves = 0; self.clicks = {"left": 0, "double": 0, "middle": 0}
+    def position(self): return self.x, self.y
+    def size(self): return self.width, self.height
+    def move_to(self, x, y): self.x, self.y = int(x), int(y); self.moves += 1
+    def click(self): self.clicks["left"] += 1
+    def double_click(self): self.clicks["double"] += 1
+    def middle_click(self): self.clicks["middle"] += 1
+
+class RecordingCursorSink(FakeCursorSink):
+    """FakeCursorSink that also logs every call as (perf_counter time, action, x, y), for tests and latency analysis."""
+    def __init__(self, width=1920, height=1080):
+        super().__init__(width, height); self.events = []
+    def move_to(self, x, y): super().move_to(x, y); self.events.append((time.perf_counter(), "move", self.x, self.y))
+    def click(self): super().click(); self.events.append((time.perf_counter(), "click", self.x, self.y))
+    def double_click(self): super().double_click(); self.events.append((time.perf_counter(), "double_click", self.x, self.y))
+    def middle_click(self): super().middle_click(); self.events.append((time.perf_counter(), "middle_click", self.x, self.y))
+
+CURSOR_SINKS = {"win32": Win32CursorSink, "xtest": XTestCursorSink, "pyautogui": PyAutoGuiCursorSink, "recording": RecordingCursorSink}
+
+def create_cursor_sink(backend=CURSOR_BACKEND):
+    """Returns a sink for backend ("auto" picks the fastest available). Falls back to pyautogui if it cannot be created."""
+    if backend == "auto": candidates = (["win32"] if IS_WINDOWS else ["xtest"] if sys.platform.startswith("linux") else [])
+    else: candidates = [backend] if backend in CURSOR_SINKS else []
+    if backend not in CURSOR_SINKS and backend != "auto": print(f"Warning: Unknown cursor backend '{backend}'. Using pyautogui.")
+    for name in candidates:
+        try:
+            sink = CURSOR_SINKS[name]()
+            print(f"Cursor output backend: {name}")
+            return sink
+        except Exception as e_sink:
+            if backend != "auto": print(f"Warning: Cursor backend '{name}' unavailable ({e_sink}). Using pyautogui.")
+    return PyAutoGuiCursorSink()
+
+class CursorStateModel:
+    """Wraps a cursor sink and answers position() from the last move we issued instead of the OS.
+
+    The model is reconciled with sink.position() (one display server round trip) at most every
+    reconcile_interval seconds. When the OS position disagrees by more than CURSOR_MODEL_MAX_DRIFT_PX
+    the OS wins, and the next call queries again until the two agree, so outside moves are
+    followed closely while they last.
+    """
+    def __init__(self, sink, reconcile_interval=CURSOR_RECONCILE_INTERVAL):
+        self.sink = sink
+        self.reconcile_interval = reconcile_interval
+        self._x = self._y = None # Unknown until the first reconcile
+        self._last_reconcile = 0.0
+        self.os_queries = 0; self.corrections = 0
+        self._lock = threading.RLock() # Sink calls come from the GUI thread and the CursorInterpolator
+
+    def position(self):
+        """Returns the modelled (x, y); may query the OS (and raise like sink.position())."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._x is None or now - self._last_reconcile >= self.reconcile_interval: return self.reconcile(now)
+            return self._x, self._y
+
+    def reconcile(self, now=None):
+        """Queries the OS position and adopts it."""
+        # Held throughout: a CursorInterpolator move landing between the query and the comparison would count as drift
+        with self._lock:
+            x, y = self.sink.position()
+            x, y = int(x), int(y)
+            self.os_queries += 1; self._last_reconcile = time.perf_counter() if now is None else now
+            if self._x is not None and max(abs(x - self._x), abs(y - self._y)) > CURSOR_MODEL_MAX_DRIFT_PX:
+                self.corrections += 1; self._last_reconcile = 0.0 # Re-check on the next call
+            self._x, self._y = x, y
+            return x, y
+
+    def invalidate(self):
+        """Forces the next position() to query the OS (e.g. when tracking starts after the mouse was used)."""
+        with self._lock: self._x = self._y = None
+
+    def set_sink(self, sink):
+        """Sends moves and clicks to another sink from now on (e.g. once the real backend is ready)."""
+        with self._lock: self.sink = sink; self.invalidate()
+
+    def size(self): return self.sink.size()
+    def move_to(self, x, y):
+        with self._lock: self.sink.move_to(x, y); self._x, self._y = int(x), int(y)
+    def click(self):
+        with self._lock: self.sink.click()
+    def double_click(self):
+        with self._lock: self.sink.double_click()
+    def middle_click(self):
+        with self._lock: self.sink.middle_click()
+# --- End Cursor Output Sinks ---
+
+
+# --- Cursor Interpolation Thread ---
+class CursorInterpolator(threading.Thread):
+    """Glides the cursor to each per-frame target in steps at rate_hz, spread over the expected frame interval.
+
+    SmoothCursor still decides once per frame where the cursor should go (gain, acceleration,
+    drift correction); this only replaces the single jump with a linear glide, so motion looks
+    the same at 30 fps camera input as at 60. Sleeps while there is nothing to move.
+    """
+    def __init__(self, cursor, rate_hz):
+        super().__init__(name="CursorInterpolator", daemon=True)
+        self.cursor = cursor # CursorStateModel (serializes sink calls with the GUI thread)
+        self.rate_hz = rate_hz
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._segment = None # (start_x, start_y, end_x, end_y, start_time, duration) of the current glide
+        self.steps = 0 # move_to calls issued
+
+    def set_target(self, start, end, duration):
+        """Starts a glide from start to end lasting duration seconds (replaces any glide in progress).
+
+        Returns the perf_counter() time the glide's final move_to is due, i.e. when the cursor reaches end.
+        """
+        start_time, duration = time.perf_counter(), max(duration, 1e-3)
+        with self._lock: self._segment = (float(start[0]), float(start[1]), float(end[0]), float(end[1]), start_time, duration)
+        self._wake.set()
+        return start_time + duration
+
+    def cancel(self):
+        """Stops the current glide where it is (e.g. before sticking moves the cursor directly)."""
+        with self._lock: self._segment = None
+
+    def run(self):
+        active_segment = None; last_sent = None
+        while not self._stop_event.is_set():
+            self._wake.clear()
+            with self._lock: segment = self._segment
+            if segment is None: self._wake.wait(); continue
+            if segment is not active_segment: active_segment = segment; last_sent = None
+            x0, y0, x1, y1, start_time, duration = segment
+            progress = min(1.0, (time.perf_counter() - start_time) / duration)
+            point = (int(round(x0 + (x1 - x0) * progress)), int(round(y0 + (y1 - y0) * progress)))
+            if point != last_sent:
+                try: self.cursor.move_to(*point); self.steps += 1
+                except Exception as e_move: print(f"Error during interpolated moveTo: {e_move}")
+                last_sent = point
+            if progress >= 1.0:
+                with self._lock:
+                    if self._segment is segment: self._segment = None # Reached the target: sleep until the next one
+                continue
+            self._wake.wait(1.0 / self.rate_hz)
+
+    def stop(self, timeout=0.5):
+        self._stop_event.set(); self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self: self.join(timeout)
+# --- End Cursor Interpolation Thread ---
+
+
+# --- Smoothing Filters ---
+# Each filter takes (point, timestamp in seconds) and returns the smoothed point as a (2,) array.
+# lag_ms is the filter's own estimate of how far its output trails the newest input (None if unknown).
+class MovingAverageFilter:
+    """Mean of the last `window` samples, kept as a running sum (O(1) per sample)."""
+    def __init__(self, window):
+        self.window = max(1, int(window)); self.reset()
+
+    def reset(self):
+        self._points = deque(maxlen=self.window); self._times = deque(maxlen=self.window)
+        self._sum = np.zeros(2); self._time_sum = 0.0; self._updates = 0; self.lag_ms = None
+
+    def update(self, point, timestamp):
+        if len(self._points) == self.window: self._sum -= self._points[0]; self._time_sum -= self._times[0]
+        point = np.asarray(point, dtype=np.float64)
+        self._points.append(point); self._times.append(timestamp)
+        self._sum += point; self._time_sum += timestamp; self._updates += 1
+        if self._updates % MOVING_AVERAGE_RESUM_INTERVAL == 0: self._sum = np.sum(self._points, axis=0); self._time_sum = sum(self._times)
+        count = len(self._points)
+        self.lag_ms = (timestamp - self._time_sum / count) * 1000
+        return self._sum / count
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al.): a low-pass whose cutoff rises with gaze speed, so it is steady when still and quick when moving."""
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff, self.beta, self.d_cutoff = min_cutoff, beta, d_cutoff; self.reset()
+
+    def reset(self):
+        self._value = None; self._speed = np.zeros(2); self._last_time = None; self.lag_ms = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, point, timestamp):
+        point = np.asarray(point, dtype=np.float64)
+        if self._value is None or timestamp <= self._last_time:
+            if self._value is None: self._value = point.copy(); self.lag_ms = 0.0
+            self._last_time = timestamp if self._last_time is None else self._last_time
+            return self._value
+        dt = timestamp - self._last_time; self._last_time = timestamp
+        speed = (point - self._value) / dt
+        self._speed += self._alpha(self.d_cutoff, dt) * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * float(np.hypot(*self._speed))
+        self._value = self._value + self._alpha(cutoff, dt) * (point - self._value)
+        self.lag_ms = 1000.0 / (2 * np.pi * cutoff) # Time constant of the low-pass at this cutoff
+        return self._value
+
+class KalmanFilter:
+    """Constant-velocity Kalman filter, position and velocity per axis.
+
+    Both axes share the noise model, so they share one 2x2 covariance and gain; updates are scalar arithmetic.
+    Tracks steady motion without the lag of averaging; KALMAN_* trade jitter against responsiveness.
+    """
+    def __init__(self, accel_noise=KALMAN_ACCEL_NOISE, measurement_noise=KALMAN_MEASUREMENT_NOISE):
+        self.accel_noise, self.measurement_noise = accel_noise, measurement_noise; self.reset()
+
+    def reset(self):
+        self._pos = None; self._vel = np.zeros(2); self._last_time = None
+        self._p = [0.0, 0.0, 0.0] # Covariance [var(pos), cov(pos, vel), var(vel)]
+        self.lag_ms = None
+
+    def update(self, point, timestamp):
+        point = np.asarray(point, dtype=np.float64)
+        r = self.measurement_noise ** 2
+        if self._pos is None:
+            self._pos = point.copy(); self._vel[:] = 0.0; self._last_time = timestamp
+            self._p = [r, 0.0, (self.accel_noise * 0.1) ** 2]
+            return self._pos
+        dt = max(timestamp - self._last_time, 1e-4); self._last_time = timestamp
+        # Predict: x = F x, P = F P F' + Q (white-noise acceleration)
+        p00, p01, p11 = self._p; q = self.accel_noise ** 2
+        pred = self._pos + self._vel * dt
+        p00 = p00 + 2 * dt * p01 + dt * dt * p11 + q * dt ** 4 / 4
+        p01 = p01 + dt * p11 + q * dt ** 3 / 2
+        p11 = p11 + q * dt * dt
+        # Update with the measured position
+        s = p00 + r; k0, k1 = p00 / s, p01 / s
+        innovation = point - pred
+        self._pos = pred + k0 * innovation; self._vel = self._vel + k1 * innovation
+        self._p = [(1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01]
+        self.lag_ms = None # No fixed lag for steady motion; see --compare-filters for measured lag
+        return self._pos
+
+class GazePredictor:
+    """Estimates gaze velocity and acceleration from raw samples and extrapolates a target ahead in time.
+
+    Used to lead the smoothed target by the pipeline latency plus the filter lag. Needs three
+    samples before it predicts; reset it whenever the sample stream is interrupted.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._last_point = None; self._last_time = None
+        self._vel = None; self._accel = np.zeros(2); self.samples = 0
+
+    def update(self, point, timestamp):
+        point = np.asarray(point, dtype=np.float64)
+        if self._last_point is not None and timestamp > self._last_time:
+            dt = timestamp - self._last_time
+            vel = (point - self._last_point) / dt
+            if self._vel is not None:
+                self._accel += PREDICTION_ACCEL_SMOOTHING * ((vel - self._vel) / dt - self._accel)
+                self._vel = self._vel + PREDICTION_VELOCITY_SMOOTHING * (vel - self._vel)
+            else: self._vel = vel
+            self.samples += 1
+        self._last_point = point; self._last_time = timestamp
+
+    def predict(self, target, horizon):
+        """Returns target moved horizon seconds along the estimated motion (unchanged until warmed up)."""
+        if self.samples < 2 or horizon <= 0: return target
+        speed = float(np.hypot(*self._vel))
+        if speed <= PREDICTION_MIN_SPEED: return target # Fixation: velocity is mostly noise, don't amplify it
+        ramp = min(1.0, speed / PREDICTION_MIN_SPEED - 1.0) # Fade in between one and two times the minimum speed
+        shift = ramp * (self._vel * horizon + 0.5 * self._accel * horizon * horizon)
+        distance = float(np.hypot(*shift))
+        if distance > PREDICTION_MAX_SHIFT_PX: shift *= PREDICTION_MAX_SHIFT_PX / distance
+        return target + shift
+
+def create_smoothing_filter(kind, window):
+    """Returns a new filter for a SMOOTHING_FILTERS key (window is used by the moving average)."""
+    if kind == "one_euro": return OneEuroFilter()
+    if kind == "kalman": return KalmanFilter()
+    return MovingAverageFilter(window)
+# --- End Smoothing Filters ---
+
+
+# --- Clickable Target Index ---
+# A target provider's targets(screen_w, screen_h) returns {key: (left, top, right, bottom)} in screen pixels
+# for every clickable element; keys identify a target across calls (hwnd on Windows) so the index updates incrementally.
+WIN32_CLICKABLE_CLASSES = [
+    'Button', 'TButton', 'WindowsForms10.BUTTON.*', 'WindowsForms10.CHECKBOX.*',
+    'WindowsForms10.RADIOBUTTON.*', 'CheckBox', 'RadioButton', 'ComboBox', 'ListBox',
+    'msctls_trackbar32', 'msctls_updown32', 'ScrollBar', 'SysLink', 'SysListView32',
+    'SysTreeView32', 'ToolbarWindow32', 'ReBarWindow32', 'TabControl', 'SysTabControl32',
+    'MenuItem'
+    # Add more as needed
+]
+WIN32_CLICKABLE_CLASS_PATTERN = re.compile("|".join(fnmatch.translate(pattern) for pattern in WIN32_CLICKABLE_CLASSES)) # One match per window
+
+class Win32ClickTargetProvider:
+    """Visible, enabled windows of a clickable class, collected in one sweep over the desktop's descendants."""
+    def targets(self, screen_w, screen_h):
+        targets = {}
+        max_w, max_h = screen_w * STICK_TARGET_MAX_SCREEN_FRACTION, screen_h * STICK_TARGET_MAX_SCREEN_FRACTION
+
+        def enum_windows_proc(hwnd, lParam):
+            try:
+                if not win32gui.IsWindowVisible(hwnd) or not win32gui.IsWindowEnabled(hwnd): return True
+                if not WIN32_CLICKABLE_CLASS_PATTERN.match(win32gui.GetClassName(hwnd)): return True
+                left, top, right, bottom = win32gui.GetWindowRect(hwnd); w, h = right - left, bottom - top
+                if w < STICK_TARGET_MIN_SIZE_PX or h < STICK_TARGET_MIN_SIZE_PX or w > max_w or h > max_h: return True
+                center_x, center_y = left + w // 2, top + h // 2
+                if 0 <= center_x < screen_w and 0 <= center_y < screen_h: targets[hwnd] = (left, top, right, bottom)
+            except win32gui.error: pass # Window disappeared during enumeration
+            return True # Continue enumeration
+
+        try: win32gui.EnumChildWindows(win32gui.GetDesktopWindow(), enum_windows_proc, None) # Top-level windows and all their children
+        except Exception as e: print(f"Warning: Error during EnumChildWindows call: {e}")
+        return targets
+
+class SyntheticTargetProvider:
+    """Random button-sized targets for exercising the index without a window system.
+
+    Each call replaces a `churn` fraction of the targets with new ones, like windows opening and closing,
+    and sleeps `delay` seconds to simulate a slow enumeration.
+    """
+    def __init__(self, count, screen_size=(1920, 1080), churn=0.0, seed=0, delay=0.0):
+        self.screen_w, self.screen_h = screen_size; self.churn = churn; self.delay = delay
+        self.rng = np.random.default_rng(seed)
+        self._targets = {}; self._next_key = 0
+        for _ in range(count): self._add()
+
+    def _add(self):
+        w, h = int(self.rng.integers(16, 160)), int(self.rng.integers(12, 48))
+        left, top = int(self.rng.integers(0, self.screen_w - w)), int(self.rng.integers(0, self.screen_h - h))
+        self._targets[self._next_key] = (left, top, left + w, top + h); self._next_key += 1
+
+    def targets(self, screen_w, screen_h):
+        if self.delay: time.sleep(self.delay)
+        replaced = min(int(len(self._targets) * self.churn), len(self._targets))
+        for key in self.rng.choice(list(self._targets), size=replaced, replace=False): del self._targets[key]; self._add()
+        return dict(self._targets)
+
+class ClickTargetIndex:
+    """Uniform grid of target centers with incremental refresh and radius-limited nearest queries.
+
+    A query only visits the cells overlapping the search radius, so its cost depends on how
+    crowded that part of the screen is, not on the total number of targets.
+    """
+    def __init__(self, cell_size=STICK_TARGET_GRID_CELL_PX):
+        self.cell_size = cell_size; self.clear()
+
+    def clear(self):
+        self._centers = {} # Key -> (x, y)
+        self._cells = {} # (column, row) -> set of keys
+
+    def __len__(self): return len(self._centers)
+
+    def snapshot(self):
+        """Returns a read-only copy for other threads to query while this index keeps being refreshed."""
+        frozen = ClickTargetIndex(self.cell_size)
+        frozen._centers = dict(self._centers); frozen._cells = {cell: tuple(keys) for cell, keys in self._cells.items()}
+        return frozen
+
+    def _cell(self, x, y): return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _remove(self, key):
+        cell = self._cell(*self._centers.pop(key)); keys = self._cells[cell]
+        keys.discard(key)
+        if not keys: del self._cells[cell]
+
+    def refresh(self, targets):
+        """Brings the index in line with a provider's {key: rect}; returns how many targets were added, moved or removed."""
+        changes = 0
+        for key in self._centers.keys() - targets.keys(): self._remove(key); changes += 1
+        for key, (left, top, right, bottom) in targets.items():
+            center = (left + (right - left) // 2, top + (bottom - top) // 2)
+            old_center = self._centers.get(key)
+            if old_center == center: continue
+            if old_center is not None: self._remove(key)
+            self._centers[key] = center; self._cells.setdefault(self._cell(*center), set()).add(key); changes += 1
+        return changes
+
+    def nearest(self, position, radius):
+        """Returns the center of the target nearest to position within radius as a (2,) array, or None."""
+        x, y = float(position[0]), float(position[1])
+        first_col, first_row = self._cell(x - radius, y - radius); last_col, last_row = self._cell(x + radius, y + radius)
+        best = None; best_dist_sq = radius * radius
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                for key in self._cells.get((col, row), ()):
+                    center_x, center_y = self._centers[key]
+                    dist_sq = (center_x - x) ** 2 + (center_y - y) ** 2
+                    if dist_sq <= best_dist_sq: best_dist_sq = dist_sq; best = (center_x, center_y)
+        return None if best is None else np.array(best)
+
+TargetSnapshot = namedtuple("TargetSnapshot", ["seq", "index", "time", "enumeration_ms"]) # index is a read-only ClickTargetIndex; time is perf_counter() when enumeration finished
+
+class ClickTargetWorker(threading.Thread):
+    """Enumerates clickable targets in the background and publishes each result as an immutable TargetSnapshot.
+
+    Readers only take `snapshot` (one attribute read), so a slow enumeration never holds up a frame.
+    """
+    def __init__(self, provider, screen_size, interval=STICK_TARGET_REFRESH_INTERVAL):
+        super().__init__(name="ClickTargetWorker", daemon=True)
+        self.provider = provider
+        self.screen_w, self.screen_h = screen_size
+        self.interval = interval
+        self.snapshot = None # Latest TargetSnapshot; None until the first enumeration finishes
+        self._index = ClickTargetIndex() # Refreshed incrementally; only copies of it are published
+        self._stop_event = threading.Event()
+
+    def run(self):
+        seq = 0
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try: targets = self.provider.targets(self.screen_w, self.screen_h)
+            except Exception as e_enum: print(f"Warning: Clickable target enumeration failed: {e_enum}"); targets = None
+            if targets is not None and not self._stop_event.is_set():
+                enumerated = time.perf_counter()
+                self._index.refresh(targets); seq += 1
+                self.snapshot = TargetSnapshot(seq, self._index.snapshot(), enumerated, (enumerated - start) * 1000)
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout=0.5):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self: self.join(timeout)
+# --- End Clickable Target Index ---
+
+
 # --- SmoothCursor Class (With Button Sticking Fix & DRIFT FIX) ---
 class SmoothCursor:
     """Handles cursor smoothing, adaptive speed, button sticking, and drift correction."""
-    def __init__(self):
-        self.smoothing_window = 6 # Default if not loaded
+    def __init__(self, cursor_sink=None, target_provider=None):
+        # Where moves are sent; position() comes from the model, not an OS query per call
+        self.cursor = CursorStateModel(cursor_sink if cursor_sink is not None else PyAutoGuiCursorSink())
+        self.smoothing_window = 6 # Default if not loaded (moving average window)
+        self.smoothing_filter_kind = "moving_average" # Key of SMOOTHING_FILTERS
+        self.filter = create_smoothing_filter(self.smoothing_filter_kind, self.smoothing_window)
         # Use fixed default values now
         self.speed_gain = DEFAULT_BASE_GAIN
         self.acceleration = DEFAULT_ACCELERATION
@@ -167,20 +1230,38 @@ class SmoothCursor:
         self.last_stick_check_time = 0
         self.sticking_to_button = False
         self.stick_position = None
+        # Clickable targets (None = no provider on this platform, sticking never engages)
+        self.target_provider = target_provider if target_provider is not None else (Win32ClickTargetProvider() if IS_WINDOWS else None)
+        self.target_worker = None # ClickTargetWorker, started by the first sticking check
+        self.target_stats = StageLatencyStats(stages=STICK_TARGET_STAGES) # Filled on the frame path only
+        self.last_target_snapshot_seq = None
         # --- State ---
-        self.position_history = deque(maxlen=self.smoothing_window)
+        self.last_move_time = None             # perf_counter() right after the last normal moveTo returned (or when the glide to it ends)
+        self.last_move_smoothing_lag_ms = None # The filter's lag estimate at that move (how far the target trails the newest sample)
         self.last_raw_position = None          # Track last raw input for speed calc
         self.last_smoothed_gaze_target = None  # Tracks previous smoothed target for adaptive speed calculation
         self.current_speed_multiplier = self.min_speed_factor # Use the fixed min factor initially
+        # --- Prediction ---
+        self.enable_prediction = False
+        self.predictor = GazePredictor()
+        self.prediction_latency = PREDICTION_DEFAULT_LATENCY # Seconds from capture to cursor move (EMA of measurements)
+        # --- Output Rate ---
+        self.interpolator = None # CursorInterpolator while a cursor output rate is set; None = one jump per frame
+        self.frame_interval = None # Smoothed time between update_position samples (glide duration)
+        self.last_sample_time = None
         # --- Screen Info ---
         self.screen_width = 0
         self.screen_height = 0
         self._get_screen_dimensions() # Use helper method for clarity
 
 
+    def set_cursor_sink(self, sink):
+        """Replaces the cursor sink and re-reads the screen dimensions from it."""
+        self.cursor.set_sink(sink); self._get_screen_dimensions()
+
     def _get_screen_dimensions(self):
         """Gets screen dimensions using appropriate method."""
-        if IS_WINDOWS:
+        if IS_WINDOWS and isinstance(self.cursor.sink, PyAutoGuiCursorSink):
             try:
                 self.screen_width = win32api.GetSystemMetrics(0) # SM_CXSCREEN
                 self.screen_height = win32api.GetSystemMetrics(1) # SM_CYSCREEN
@@ -194,9 +1275,9 @@ class SmoothCursor:
             self._get_screen_dimensions_pyautogui()
 
     def _get_screen_dimensions_pyautogui(self):
-        """Fallback method using pyautogui for screen dimensions."""
+        """Fallback method using the cursor sink (pyautogui by default) for screen dimensions."""
         try:
-            self.screen_width, self.screen_height = pyautogui.size()
+            self.screen_width, self.screen_height = self.cursor.size()
             # print(f"SmoothCursor: Detected screen dimensions (pyautogui): {self.screen_width}x{self.screen_height}")
             if self.screen_width <= 0 or self.screen_height <= 0: # Sanity check
                 raise ValueError("pyautogui returned non-positive dimensions")
@@ -207,16 +1288,25 @@ class SmoothCursor:
             print(f"SmoothCursor: Using fallback screen dimensions: {self.screen_width}x{self.screen_height}")
 
 
-    def update_position(self, raw_screen_pos):
-        """Updates cursor position based on raw input, applying smoothing, adaptive speed, sticking, and drift correction."""
+    def update_position(self, raw_screen_pos, timestamp=None):
+        """Updates cursor position based on raw input, applying smoothing, adaptive speed, sticking, and drift correction.
+
+        timestamp is the frame time of raw_screen_pos (perf_counter clock), used for latency reporting.
+        Returns True if the cursor was moved towards the smoothed target.
+        """
         raw_screen_pos = np.array(raw_screen_pos)
+        sample_time = time.perf_counter() if timestamp is None else timestamp
+        if self.last_sample_time is not None and 0 < sample_time - self.last_sample_time < CURSOR_GLIDE_MAX_INTERVAL:
+            interval = sample_time - self.last_sample_time
+            self.frame_interval = interval if self.frame_interval is None else 0.8 * self.frame_interval + 0.2 * interval
+        self.last_sample_time = sample_time
 
         # --- Button Sticking Logic ---
         current_time = time.time()
-        if self.enable_sticking and IS_WINDOWS and (current_time - self.last_stick_check_time > self.stick_check_interval):
+        if self.enable_sticking and self.target_provider is not None and (current_time - self.last_stick_check_time > self.stick_check_interval):
             self.last_stick_check_time = current_time
             try:
-                current_cursor_pos_tuple = pyautogui.position()
+                current_cursor_pos_tuple = self.cursor.position()
             except Exception as e_pos:
                 # Fallback if getting position fails (less accurate sticking)
                 current_cursor_pos_tuple = (self.last_smoothed_gaze_target[0], self.last_smoothed_gaze_target[1]) if self.last_smoothed_gaze_target is not None else (self.screen_width // 2, self.screen_height // 2)
@@ -234,27 +1324,28 @@ class SmoothCursor:
                         # print("Sticking released: Intention far from stick point.")
                         self.sticking_to_button = False; self.stick_position = None
                         # Clear history on release to avoid jump from possibly stale data
-                        self.position_history.clear(); self.last_smoothed_gaze_target = None; self.last_raw_position = None
+                        self.reset_smoothing()
                     else:
                         # If stuck, ensure cursor stays exactly on stick point
                         # Use current_cursor_pos from pyautogui if available
                         if np.linalg.norm(current_cursor_pos - self.stick_position) > 1: # Allow tiny movements
                             stick_x = max(0, min(int(self.stick_position[0]), self.screen_width - 1))
                             stick_y = max(0, min(int(self.stick_position[1]), self.screen_height - 1))
+                            self.cancel_glide()
                             try:
-                                pyautogui.moveTo(stick_x, stick_y, _pause=False)
+                                self.cursor.move_to(stick_x, stick_y)
                             except Exception as e_move:
                                 print(f"Error during stick moveTo: {e_move}") # Handle rare moveTo issues
 
                         # Keep updating history with *intended* raw position to allow smooth release transition
-                        self.position_history.append(raw_screen_pos)
+                        self.filter.update(raw_screen_pos, sample_time)
                         # Store the *actual* stuck position as the last smoothed target for stability
                         self.last_smoothed_gaze_target = self.stick_position
                         self.last_raw_position = raw_screen_pos # Keep tracking raw intention
-                        return # IMPORTANT: Return early when stuck
+                        return False # IMPORTANT: Return early when stuck
 
             if not self.sticking_to_button:
-                nearest_button_pos = self._find_nearest_clickable_win32(current_cursor_pos, self.screen_width, self.screen_height)
+                nearest_button_pos = self._find_nearest_clickable(current_cursor_pos)
                 if nearest_button_pos is not None:
                     distance_to_button = np.linalg.norm(current_cursor_pos - nearest_button_pos)
                     # Consider intention relative to *current* cursor, not smoothed target
@@ -275,30 +1366,31 @@ class SmoothCursor:
                         self.sticking_to_button = True; self.stick_position = nearest_button_pos
                         stick_x = max(0, min(int(self.stick_position[0]), self.screen_width - 1))
                         stick_y = max(0, min(int(self.stick_position[1]), self.screen_height - 1))
+                        self.cancel_glide()
                         try:
-                            pyautogui.moveTo(stick_x, stick_y, _pause=False)
+                            self.cursor.move_to(stick_x, stick_y)
                         except Exception as e_move:
                              print(f"Error during initial stick moveTo: {e_move}")
                         # Reset history and set target to stick position for stability
-                        self.position_history.clear(); self.position_history.append(self.stick_position)
+                        self.filter.reset(); self.filter.update(self.stick_position, sample_time); self.predictor.reset()
                         self.last_smoothed_gaze_target = self.stick_position
                         self.last_raw_position = raw_screen_pos # Still track raw intention
-                        return # IMPORTANT: Return early after initiating stick
+                        return False # IMPORTANT: Return early after initiating stick
         # --- End Button Sticking Logic ---
 
         # --- Smoothing & Movement Calculation (Only if NOT stuck) ---
-        self.position_history.append(raw_screen_pos)
-
-        if len(self.position_history) < 1: # Need at least one point
-            self.last_raw_position = raw_screen_pos
-            return
-
         # Calculate smoothed target position
-        smoothed_gaze_target = np.mean(self.position_history, axis=0)
+        smoothed_gaze_target = self.filter.update(raw_screen_pos, sample_time)
+        movement_target = smoothed_gaze_target
+        if self.enable_prediction: # Lead the target by the capture-to-cursor latency plus the filter's own lag
+            self.predictor.update(raw_screen_pos, sample_time)
+            horizon = min(self.prediction_latency + (self.filter.lag_ms or 0.0) / 1000.0, PREDICTION_MAX_HORIZON)
+            movement_target = self.predictor.predict(smoothed_gaze_target, horizon)
+            movement_target = np.clip(movement_target, 0, (self.screen_width - 1, self.screen_height - 1))
 
         # Get current actual cursor position
         try:
-            current_x, current_y = pyautogui.position()
+            current_x, current_y = self.cursor.position()
             current_cursor_pos = np.array([current_x, current_y])
         except Exception as e_pos:
             # Fallback if getting position fails (e.g., Wayland issues)
@@ -324,8 +1416,8 @@ class SmoothCursor:
              self.current_speed_multiplier = self.min_speed_factor # Default if no previous position
 
         # --- DRIFT CORRECTION & MOVEMENT ---
-        # Vector from current cursor position to the smoothed gaze target
-        error_vector = smoothed_gaze_target - current_cursor_pos
+        # Vector from current cursor position to the smoothed (or predicted) gaze target
+        error_vector = movement_target - current_cursor_pos
         error_distance = np.linalg.norm(error_vector)
 
         # Scale movement based on how far the cursor has drifted from the target
@@ -349,9 +1441,14 @@ class SmoothCursor:
 
         # Move the cursor only if the calculated position is different (prevents unnecessary calls)
         # Ensure not sticking AND movement is significant enough (e.g., > 0 pixels)
+        moved = False
         if not self.sticking_to_button and (abs(new_x - int(current_cursor_pos[0])) > 0 or abs(new_y - int(current_cursor_pos[1])) > 0):
              try:
-                 pyautogui.moveTo(new_x, new_y, duration=0, _pause=False)
+                 if self.interpolator is not None: # Glide there over about one frame interval; it counts as moved once it arrives
+                     self.last_move_time = self.interpolator.set_target(current_cursor_pos, (new_x, new_y), self.frame_interval or CURSOR_GLIDE_DEFAULT_INTERVAL)
+                 else: self.cursor.move_to(new_x, new_y); self.last_move_time = time.perf_counter()
+                 moved = True
+                 self.last_move_smoothing_lag_ms = self.filter.lag_ms
              except Exception as e_move:
                  print(f"Error during normal moveTo: {e_move}") # Handle rare moveTo issues
 
@@ -359,112 +1456,42 @@ class SmoothCursor:
         # Update last known positions for the next frame
         self.last_smoothed_gaze_target = smoothed_gaze_target
         self.last_raw_position = raw_screen_pos
-
-    def _find_nearest_clickable_win32(self, position, screen_w, screen_h):
-        """Finds the center of the nearest clickable UI element within search radius on Windows."""
-        # This method remains unchanged - relies on pywin32
-        if not IS_WINDOWS: return None
-        buttons = []; target_pos = np.array(position); search_radius_sq = self.stick_search_radius ** 2
-        max_sensible_width = screen_w * 0.80; max_sensible_height = screen_h * 0.80
-        min_sensible_dimension = 5
-        clickable_classes = [
-            'Button', 'TButton', 'WindowsForms10.BUTTON.*', 'WindowsForms10.CHECKBOX.*',
-            'WindowsForms10.RADIOBUTTON.*', 'CheckBox', 'RadioButton', 'ComboBox', 'ListBox',
-            'msctls_trackbar32', 'msctls_updown32', 'ScrollBar', 'SysLink', 'SysListView32',
-            'SysTreeView32', 'ToolbarWindow32', 'ReBarWindow32', 'TabControl', 'SysTabControl32',
-            'MenuItem' # Added menu items
-            # Add more as needed
-        ]
-        # Classes to definitely ignore (Window decorations, backgrounds, etc.)
-        ignore_classes = [
-            'Shell_TrayWnd', 'Progman', 'WorkerW', 'Internet Explorer_Server', 'Static', 'Edit',
-            'IME', 'MSCTFIME UI', '#32768', 'tooltips_class32', 'SysHeader32',
-            'SysPager', 'msctls_statusbar32', # Added status bars etc.
-            '#32769', # Popup menus container (items are separate)
-            'ComboLBox', # Dropdown list part of ComboBox
-        ]
-
-        def enum_windows_proc(hwnd, lParam):
-            nonlocal buttons
-            try:
-                # Basic visibility and enablement checks
-                if not win32gui.IsWindowVisible(hwnd) or not win32gui.IsWindowEnabled(hwnd): return True
-                class_name = win32gui.GetClassName(hwnd); rect = win32gui.GetWindowRect(hwnd)
-                # Ignore specific classes known not to be clickable targets
-                if class_name in ignore_classes: return True
-                # Ignore by pattern
-                if class_name.startswith("Windows.UI.") or class_name.startswith("ApplicationFrameWindow"): return True # Ignore modern UI chrome
-
-                # Basic sanity checks on window rect
-                x, y, right, bottom = rect; w, h = right - x, bottom - y
-                if w < min_sensible_dimension or h < min_sensible_dimension or right <= 0 or bottom <= 0 or x >= screen_w or y >= screen_h or w > screen_w or h > screen_h: return True
-                # Ignore excessively large elements (likely backgrounds or main windows)
-                if w > max_sensible_width or h > max_sensible_height: return True
-
-                # Calculate center and distance squared (faster than sqrt)
-                center_x, center_y = x + w // 2, y + h // 2
-                dist_sq = (target_pos[0] - center_x)**2 + (target_pos[1] - center_y)**2
-
-                # Ignore if outside search radius
-                if dist_sq > search_radius_sq: return True
-
-                # Check if class matches any of the clickable patterns
-                match = False
-                import fnmatch # For wildcard matching
-                for pattern in clickable_classes:
-                    if '*' in pattern: # Handle wildcards like 'WindowsForms10.BUTTON.*'
-                        if fnmatch.fnmatch(class_name, pattern): match = True; break
-                    elif class_name == pattern: match = True; break
-
-                # Special handling for menu items (use GetMenuItemRect for more accuracy if needed, but center is often ok)
-                if not match and class_name == '#32768': # Check children of popup menus
-                    def enum_menu_items(menu_hwnd, _):
-                        nonlocal buttons, match
-                        try:
-                            menu_class = win32gui.GetClassName(menu_hwnd)
-                            if menu_class == 'MenuItem': # Assuming direct child is MenuItem, might need deeper search
-                                menu_rect = win32gui.GetWindowRect(menu_hwnd)
-                                mx, my, mright, mbottom = menu_rect
-                                mw, mh = mright-mx, mbottom-my
-                                if mw < min_sensible_dimension or mh < min_sensible_dimension: return True
-                                mcenter_x, mcenter_y = mx + mw // 2, my + mh // 2
-                                mdist_sq = (target_pos[0] - mcenter_x)**2 + (target_pos[1] - mcenter_y)**2
-                                if mdist_sq <= search_radius_sq and 0 <= mcenter_x < screen_w and 0 <= mcenter_y < screen_h:
-                                    buttons.append({'pos': np.array([mcenter_x, mcenter_y]), 'dist': np.sqrt(mdist_sq), 'hwnd': menu_hwnd, 'class': menu_class, 'rect': menu_rect})
-                                    match = True # Consider it matched if a menu item is found nearby
-                        except win32gui.error: pass
-                        except Exception as e_menu: pass # print(f"Minor error enum menu: {e_menu}")
-                        return True
-                    win32gui.EnumChildWindows(hwnd, enum_menu_items, None)
-
-                # Add matched button if not already added via menu logic
-                if match and not any(b['hwnd'] == hwnd for b in buttons):
-                    # Final check: ensure calculated center is within screen bounds
-                    if 0 <= center_x < screen_w and 0 <= center_y < screen_h:
-                        button_center = np.array([center_x, center_y])
-                        buttons.append({'pos': button_center, 'dist': np.sqrt(dist_sq), 'hwnd': hwnd, 'class': class_name, 'rect': rect})
-
-            except win32gui.error: pass # Ignore errors from specific windows (e.g., disappearing)
-            except Exception as e_enum:
-                # print(f"Minor error during window enumeration: {e_enum}") # Debugging only
-                pass
-            return True # Continue enumeration
-
-        try:
-            # Enumerate children of the desktop first, then top-level windows
-            # Include children of the foreground window for potentially higher priority targets
-            fg_hwnd = win32gui.GetForegroundWindow()
-            if fg_hwnd:
-                 win32gui.EnumChildWindows(fg_hwnd, enum_windows_proc, None)
-            win32gui.EnumChildWindows(win32gui.GetDesktopWindow(), enum_windows_proc, None)
-            win32gui.EnumWindows(enum_windows_proc, None)
-        except Exception as e: print(f"Warning: Error during EnumWindows/EnumChildWindows call: {e}")
-
-        if not buttons: return None
-        # Find the button with the minimum distance
-        nearest_button = min(buttons, key=lambda b: b['dist'])
-        return nearest_button['pos']
-
+        return moved
+
+    def _find_nearest_clickable(self, position):
+        """Finds the center of the nearest clickable target within search radius in the worker's latest snapshot (never enumerates)."""
+        if self.target_worker is None:
+            self.target_worker = ClickTargetWorker(self.target_provider, (self.screen_width, self.screen_height)); self.target_worker.start()
+        snapshot = self.target_worker.snapshot
+        if snapshot is None: return None # First enumeration still running
+        if snapshot.seq != self.last_target_snapshot_seq:
+            self.last_target_snapshot_seq = snapshot.seq; self.target_stats.add("enumeration", snapshot.enumeration_ms)
+        self.target_stats.add("snapshot_age", (time.perf_counter() - snapshot.time) * 1000)
+        return snapshot.index.nearest(position, self.stick_search_radius)
+
+
+    def set_output_rate(self, rate_hz):
+        """Starts, retunes or stops the CursorInterpolator; rate_hz 0 moves the cursor once per frame."""
+        if rate_hz and self.interpolator is not None: self.interpolator.rate_hz = rate_hz; return
+        if self.interpolator is not None: self.interpolator.stop(); self.interpolator = None
+        if rate_hz: self.interpolator = CursorInterpolator(self.cursor, rate_hz); self.interpolator.start()
+
+    def set_sticking(self, enabled):
+        """Enables or disables button sticking; disabling also stops the target enumeration worker."""
+        self.enable_sticking = enabled
+        if enabled: return
+        self.reset_sticking()
+        if self.target_worker is not None: self.target_worker.stop(); self.target_worker = None; self.last_target_snapshot_seq = None
+
+    def set_prediction(self, enabled):
+        """Enables or disables gaze prediction; a change resets the predictor so it doesn't extrapolate from motion seen before."""
+        enabled = bool(enabled)
+        if enabled != self.enable_prediction: self.predictor.reset()
+        self.enable_prediction = enabled
+
+    def cancel_glide(self):
+        """Stops any interpolated movement in progress."""
+        if self.interpolator is not None: self.interpolator.cancel()
 
     def reset_sticking(self):
         """Resets the button sticking state."""
@@ -474,19 +1501,30 @@ class SmoothCursor:
         self.sticking_to_button = False; self.stick_position = None
         # Do not reset smoothed gaze target here, causes jumpiness if sticking released mid-movement
         self.last_raw_position = None # Okay to reset raw position
+        self.predictor.reset() # Called when the face is lost or out of bounds; don't extrapolate across the gap
 
-    def set_smoothing_params(self, window):
-        """Updates smoothing window size."""
+    def set_smoothing_params(self, window, filter_kind=None):
+        """Updates the moving average window size and/or the smoothing filter (a SMOOTHING_FILTERS key)."""
         window = int(max(1, window))
-        if self.smoothing_window != window:
-            # print(f"SmoothCursor: Updating smoothing window to {window}") # Info
-            self.position_history = deque(maxlen=window)
-            # Reset refs when window changes to avoid jerky transition
+        filter_kind = filter_kind if filter_kind in SMOOTHING_FILTERS else self.smoothing_filter_kind
+        if self.smoothing_window != window or self.smoothing_filter_kind != filter_kind:
+            # print(f"SmoothCursor: Updating smoothing to {filter_kind}/{window}") # Info
+            self.filter = create_smoothing_filter(filter_kind, window)
+            # Reset refs when the filter changes to avoid jerky transition
             self.last_smoothed_gaze_target = None
             self.last_raw_position = None
-        self.smoothing_window = window
+        self.smoothing_window = window; self.smoothing_filter_kind = filter_kind
+
+    def reset_smoothing(self):
+        """Restarts the filter and speed references (e.g. when the gaze re-enters the tracking area)."""
+        self.filter.reset(); self.predictor.reset(); self.last_smoothed_gaze_target = None; self.last_raw_position = None
         # Speed parameters are now fixed defaults set in __init__
 
+    def record_pipeline_latency(self, seconds):
+        """Folds a measured capture-to-cursor latency into the prediction horizon."""
+        if 0 < seconds < PREDICTION_MAX_HORIZON * 4:
+            self.prediction_latency += PREDICTION_LATENCY_SMOOTHING * (seconds - self.prediction_latency)
+
 # --- End SmoothCursor Class ---
 
 
@@ -527,12 +1565,20 @@ def get_default_settings():
         # Removed cursor_sensitivity_level
         "outer_gap_level": DEFAULT_GAP_LEVEL,
         "camera_index": 0,
+        "capture_mode": None, # Negotiated {"width", "height", "fps", "fourcc"} for camera_index; None = negotiate on next open
         "enable_button_sticking": IS_WINDOWS,
         # *** ADDED double_blink_interval (not currently user settable, but stored) ***
         "double_blink_interval": DOUBLE_BLINK_INTERVAL,
         "long_blink_threshold": 0.27,  # Use constant
         "smooth_window_internal": 6,
         "enable_cursor_highlight": False, # New setting default
+        "preview_mode": "Full", # Key of PREVIEW_MODES
+        "cursor_output_hz": 0, # Key of CURSOR_OUTPUT_RATES (0 = move once per camera frame; the glide is opt-in)
+        "smoothing_filter": "moving_average", # Key of SMOOTHING_FILTERS
+        "enable_prediction": False, # Extrapolate the gaze target by the measured pipeline latency
+        "inference_backend": "face_mesh", # Key of INFERENCE_BACKENDS
+        "inference_width": 0, # Key of INFERENCE_RESOLUTIONS
+        "high_res_capture": False, # Prefer HIGH_RES_CAPTURE_MODES when negotiating the capture mode
     }
     if not IS_WINDOWS: defaults["enable_button_sticking"] = False
     # Ensure default padding corresponds exactly to a level
@@ -547,7 +1593,8 @@ def load_profiles():
         "profiles": {
             "Default": default_profile_settings.copy()
         },
-        "tutorial_completed": False
+        "tutorial_completed": False,
+        "camera_cache": {"cameras": []}
     }
     if not os.path.exists(CONFIG_FILE):
         print(f"Config file '{CONFIG_FILE}' not found. Creating with default profile.")
@@ -558,7 +1605,8 @@ def load_profiles():
 
     loaded_data = None # Initialize before try block
     try:
-        with open(CONFIG_FILE, "r") as file: loaded_data = json.load(file)
+        with open(CONFIG_FILE, "r") as file: config_text = file.read()
+        loaded_data = json.loads(config_text)
 
         # --- Basic Structure Validation ---
         if not (isinstance(loaded_data, dict) and "profiles" in loaded_data and
@@ -567,6 +1615,7 @@ def load_profiles():
 
         # --- Add Missing Top-Level Keys ---
         if "tutorial_completed" not in loaded_data: loaded_data["tutorial_completed"] = False
+        loaded_data["camera_cache"] = validate_camera_cache(loaded_data.get("camera_cache")) # Adds it if missing
         if "Default" not in loaded_data["profiles"]:
             loaded_data["profiles"]["Default"] = default_profile_settings.copy(); print("Added missing 'Default' profile.")
 
@@ -609,6 +1658,8 @@ def load_profiles():
             try: valid_settings["camera_index"] = int(valid_settings.get("camera_index", 0))
             except (ValueError, TypeError): valid_settings["camera_index"] = 0
 
+            valid_settings["capture_mode"] = validate_capture_mode(valid_settings.get("capture_mode"))
+
             try: valid_settings["long_blink_threshold"] = max(0.1, float(valid_settings.get("long_blink_threshold", default_profile_settings["long_blink_threshold"])))
             except (ValueError, TypeError): valid_settings["long_blink_threshold"] = default_profile_settings["long_blink_threshold"]
 
@@ -630,7 +1681,16 @@ def load_profiles():
             # Handle boolean highlight setting
             try: valid_settings["enable_cursor_highlight"] = bool(valid_settings.get("enable_cursor_highlight", default_profile_settings["enable_cursor_highlight"]))
             except (ValueError, TypeError): valid_settings["enable_cursor_highlight"] = default_profile_settings["enable_cursor_highlight"]
+            try: valid_settings["enable_prediction"] = bool(valid_settings.get("enable_prediction", default_profile_settings["enable_prediction"]))
+            except (ValueError, TypeError): valid_settings["enable_prediction"] = default_profile_settings["enable_prediction"]
+
 
+            if valid_settings.get("preview_mode") not in PREVIEW_MODES: valid_settings["preview_mode"] = default_profile_settings["preview_mode"]
+            if valid_settings.get("cursor_output_hz") not in CURSOR_OUTPUT_RATES: valid_settings["cursor_output_hz"] = default_profile_settings["cursor_output_hz"]
+            if valid_settings.get("smoothing_filter") not in SMOOTHING_FILTERS: valid_settings["smoothing_filter"] = default_profile_settings["smoothing_filter"]
+            if valid_settings.get("inference_backend") not in INFERENCE_BACKENDS: valid_settings["inference_backend"] = default_profile_settings["inference_backend"]
+            if valid_settings.get("inference_width") not in INFERENCE_RESOLUTIONS: valid_settings["inference_width"] = default_profile_settings["inference_width"]
+            valid_settings["high_res_capture"] = bool(valid_settings.get("high_res_capture", default_profile_settings["high_res_capture"]))
 
             valid_profiles[name] = valid_settings # Store the cleaned profile
 
@@ -641,8 +1701,8 @@ def load_profiles():
             print(f"Active profile '{loaded_data['active_profile']}' not found. Setting to 'Default'.")
             loaded_data["active_profile"] = "Default"
 
-        # Save the potentially migrated/validated data back immediately
-        save_profiles(loaded_data)
+        # Save the migrated/validated data back, but only if validation changed it
+        if loaded_data != json.loads(config_text): save_profiles(loaded_data)
         return loaded_data
 
     except (json.JSONDecodeError, IOError, TypeError, ValueError, KeyError) as e:
@@ -675,7 +1735,8 @@ def save_profiles(profiles_data):
         data_to_save = {
             "active_profile": profiles_data.get("active_profile", "Default"),
             "profiles": clean_profiles_dict,
-            "tutorial_completed": profiles_data.get("tutorial_completed", False)
+            "tutorial_completed": profiles_data.get("tutorial_completed", False),
+            "camera_cache": validate_camera_cache(profiles_data.get("camera_cache"))
         }
         # Ensure active profile exists, fallback to Default if necessary
         if data_to_save["active_profile"] not in data_to_save["profiles"]:
@@ -690,36 +1751,794 @@ def save_profiles(profiles_data):
         print(f"Error saving profiles: {e}")
 
 # --- Global Constants & Initializations ---
-ALL_PROFILES_DATA = load_profiles()
-ACTIVE_PROFILE_NAME = ALL_PROFILES_DATA.get("active_profile", "Default")
-# Ensure active profile name is valid after loading
-if ACTIVE_PROFILE_NAME not in ALL_PROFILES_DATA.get("profiles", {}):
-    print(f"Correcting active profile: '{ACTIVE_PROFILE_NAME}' not found, using 'Default'.")
-    ACTIVE_PROFILE_NAME = "Default"; ALL_PROFILES_DATA["active_profile"] = "Default"
-    save_profiles(ALL_PROFILES_DATA) # Save correction
+# Profiles are read on first use rather than at import, so importing the module has no side effects
+ALL_PROFILES_DATA = None
+ACTIVE_PROFILE_NAME = "Default"
+SETTINGS = None
+TUTORIAL_COMPLETED = False
+
+def ensure_profiles_loaded():
+    """Loads the config file into the profile globals on first call and returns ALL_PROFILES_DATA."""
+    global ALL_PROFILES_DATA, ACTIVE_PROFILE_NAME, SETTINGS, TUTORIAL_COMPLETED
+    if ALL_PROFILES_DATA is not None: return ALL_PROFILES_DATA
+    with STARTUP_PROFILER.stage("load profiles"):
+        profiles_data = load_profiles()
+        ACTIVE_PROFILE_NAME = profiles_data.get("active_profile", "Default")
+        # Ensure active profile name is valid after loading
+        if ACTIVE_PROFILE_NAME not in profiles_data.get("profiles", {}):
+            print(f"Correcting active profile: '{ACTIVE_PROFILE_NAME}' not found, using 'Default'.")
+            ACTIVE_PROFILE_NAME = "Default"; profiles_data["active_profile"] = "Default"
+            save_profiles(profiles_data) # Save correction
+        SETTINGS = profiles_data.get("profiles", {}).get(ACTIVE_PROFILE_NAME, get_default_settings())
+        TUTORIAL_COMPLETED = profiles_data.get("tutorial_completed", False)
+        ALL_PROFILES_DATA = profiles_data
+    return ALL_PROFILES_DATA
+
+BLINK_THRESHOLD_MAP = {"Low": 0.030, "Medium": 0.036, "High": 0.043} # Eye aperture (mean lid gap / inter-ocular distance) below which an eye counts as closed
+
+
+# --- Face Region-of-Interest Tracker ---
+class FaceRoiTracker:
+    """Keeps a padded face box from the previous frame's landmarks so inference only sees that crop.
+
+    Boxes are in full-frame pixels as (x0, y0, x1, y1). Without a box (startup, face lost)
+    the face has to be searched for in the full frame. A face too big to be worth cropping
+    gets a box covering the whole frame, so it is still tracked between frames. The box is
+    only moved when the face nears its edge: FaceMesh tracks landmarks between frames in
+    input-image coordinates, so a crop that shifts every frame would degrade its tracking.
+    """
+    def __init__(self, padding_factor=ROI_PADDING_FACTOR):
+        self.padding_factor = padding_factor
+        self._lock = threading.Lock() # Shared by all inference threads
+        self._box = None
+
+    def crop(self, frame):
+        """Returns (crop, roi) for the next inference; roi is the crop box in full-frame pixels, or None if no face is being tracked."""
+        frame_h, frame_w = frame.shape[:2]
+        with self._lock: box = self._box
+        if box is None: return frame, None
+        x0, y0, x1, y1 = max(0, box[0]), max(0, box[1]), min(frame_w, box[2]), min(frame_h, box[3])
+        if x1 - x0 < ROI_MIN_SIZE_PX or y1 - y0 < ROI_MIN_SIZE_PX: return frame, None
+        return frame[y0:y1, x0:x1], (x0, y0, x1, y1)
+
+    @staticmethod
+    def is_full_frame(roi, frame_shape):
+        return roi == (0, 0, frame_shape[1], frame_shape[0])
+
+    @staticmethod
+    def map_to_frame(landmarks, roi, frame_shape):
+        """Converts crop-normalized landmarks (in place) to full-frame normalized coordinates."""
+        frame_h, frame_w = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        scale_x = (x1 - x0) / frame_w; scale_y = (y1 - y0) / frame_h
+        offset_x = x0 / frame_w; offset_y = y0 / frame_h
+        for lm in landmarks:
+            lm.x = offset_x + lm.x * scale_x; lm.y = offset_y + lm.y * scale_y
+            lm.z *= scale_x # z uses the same scale as x
+
+    def update(self, landmarks, frame_shape):
+        """Sets the next crop from full-frame normalized landmarks; None (face lost) resets to the full frame."""
+        box = None
+        if landmarks is not None:
+            frame_h, frame_w = frame_shape[:2]
+            xs = [landmarks[i].x for i in FACE_OVAL_LANDMARKS]; ys = [landmarks[i].y for i in FACE_OVAL_LANDMARKS]
+            left, right = min(xs) * frame_w, max(xs) * frame_w
+            top, bottom = min(ys) * frame_h, max(ys) * frame_h
+            pad = max(right - left, bottom - top) * self.padding_factor
+            with self._lock: current = self._box
+            tracking_full_frame = current is not None and self.is_full_frame(current, frame_shape)
+            # Keep the current box while the face stays inside it with at least half the padding to spare
+            if current is not None and not tracking_full_frame and self._contains(current, (left, top, right, bottom), pad * 0.5, frame_w, frame_h):
+                return
+            box = (int(max(0, left - pad)), int(max(0, top - pad)), int(min(frame_w, right + pad)), int(min(frame_h, bottom + pad)))
+            box_area = (box[2] - box[0]) * (box[3] - box[1])
+            max_fraction = ROI_RESUME_FRAME_FRACTION if tracking_full_frame else ROI_MAX_FRAME_FRACTION # Hysteresis
+            if box_area > max_fraction * frame_w * frame_h: box = (0, 0, frame_w, frame_h) # Not worth cropping: track on the full frame
+        with self._lock: self._box = box
 
-SETTINGS = ALL_PROFILES_DATA.get("profiles", {}).get(ACTIVE_PROFILE_NAME, get_default_settings())
-TUTORIAL_COMPLETED = ALL_PROFILES_DATA.get("tutorial_completed", False)
+    @staticmethod
+    def _contains(box, face, margin, frame_w, frame_h):
+        """True if the face bounds lie inside box with margin (box sides on the frame border need no margin)."""
+        x0, y0, x1, y1 = box; left, top, right, bottom = face
+        return ((left - x0 >= margin or x0 <= 0) and (top - y0 >= margin or y0 <= 0) and
+                (x1 - right >= margin or x1 >= frame_w) and (y1 - bottom >= margin or y1 >= frame_h))
 
-BLINK_THRESHOLD_MAP = {"Low": 0.0045, "Medium": 0.0055, "High": 0.0065}
-try: SCREEN_W, SCREEN_H = pyautogui.size()
-except Exception as e_scr_size: print(f"Warning: pyautogui.size() failed: {e_scr_size}. Using fallback."); SCREEN_W, SCREEN_H = 1920, 1080
+    def reset(self):
+        with self._lock: self._box = None
+# --- End Face Region-of-Interest Tracker ---
 
-MP_FACE_MESH = mp.solutions.face_mesh
+
+# --- Background FaceMesh Inference ---
+InferenceResult = namedtuple("InferenceResult", ["seq", "timestamp", "frame", "landmarks", "inference_ms", "error", "queue_ms", "done_time"])
+
+class InferenceResizer:
+    """Downscales images for inference into a reused buffer, reallocated only when the output size changes. Not thread-safe."""
+    def __init__(self):
+        self._buffer = None
+
+    def resize(self, image, scale):
+        """Returns image scaled by `scale`. The result is overwritten by the next call."""
+        size = (max(1, int(round(image.shape[1] * scale))), max(1, int(round(image.shape[0] * scale))))
+        if self._buffer is None or self._buffer.shape[1::-1] != size or self._buffer.shape[2:] != image.shape[2:]:
+            self._buffer = np.empty((size[1], size[0]) + image.shape[2:], dtype=image.dtype)
+        factor = 1.0 / scale # INTER_AREA is only fast for whole-number factors, and INTER_LINEAR aliases little above them
+        interpolation = cv2.INTER_AREA if abs(factor - round(factor)) < 1e-3 else cv2.INTER_LINEAR
+        cv2.resize(image, size, dst=self._buffer, interpolation=interpolation)
+        return self._buffer
+
+def inference_scale(frame_width, inference_width):
+    """Scale that brings a frame of frame_width down to an INFERENCE_RESOLUTIONS width (1.0 = leave as is)."""
+    return inference_width / frame_width if 0 < inference_width < frame_width else 1.0
+
+class FaceMeshDetector:
+    """Synchronous FaceMesh with optional ROI cropping. Not thread-safe: use one instance per thread.
+
+    With ROI cropping, the tracking mesh only ever sees face crops, a second tracking mesh only
+    full frames (faces too big to crop), and searches for a lost face go to a static-image mesh.
+    FaceMesh carries landmarks between calls in input-image coordinates, so mixing crops and
+    full frames in one instance would make it lose the face on every switch.
+    """
+    def __init__(self, roi_tracker=None):
+        import_mediapipe()
+        self.roi_tracker = roi_tracker # May be shared between detectors
+        self.inference_width = 0 # Key of INFERENCE_RESOLUTIONS; ROI crops are scaled like the full frame
+        self.input_scale = 1.0 # Further downscaling on top of inference_width (load shedding); landmarks stay normalized
+        self.refine_landmarks = True # Iris landmarks; the meshes are rebuilt on the inference thread when this changes
+        self._resizers = (InferenceResizer(), InferenceResizer()) # Crops and full frames differ in size: one buffer each
+        self._create_meshes()
+
+    def _create_meshes(self):
+        self._mesh_refine = self.refine_landmarks
+        self.tracking_mesh = self._create_mesh(static_image_mode=False, refine_landmarks=self._mesh_refine)
+        self.full_frame_tracking_mesh = self._create_mesh(static_image_mode=False, refine_landmarks=self._mesh_refine) if self.roi_tracker else None
+        self.full_frame_mesh = self._create_mesh(static_image_mode=True, refine_landmarks=self._mesh_refine) if self.roi_tracker else None
+
+    @staticmethod
+    def _create_mesh(static_image_mode, refine_landmarks=True):
+        return MP_FACE_MESH.FaceMesh(static_image_mode=static_image_mode, max_num_faces=1, refine_landmarks=refine_landmarks,
+                                     min_detection_confidence=0.6, min_tracking_confidence=0.6)
+
+    def detect(self, frame_rgb):
+        """Runs FaceMesh on the tracked face crop (or the full frame) of an RGB frame and returns full-frame landmarks, or None."""
+        if self.refine_landmarks != self._mesh_refine: self.close(); self._create_meshes()
+        scale = self.input_scale * inference_scale(frame_rgb.shape[1], self.inference_width)
+        crop_resizer, frame_resizer = self._resizers
+        if self.roi_tracker is None: return self._infer(self.tracking_mesh, frame_rgb, scale, frame_resizer)
+        try:
+            crop, roi = self.roi_tracker.crop(frame_rgb)
+            landmarks = None
+            if roi is None: pass # No face yet: search below
+            elif FaceRoiTracker.is_full_frame(roi, frame_rgb.shape): landmarks = self._infer(self.full_frame_tracking_mesh, frame_rgb, scale, frame_resizer)
+            else:
+                landmarks = self._infer(self.tracking_mesh, crop, scale, crop_resizer)
+                if landmarks is not None: FaceRoiTracker.map_to_frame(landmarks, roi, frame_rgb.shape)
+            if landmarks is None: # No face yet, or the face was lost: search the full frame
+                landmarks = self._infer(self.full_frame_mesh, frame_rgb, scale, frame_resizer)
+        except Exception:
+            self.roi_tracker.reset(); raise
+        self.roi_tracker.update(landmarks, frame_rgb.shape)
+        return landmarks
+
+    @staticmethod
+    def _infer(mesh, image_rgb, scale=1.0, resizer=None):
+        """Returns the first face's landmarks in an RGB image, or None. The caller's buffer is never modified."""
+        if scale < 1.0: rgb_view = (resizer or InferenceResizer()).resize(image_rgb, scale).view() # View: the buffer itself stays writeable
+        else:
+            rgb_view = np.ascontiguousarray(image_rgb) # Copies only ROI crops; full frames are passed through
+            if rgb_view is image_rgb: rgb_view = image_rgb.view() # Read-only flag on a view, so the GUI can still draw on the frame
+        rgb_view.flags.writeable = False
+        output = mesh.process(rgb_view)
+        return output.multi_face_landmarks[0].landmark if output.multi_face_landmarks else None
+
+    def close(self):
+        for mesh in (self.tracking_mesh, self.full_frame_tracking_mesh, self.full_frame_mesh):
+            if mesh is None: continue
+            try: mesh.close()
+            except Exception as e: print(f"Error closing FaceMesh: {e}")
+        self.tracking_mesh = self.full_frame_tracking_mesh = self.full_frame_mesh = None
+
+class FaceMeshInferenceWorker(QObject):
+    """Runs FaceMesh on background threads and delivers results to the GUI thread via a signal.
+
+    Each thread owns its own FaceMeshDetector (FaceMesh is stateful and not thread-safe).
+    Only the newest submitted frame waits for a free thread; older waiting frames are dropped.
+    """
+    result_ready = pyqtSignal(object) # Emits InferenceResult; queued to the receiver's (GUI) thread
+
+    def __init__(self, num_workers=INFERENCE_WORKER_COUNT, use_roi=ENABLE_FACE_ROI_CROP, parent=None):
+        super().__init__(parent)
+        num_workers = max(1, int(num_workers))
+        self.roi_tracker = FaceRoiTracker() if use_roi else None
+        # Models are created on the calling thread so initialization errors surface immediately
+        self._detectors = [FaceMeshDetector(self.roi_tracker) for _ in range(num_workers)]
+        self._pending = deque(maxlen=1) # Latest frame waiting for a worker
+        self._cond = threading.Condition()
+        self._closing = False
+        self.dropped_frames = 0 # Frames replaced in the queue before any worker picked them up
+        self._threads = [threading.Thread(target=self._run, args=(detector,), name=f"FaceMeshWorker-{i}", daemon=True)
+                         for i, detector in enumerate(self._detectors)]
+        for thread in self._threads: thread.start()
+
+    def submit(self, seq, timestamp, frame_rgb):
+        """Queues an RGB frame for inference without blocking; replaces any frame still waiting.
+
+        The frame comes back in the InferenceResult; it must not be modified until then.
+        """
+        with self._cond:
+            if self._closing: return
+            if self._pending: self.dropped_frames += 1
+            self._pending.append((seq, timestamp, frame_rgb, time.perf_counter()))
+            self._cond.notify()
+
+    def _run(self, detector):
+        """Worker loop: take the waiting frame, run FaceMesh, emit the result."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing: self._cond.wait()
+                if self._closing: return
+                seq, timestamp, frame_rgb, submit_time = self._pending.popleft()
+
+            start_time = time.perf_counter(); landmarks = None; error = None
+            try: landmarks = detector.detect(frame_rgb)
+            except Exception as e_process: error = e_process
+            done_time = time.perf_counter(); inference_ms = (done_time - start_time) * 1000
+            if self._closing: return
+            self.result_ready.emit(InferenceResult(seq, timestamp, frame_rgb, landmarks, inference_ms, error,
+                                                   (start_time - submit_time) * 1000, done_time))
+
+    def set_quality(self, input_scale, refine_landmarks):
+        """Sets the inference input scale and iris refinement for frames processed from now on (load shedding)."""
+        for detector in self._detectors: detector.input_scale = input_scale; detector.refine_landmarks = refine_landmarks
+
+    def set_resolution(self, inference_width):
+        """Sets the INFERENCE_RESOLUTIONS width for frames processed from now on."""
+        for detector in self._detectors: detector.inference_width = inference_width
+
+    def close(self):
+        """Stops the worker threads and releases the FaceMesh instances."""
+        with self._cond:
+            self._closing = True; self._pending.clear(); self._cond.notify_all()
+        for thread in self._threads:
+            if thread.is_alive(): thread.join(1.0)
+        for detector in self._detectors: detector.close()
+        self._detectors = []
+
+class FaceLandmarkerInferenceWorker(QObject):
+    """Runs the MediaPipe Tasks FaceLandmarker in LIVE_STREAM mode; same interface as FaceMeshInferenceWorker.
+
+    submit() hands the frame to MediaPipe's own graph thread and returns at once, so inference
+    overlaps with capture and cursor output. MediaPipe skips frames while it is busy; a result
+    implies every older pending frame was skipped. inference_ms covers submit to result and
+    queue_ms is 0, as the two can't be told apart in async mode.
+    """
+    result_ready = pyqtSignal(object) # Emits InferenceResult from MediaPipe's callback thread; queued to the receiver's (GUI) thread
+
+    def __init__(self, model_path=FACE_LANDMARKER_MODEL_PATH, parent=None):
+        super().__init__(parent)
+        if not os.path.isfile(model_path): raise FileNotFoundError(f"FaceLandmarker model '{model_path}' not found")
+        import_mediapipe()
+        self._lock = threading.Lock()
+        self._in_flight = {} # Timestamp (ms) -> (seq, timestamp, frame_rgb, submit_time); dicts keep insertion (= timestamp) order
+        self._last_timestamp_ms = -1
+        self._closing = False
+        self.dropped_frames = 0
+        self.inference_width = 0; self.input_scale = 1.0
+        self._resizer = InferenceResizer() # submit() runs on one thread, and mp.Image copies the pixels
+        options = mp.tasks.vision.FaceLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path), running_mode=mp.tasks.vision.RunningMode.LIVE_STREAM,
+            num_faces=1, min_face_detection_confidence=0.6, min_face_presence_confidence=0.6, min_tracking_confidence=0.6,
+            result_callback=self._on_result)
+        self._landmarker = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+
+    def submit(self, seq, timestamp, frame_rgb):
+        """Sends an RGB frame to FaceLandmarker without waiting for it (MediaPipe copies the pixels)."""
+        with self._lock:
+            if self._closing: return
+            timestamp_ms = max(int(timestamp * 1000), self._last_timestamp_ms + 1) # LIVE_STREAM needs strictly increasing timestamps
+            self._last_timestamp_ms = timestamp_ms
+            if len(self._in_flight) >= FACE_LANDMARKER_MAX_IN_FLIGHT:
+                del self._in_flight[next(iter(self._in_flight))]; self.dropped_frames += 1
+            self._in_flight[timestamp_ms] = (seq, timestamp, frame_rgb, time.perf_counter())
+        scale = self.input_scale * inference_scale(frame_rgb.shape[1], self.inference_width)
+        image_rgb = frame_rgb if scale >= 1.0 else self._resizer.resize(frame_rgb, scale)
+        self._landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb), timestamp_ms)
+
+    def set_quality(self, input_scale, refine_landmarks):
+        """Sets the input scale for frames submitted from now on; FaceLandmarker always outputs iris landmarks."""
+        self.input_scale = input_scale
+
+    def set_resolution(self, inference_width):
+        """Sets the INFERENCE_RESOLUTIONS width for frames submitted from now on."""
+        self.inference_width = inference_width
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """FaceLandmarker callback (MediaPipe thread): pairs the result with its frame and emits it."""
+        done_time = time.perf_counter()
+        with self._lock:
+            if self._closing: return
+            entry = self._in_flight.pop(timestamp_ms, None)
+            for older_ms in [ms for ms in self._in_flight if ms < timestamp_ms]: # Skipped by MediaPipe
+                del self._in_flight[older_ms]; self.dropped_frames += 1
+        if entry is None: return
+        seq, timestamp, frame_rgb, submit_time = entry
+        landmarks = result.face_landmarks[0] if result.face_landmarks else None # Full-frame normalized, with .x/.y/.z
+        self.result_ready.emit(InferenceResult(seq, timestamp, frame_rgb, landmarks, (done_time - submit_time) * 1000, None, 0.0, done_time))
+
+    def close(self):
+        """Stops accepting frames and releases the FaceLandmarker (waits for the graph to finish)."""
+        with self._lock: self._closing = True; self._in_flight.clear()
+        try: self._landmarker.close()
+        except Exception as e: print(f"Error closing FaceLandmarker: {e}")
+
+def create_inference_worker(backend):
+    """Returns a started inference worker for an INFERENCE_BACKENDS key."""
+    if backend == "face_landmarker": return FaceLandmarkerInferenceWorker()
+    return FaceMeshInferenceWorker()
+
+def create_inference_worker_with_fallback(backend):
+    """Like create_inference_worker, but falls back to FaceMesh. Returns (worker, backend used, fallback error or None)."""
+    try: return create_inference_worker(backend), backend, None
+    except Exception as e_backend:
+        if backend == "face_mesh": raise
+        print(f"Warning: {INFERENCE_BACKENDS[backend]} unavailable ({e_backend}). Falling back to FaceMesh.")
+        return create_inference_worker("face_mesh"), "face_mesh", e_backend
+
+def load_inference_worker(backend):
+    """Imports MediaPipe and builds the inference worker; safe to call off the GUI thread (startup)."""
+    import_mediapipe()
+    with STARTUP_PROFILER.stage("load face model"):
+        worker, used_backend, fallback_error = create_inference_worker_with_fallback(backend)
+    app = QCoreApplication.instance()
+    if app is not None: worker.moveToThread(app.thread()) # Its queued result signals must be owned by the GUI thread
+    return worker, used_backend, fallback_error
+# --- End Background FaceMesh Inference ---
+
+
+# --- Gaze & Click Processing ---
+# Eye points read per frame: left/right iris, the centre lid pair (top, bottom) of the left and right eye, then the lid pairs
+# either side of each centre. Left/right are as seen in the mirrored frame. Recordings made before the side pairs were
+# added hold only the first LEGACY_EYE_POINT_COUNT points.
+EYE_LANDMARK_INDICES = (473, 468, 159, 145, 386, 374, 160, 144, 158, 153, 385, 380, 387, 373)
+LEGACY_EYE_POINT_COUNT = 6
+EYE_LID_PAIR_ROWS = ((2, 3), (6, 7), (8, 9), (4, 5), (10, 11), (12, 13)) # (upper, lower) rows of the extracted points; left eye first
+LEGACY_EYE_FILL_ROWS = np.array([2, 3, 2, 3, 4, 5, 4, 5]) # Legacy recordings: side pairs repeat the centre pair
+FACE_MESH_BASE_POINT_COUNT = 468 # Mesh size without iris refinement (load shedding)
+EYE_CORNER_INDICES = (362, 263, 33, 133) # Corners of the eyes of the first and second iris; their midpoints stand in for the irises without refinement
+TrackingParams = namedtuple("TrackingParams", ["rect_padding", "outer_rect_gap", "blink_threshold", "long_blink_threshold", "double_blink_interval"])
+FrameOutcome = namedtuple("FrameOutcome", ["face_detected", "gaze_valid", "target_px", "rect", "rect_valid", "outer_rect", "outer_valid",
+                                           "in_movement_bounds", "in_click_bounds", "left_click", "mid_click", "double_click", "stage_ms",
+                                           "cursor_moved", "screen_pos"])
+
+class EyeLandmarkExtractor:
+    """Reads EYE_LANDMARK_INDICES into one preallocated array per frame and derives the gaze point and eye apertures from it.
+
+    An eye's aperture is its mean lid gap divided by the inter-ocular (iris to iris) distance,
+    both in pixels, so blink thresholds don't depend on how far the user sits from the camera.
+    """
+    def __init__(self):
+        self.points = np.empty((len(EYE_LANDMARK_INDICES), 2)) # Normalized (x, y), reused every frame
+        self._indices = np.array(EYE_LANDMARK_INDICES)
+        self._scale = np.ones(2)
+        # One matrix product gives the iris midpoint, the iris-to-iris vector and every upper-to-lower lid vector
+        self._combine = np.zeros((2 + len(EYE_LID_PAIR_ROWS), len(EYE_LANDMARK_INDICES)))
+        self._combine[0, :2] = 0.5; self._combine[1, 0] = 1.0; self._combine[1, 1] = -1.0
+        for row, (upper, lower) in enumerate(EYE_LID_PAIR_ROWS, start=2): self._combine[row, upper] = 1.0; self._combine[row, lower] = -1.0
+        self._derived = np.empty((len(self._combine), 2)); self._vectors = np.empty((len(self._combine) - 1, 2)); self._lengths = np.empty(len(self._combine) - 1)
+        # Averages each eye's lid gap lengths (lengths[0] is the inter-ocular distance)
+        pairs_per_eye = len(EYE_LID_PAIR_ROWS) // 2
+        self._average = np.zeros((2, len(self._lengths)))
+        self._average[0, 1:1 + pairs_per_eye] = 1.0 / pairs_per_eye; self._average[1, 1 + pairs_per_eye:] = 1.0 / pairs_per_eye
+
+    def extract(self, landmarks):
+        """Fills self.points from a MediaPipe landmark list or an (N, 2|3) array and returns it, or None if the mesh has too few points.
+
+        Arrays may also hold just the EYE_LANDMARK_INDICES points (landmark recordings), in the current or legacy layout.
+        """
+        points = self.points
+        if isinstance(landmarks, np.ndarray):
+            count = landmarks.shape[0]
+            if count == len(points): points[:] = landmarks[:, :2]
+            elif count == LEGACY_EYE_POINT_COUNT: points[:count] = landmarks[:, :2]; points[count:] = points[LEGACY_EYE_FILL_ROWS]
+            elif count > max(EYE_LANDMARK_INDICES): points[:] = landmarks[self._indices, :2]
+            elif count >= FACE_MESH_BASE_POINT_COUNT:
+                points[2:] = landmarks[self._indices[2:], :2]; points[:2] = landmarks[list(EYE_CORNER_INDICES), :2].reshape(2, 2, 2).mean(axis=1)
+            else: return None
+            return points
+        if len(landmarks) > max(EYE_LANDMARK_INDICES):
+            selected = [landmarks[index] for index in EYE_LANDMARK_INDICES]
+            points[:, 0] = [landmark.x for landmark in selected]; points[:, 1] = [landmark.y for landmark in selected]
+        elif len(landmarks) >= FACE_MESH_BASE_POINT_COUNT: # No iris refinement
+            selected = [landmarks[index] for index in EYE_CORNER_INDICES + EYE_LANDMARK_INDICES[2:]]
+            points[2:, 0] = [landmark.x for landmark in selected[4:]]; points[2:, 1] = [landmark.y for landmark in selected[4:]]
+            for row in range(2): points[row] = ((selected[2 * row].x + selected[2 * row + 1].x) * 0.5, (selected[2 * row].y + selected[2 * row + 1].y) * 0.5)
+        else: return None
+        return points
+
+    def measure(self, landmarks, frame_w, frame_h):
+        """Returns (gaze, apertures): the normalized iris midpoint and the (left, right) eye apertures, or None."""
+        points = self.extract(landmarks)
+        if points is None: return None
+        derived = np.dot(self._combine, points, out=self._derived)
+        self._scale[0] = frame_w; self._scale[1] = frame_h
+        vectors = np.multiply(derived[1:], self._scale, out=self._vectors) # Pixels, so distances are not skewed by the frame's aspect ratio
+        lengths = np.hypot(vectors[:, 0], vectors[:, 1], out=self._lengths)
+        if lengths[0] < 1e-6: return None
+        return derived[0].copy(), np.dot(self._average, lengths) / lengths[0]
+
+def tracking_params_from_settings(settings):
+    """Builds TrackingParams from a profile settings dict (missing keys use the defaults)."""
+    default_settings = get_default_settings()
+    get = lambda key: settings.get(key, default_settings[key])
+    return TrackingParams(rect_padding=get("rect_padding"), outer_rect_gap=_level_to_gap_px_static(get("outer_gap_level")),
+                          blink_threshold=BLINK_THRESHOLD_MAP.get(get("blink_threshold_level"), BLINK_THRESHOLD_MAP[default_settings["blink_threshold_level"]]),
+                          long_blink_threshold=get("long_blink_threshold"), double_blink_interval=get("double_blink_interval"))
+
+class GazeClickProcessor:
+    """Per-frame tracking logic shared by the GUI and the headless benchmark (no Qt, no camera).
+
+    Maps the iris midpoint inside the tracking rectangle to the screen, feeds SmoothCursor and
+    turns eyelid distances into left/middle/double click events. Clicks are only detected here:
+    the caller decides whether to dispatch them (the tutorial consumes them instead).
+    """
+    def __init__(self, smooth_cursor, screen_w, screen_h):
+        self.smooth_cursor = smooth_cursor
+        self.screen_w, self.screen_h = screen_w, screen_h
+        self.eye_extractor = EyeLandmarkExtractor()
+        self.reset()
+
+    def reset(self):
+        """Clears bounds, gaze and blink state for a fresh tracking session."""
+        self.was_out_of_bounds = True; self.last_valid_gaze_normalized = None
+        self.reset_click_timers()
+
+    def reset_click_timers(self):
+        self.blink_start_time = 0; self.both_eyes_closed_start_time = 0
+        self.last_both_eyes_closed_end_time = 0 # Tracks end of last "both closed" event for double click
+
+    def _lose_face(self):
+        """State reset when the face (or enough landmarks) is missing."""
+        self.last_valid_gaze_normalized = None
+        self.reset_click_timers()
+        self.was_out_of_bounds = True; self.smooth_cursor.reset_sticking()
+
+    @staticmethod
+    def tracking_rects(frame_w, frame_h, params):
+        """Returns (rect, rect_valid, outer_rect, outer_valid); rects are (left, top, right, bottom) in frame pixels."""
+        rect_left = max(0, params.rect_padding); rect_right = min(frame_w - 1, frame_w - params.rect_padding)
+        rect_top = max(0, params.rect_padding); rect_bottom = min(frame_h - 1, frame_h - params.rect_padding)
+        rect_valid = (rect_right > rect_left and rect_bottom > rect_top)
+        outer_left = max(0, rect_left - params.outer_rect_gap); outer_top = max(0, rect_top - params.outer_rect_gap)
+        outer_right = min(frame_w - 1, rect_right + params.outer_rect_gap); outer_bottom = min(frame_h - 1, rect_bottom + params.outer_rect_gap)
+        outer_valid = (outer_right > outer_left and outer_bottom > outer_top)
+        return (rect_left, rect_top, rect_right, rect_bottom), rect_valid, (outer_left, outer_top, outer_right, outer_bottom), outer_valid
+
+    def map_to_screen(self, target_x_px, target_y_px, rect):
+        """Maps a gaze point inside the tracking rectangle to screen pixels (edges get EDGE_MAP_MARGIN_PX of slack)."""
+        rect_left, rect_top, rect_right, rect_bottom = rect
+        screen_x, screen_y = -1.0, -1.0
+        effective_left = rect_left + EDGE_MAP_MARGIN_PX; effective_right = rect_right - EDGE_MAP_MARGIN_PX
+        effective_top = rect_top + EDGE_MAP_MARGIN_PX; effective_bottom = rect_bottom - EDGE_MAP_MARGIN_PX
+        if effective_right > effective_left and effective_bottom > effective_top:
+            effective_range_x = float(effective_right - effective_left); effective_range_y = float(effective_bottom - effective_top)
+            norm_x_raw = (float(target_x_px) - effective_left) / effective_range_x; norm_y_raw = (float(target_y_px) - effective_top) / effective_range_y
+            norm_x = max(0.0, min(1.0, norm_x_raw)); norm_y = max(0.0, min(1.0, norm_y_raw))
+            screen_x = norm_x * float(self.screen_w); screen_y = norm_y * float(self.screen_h)
+        else: # Fallback if margin too large
+            range_x, range_y = float(rect_right - rect_left), float(rect_bottom - rect_top)
+            if range_x > 0 and range_y > 0:
+                norm_x = max(0.0, min(1.0, (float(target_x_px) - rect_left) / range_x)); norm_y = max(0.0, min(1.0, (float(target_y_px) - rect_top) / range_y))
+                screen_x = norm_x * float(self.screen_w); screen_y = norm_y * float(self.screen_h)
+        if screen_x == -1.0 or screen_y == -1.0: return None
+        return max(0.0, min(screen_x, float(self.screen_w - 1))), max(0.0, min(screen_y, float(self.screen_h - 1)))
+
+    def process(self, landmarks, frame_w, frame_h, params, move_cursor=True, detect_clicks=True, now=None, frame_time=None):
+        """Runs gaze mapping, cursor smoothing and blink/click detection for one frame.
+
+        landmarks are full-frame normalized (MediaPipe list or array), or None if no face was found.
+        move_cursor is False while tracking is stopped or the tutorial runs. now is the frame time in
+        seconds (defaults to time.time(); replays pass recorded timestamps). frame_time is the capture
+        time on the perf_counter clock, handed to SmoothCursor for latency reporting. Returns a FrameOutcome.
+        """
+        stage_start = time.perf_counter(); stage_ms = {}
+        current_time = time.time() if now is None else now
+        rect, rect_valid, outer_rect, outer_valid = self.tracking_rects(frame_w, frame_h, params)
+        rect_left, rect_top, rect_right, rect_bottom = rect
+        outer_left, outer_top, outer_right, outer_bottom = outer_rect
+        target_x_px, target_y_px = -1, -1
+        left_click, mid_click, double_click = False, False, False
+        in_movement_bounds = False; gaze_in_click_bounds = False
+
+        eye = self.eye_extractor.measure(landmarks, frame_w, frame_h) if landmarks is not None else None
+        if eye is None: # No face, or face structure detected but not enough landmarks
+            self._lose_face()
+            stage_ms["mapping"] = (time.perf_counter() - stage_start) * 1000
+            return FrameOutcome(landmarks is not None, False, None, rect, rect_valid, outer_rect, outer_valid,
+                                False, False, False, False, False, stage_ms, False, None)
+
+        # --- Gaze Calculation ---
+        gaze, eye_apertures = eye
+        mid_x_norm, mid_y_norm = float(gaze[0]), float(gaze[1])
+        self.last_valid_gaze_normalized = (mid_x_norm, mid_y_norm)
+        target_x_px = int(mid_x_norm * frame_w); target_y_px = int(mid_y_norm * frame_h)
+        target_x_px = max(0, min(target_x_px, frame_w - 1)); target_y_px = max(0, min(target_y_px, frame_h - 1))
+        in_movement_bounds = rect_valid and (rect_left <= target_x_px <= rect_right and rect_top <= target_y_px <= rect_bottom)
+        gaze_in_click_bounds = outer_valid and (outer_left <= target_x_px <= outer_right and outer_top <= target_y_px <= outer_bottom)
+
+        # --- Cursor Movement Logic ---
+        screen_pos = None
+        if move_cursor:
+            if in_movement_bounds:
+                if self.was_out_of_bounds: # Re-entered bounds: start smoothing afresh
+                    self.smooth_cursor.reset_smoothing()
+                screen_pos = self.map_to_screen(target_x_px, target_y_px, rect)
+                self.was_out_of_bounds = False
+            else: # Out of movement bounds (but face detected)
+                self.was_out_of_bounds = True; self.smooth_cursor.reset_sticking()
+        mapping_end = time.perf_counter(); stage_ms["mapping"] = (mapping_end - stage_start) * 1000
+        cursor_moved = False
+        if screen_pos is not None:
+            cursor_moved = self.smooth_cursor.update_position(np.array(screen_pos), timestamp=frame_time)
+        smoothing_end = time.perf_counter(); stage_ms["smoothing"] = (smoothing_end - mapping_end) * 1000
+
+        # --- Blink/Click Detection Logic (needed for the tutorial too) ---
+        if detect_clicks:
+            is_l_closed = bool(eye_apertures[0] < params.blink_threshold); is_r_closed = bool(eye_apertures[1] < params.blink_threshold)
+            currently_both_closed = is_l_closed and is_r_closed
+
+            # --- Double Click (Rapid Both Eyes Closed Twice) ---
+            if currently_both_closed:
+                if self.both_eyes_closed_start_time == 0: # Just closed both eyes
+                    self.both_eyes_closed_start_time = current_time
+                    # Check if this closure is within the interval of the *last* closure ending
+                    if self.last_both_eyes_closed_end_time != 0 and (current_time - self.last_both_eyes_closed_end_time) <= params.double_blink_interval and gaze_in_click_bounds:
+                        double_click = True
+                        # Reset timers immediately after detecting double click
+                        self.both_eyes_closed_start_time = 0
+                        self.last_both_eyes_closed_end_time = 0
+            else: # Both eyes are not currently closed
+                if self.both_eyes_closed_start_time != 0: # Both eyes were closed, now just opened
+                    duration_both_closed = current_time - self.both_eyes_closed_start_time
+                    # Record the time this "both closed" event ended
+                    self.last_both_eyes_closed_end_time = current_time
+
+                    # --- Middle Click (Hold Both Eyes) --- Check duration *after* opening
+                    if duration_both_closed >= MIDDLE_CLICK_HOLD_DURATION and gaze_in_click_bounds:
+                        mid_click = True
+                        # Reset timers as the hold action is complete
+                        self.both_eyes_closed_start_time = 0
+                        self.last_both_eyes_closed_end_time = 0 # Middle click ends the sequence
+                    else:
+                        # Reset only the start time, keep the end time for potential double click
+                        self.both_eyes_closed_start_time = 0
+
+            # --- Left Click (Long Left Eye Only Blink) ---
+            # Only process if double or middle click didn't happen
+            if not double_click and not mid_click:
+                if is_l_closed and not is_r_closed: # Left eye just closed or is held closed
+                    if self.blink_start_time == 0: self.blink_start_time = current_time
+                else: # Left eye is open OR both eyes are closed (handled above)
+                    # If a left blink was in progress, process its end
+                    if self.blink_start_time != 0:
+                        duration = current_time - self.blink_start_time
+                        # Check bounds *at the moment eye opens*; only LONG blinks click
+                        if gaze_in_click_bounds and duration >= params.long_blink_threshold:
+                            left_click = True
+                        self.blink_start_time = 0
+        stage_ms["clicks"] = (time.perf_counter() - smoothing_end) * 1000
+
+        return FrameOutcome(True, True, (target_x_px, target_y_px), rect, rect_valid, outer_rect, outer_valid,
+                            in_movement_bounds, gaze_in_click_bounds, left_click, mid_click, double_click, stage_ms, cursor_moved,
+                            tuple(screen_pos) if screen_pos is not None else None)
+# --- End Gaze & Click Processing ---
+
+
+# --- Stage Latency Statistics ---
+class StageLatencyStats:
+    """Per-stage latency samples (ms) with percentile summaries and histograms.
+
+    With a window, only the most recent samples per stage are kept (rolling statistics for
+    the live panel); window=None keeps everything (headless benchmark runs).
+    """
+    def __init__(self, window=LATENCY_STATS_WINDOW, stages=()):
+        self.window = window
+        self._samples = {stage: deque(maxlen=window) for stage in stages} # Stage name -> ms values; given stages keep their order
+
+    def add(self, stage, ms):
+        samples = self._samples.get(stage)
+        if samples is None: samples = self._samples[stage] = deque(maxlen=self.window)
+        samples.append(ms)
+
+    def add_many(self, stage_ms):
+        for stage, ms in stage_ms.items(): self.add(stage, ms)
+
+    def clear(self):
+        for samples in self._samples.values(): samples.clear()
+
+    def stages(self): return list(self._samples)
+
+    def summary(self):
+        """Returns {stage: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}."""
+        result = {}
+        for stage, samples in self._samples.items():
+            if not samples: continue
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples))
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[stage] = {"count": int(values.size), "mean_ms": float(values.mean()), "p50_ms": float(p50),
+                             "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(values.max())}
+        return result
+
+    def histograms(self, edges_ms=LATENCY_HISTOGRAM_EDGES_MS):
+        """Returns {stage: counts} over edges_ms; the last bin also counts anything above the final edge."""
+        edges = np.asarray(edges_ms, dtype=np.float64)
+        return {stage: np.histogram(np.clip(np.fromiter(samples, dtype=np.float64), edges[0], edges[-1]), bins=edges)[0].tolist()
+                for stage, samples in self._samples.items() if samples}
+
+    def format_table(self):
+        """Returns the summary as a fixed-width text table."""
+        summary = self.summary()
+        if not summary: return "No samples yet."
+        lines = [f"{'Stage':<17} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}  (ms)"]
+        for stage, stats in summary.items():
+            lines.append(f"{stage:<17} {stats['p50_ms']:7.2f} {stats['p95_ms']:7.2f} {stats['p99_ms']:7.2f} {stats['max_ms']:7.2f}")
+        return "\n".join(lines)
+
+    def export(self, path, extra=None, sections=None):
+        """Writes the summary and histograms to path: CSV if it ends in .csv, JSON otherwise.
+
+        sections maps a name to another StageLatencyStats exported alongside (CSV rows are prefixed with it).
+        """
+        sections = sections or {}
+        if path.lower().endswith(".csv"):
+            with open(path, "w") as file:
+                file.write("stage,count,mean_ms,p50_ms,p95_ms,p99_ms,max_ms\n")
+                for prefix, stats_source in [("", self)] + [(name + ".", stats) for name, stats in sections.items()]:
+                    for stage, stats in stats_source.summary().items():
+                        file.write(f"{prefix}{stage},{stats['count']},{stats['mean_ms']:.4f},{stats['p50_ms']:.4f},{stats['p95_ms']:.4f},{stats['p99_ms']:.4f},{stats['max_ms']:.4f}\n")
+        else:
+            report = dict(extra or {})
+            report.update({"stages": self.summary(), "histogram_edges_ms": list(LATENCY_HISTOGRAM_EDGES_MS), "histograms": self.histograms()})
+            for name, stats in sections.items(): report[name] = {"stages": stats.summary(), "histograms": stats.histograms()}
+            with open(path, "w") as file: json.dump(report, file, indent=4)
+# --- End Stage Latency Statistics ---
+
+
+# --- Load Shedding ---
+def load_processed_fps(capture_mode, level=0):
+    """Frame rate the app aims to process at a LOAD_LEVELS index for a negotiated capture mode (None = driver default)."""
+    fps = min((capture_mode or {}).get("fps") or LOAD_SHED_DEFAULT_FPS, LOAD_SHED_TARGET_FPS)
+    return fps / LOAD_SHED_SKIP_DIVISOR if level >= LOAD_LEVELS.index("Frame Skipping") else fps
+
+def load_budget_ms(capture_mode, level=0):
+    """Per-frame work budget at a LOAD_LEVELS index: a fraction of the processed frame interval."""
+    return LOAD_SHED_BUDGET_FRACTION * 1000.0 / load_processed_fps(capture_mode, level)
+
+class LoadSheddingController:
+    """Picks a LOAD_LEVELS index from per-frame work time (ms) measured against the level's budget.
+
+    Steps down a level after LOAD_SHED_DOWN_HOLD seconds over budget, and back up after
+    up_hold seconds below LOAD_SHED_HEADROOM_FRACTION of the next level up's budget. Relapsing
+    soon after stepping up doubles up_hold, so a level the machine can't sustain isn't retried
+    every few seconds.
+    """
+    def __init__(self, capture_mode=None):
+        self.capture_mode = capture_mode # Negotiated mode of the open camera; sets the processed frame rate
+        self.level = 0; self.up_hold = LOAD_SHED_UP_HOLD; self.last_step_up_time = None
+        self.trigger_ms = None # Average work time that caused the last level change
+        self.reset()
+
+    @property
+    def budget_ms(self): return load_budget_ms(self.capture_mode, self.level)
+
+    def reset(self):
+        """Forgets the work average and hold timers (keeps the level)."""
+        self.work_ms = None; self._over_since = None; self._headroom_since = None
+
+    def update(self, work_ms, now):
+        """Adds one frame's work time; returns the new level if it changed, else None."""
+        self.work_ms = work_ms if self.work_ms is None else self.work_ms + LOAD_SHED_EMA_WEIGHT * (work_ms - self.work_ms)
+        if self.work_ms > self.budget_ms:
+            self._headroom_since = None
+            if self._over_since is None: self._over_since = now
+            if self.level < len(LOAD_LEVELS) - 1 and now - self._over_since >= LOAD_SHED_DOWN_HOLD:
+                relapsed = self.last_step_up_time is not None and now - self.last_step_up_time < 2 * self.up_hold
+                self.up_hold = min(self.up_hold * 2, LOAD_SHED_MAX_UP_HOLD) if relapsed else LOAD_SHED_UP_HOLD
+                return self._set_level(self.level + 1)
+            return None
+        self._over_since = None
+        if self.work_ms < load_budget_ms(self.capture_mode, max(self.level - 1, 0)) * LOAD_SHED_HEADROOM_FRACTION:
+            if self._headroom_since is None: self._headroom_since = now
+            if self.level > 0 and now - self._headroom_since >= self.up_hold:
+                self.last_step_up_time = now
+                return self._set_level(self.level - 1)
+        else: self._headroom_since = None
+        return None
+
+    def _set_level(self, level):
+        self.level = level; self.trigger_ms = self.work_ms; self.reset() # The workload changes with the level: measure afresh
+        return level
+# --- End Load Shedding ---
+
+
+# --- Landmark Recording & Replay ---
+def landmark_record_dtype(num_points):
+    """Record layout: capture timestamp (s), frame (width, height), face flag, normalized (x, y, z) points."""
+    return np.dtype([("timestamp", "<f8"), ("frame_size", "<u2", (2,)), ("face", "u1"), ("points", "<f4", (num_points, 3))])
+
+def _npy_header(dtype, count):
+    """Builds a version 1.0 .npy header of exactly LANDMARK_RECORD_HEADER_BYTES for a 1-D array of records."""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.lib.format.dtype_to_descr(dtype), count)
+    header = header.ljust(LANDMARK_RECORD_HEADER_BYTES - 11) + "\n" # 10 bytes magic/version/length before it
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+class LandmarkRecorder:
+    """Appends one fixed-size record per processed frame to a memory-mappable .npy file.
+
+    Only EYE_LANDMARK_INDICES are stored unless full_mesh is set. The header's record count is
+    written on close(); load_landmark_recording also recovers files cut short by a crash.
+    """
+    def __init__(self, path, full_mesh=LANDMARK_RECORD_FULL_MESH):
+        self.path = path
+        self.indices = None if full_mesh else list(EYE_LANDMARK_INDICES)
+        self.dtype = landmark_record_dtype(478 if full_mesh else len(EYE_LANDMARK_INDICES))
+        self.count = 0
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._file = open(path, "wb")
+        self._file.write(_npy_header(self.dtype, 0))
+
+    def write(self, timestamp, frame_w, frame_h, landmarks):
+        """Appends a record; landmarks is a MediaPipe landmark list (full frame, normalized) or None."""
+        record = self._record
+        record["timestamp"] = timestamp; record["frame_size"] = (frame_w, frame_h); record["points"] = np.nan
+        has_face = landmarks is not None and len(landmarks) >= FACE_MESH_BASE_POINT_COUNT
+        record["face"] = has_face
+        if has_face:
+            refined = len(landmarks) > max(EYE_LANDMARK_INDICES)
+            indices = self.indices if self.indices is not None else range(min(len(landmarks), record["points"].shape[1]))
+            points = record["points"][0]
+            points[:len(indices)] = [(landmarks[i].x, landmarks[i].y, landmarks[i].z) if refined or i < FACE_MESH_BASE_POINT_COUNT else (np.nan,) * 3 for i in indices]
+            if not refined: # No iris refinement: the eye-corner midpoints stand in for the iris centres, as in EyeLandmarkExtractor
+                corners = np.array([(landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in EYE_CORNER_INDICES]).reshape(2, 2, 3).mean(axis=1)
+                iris_rows = [0, 1] if self.indices is not None else list(EYE_LANDMARK_INDICES[:2])
+                points[iris_rows] = corners
+        self._file.write(record.tobytes()); self.count += 1
+
+    def close(self):
+        if self._file is None: return
+        self._file.seek(0); self._file.write(_npy_header(self.dtype, self.count))
+        self._file.close(); self._file = None
+
+def load_landmark_recording(path):
+    """Memory-maps a landmark recording and returns its structured record array (read-only)."""
+    with open(path, "rb") as file:
+        version = np.lib.format.read_magic(file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        _, _, dtype = read_header(file)
+        header_size = file.tell()
+    if dtype.names is None or "points" not in dtype.names: raise ValueError(f"'{path}' is not a landmark recording")
+    count = (os.path.getsize(path) - header_size) // dtype.itemsize # Trust the file size: covers unclosed recordings
+    if count == 0: return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=header_size, shape=(count,))
+# --- End Landmark Recording & Replay ---
 
 
 # --- Main Application Window ---
 class CursorViaCamApp(QWidget):
-    def __init__(self):
+    startup_finished = pyqtSignal() # Emitted once the background startup tasks are done (successfully or not)
+
+    def __init__(self, cursor_backend=CURSOR_BACKEND):
         super().__init__()
+        ensure_profiles_loaded()
         # Use globals loaded safely above
         self.all_profiles_data = ALL_PROFILES_DATA
         self.active_profile_name = ACTIVE_PROFILE_NAME
         # Ensure settings are a distinct copy for the active profile
         self.settings = self.all_profiles_data["profiles"].get(self.active_profile_name, get_default_settings()).copy()
         self.tutorial_completed = TUTORIAL_COMPLETED
-        self.smooth_cursor = SmoothCursor()
-        self.cursor_highlighter = CursorHighlighterWindow() # Create highlighter instance
+        # The real cursor sink (and pyautogui) is created on a startup worker; until then a placeholder sized like the primary screen stands in
+        screen = QApplication.primaryScreen(); screen_size = screen.size() if screen else None
+        self.cursor_backend = cursor_backend
+        self.smooth_cursor = SmoothCursor(FakeCursorSink(*((screen_size.width(), screen_size.height()) if screen_size and not screen_size.isEmpty() else (1920, 1080))))
+        self.cursor_highlighter = CursorHighlighterWindow(cursor_position=self.smooth_cursor.cursor.position) # Create highlighter instance
 
         # Runtime variables - will be correctly initialized by apply_settings_to_runtime
         self.rect_padding = 0
@@ -729,19 +2548,43 @@ class CursorViaCamApp(QWidget):
         self.long_blink_threshold = 0
         self.double_blink_interval = 0 # NEW
         self.enable_cursor_highlight = False # Runtime state for highlighter
+        self.preview_mode = "Full" # Key of PREVIEW_MODES
+        self.last_preview_time = 0.0 # perf_counter() of the last frame shown in the preview
+        self.preview_surfaces = None # Two label-sized pixmaps drawn alternately; rebuilt on camera_label resize
+        self.preview_surface_index = 0
+        self.preview_letterbox = None # ((frame_w, frame_h), QRect of the video inside the label)
 
         # State variables
-        self.running = False; self._internal_tracking_active = False; self.cam = None; self.face_mesh = None
-        self.was_out_of_bounds = True; self.blink_start_time = 0
-        self.both_eyes_closed_start_time = 0
-        self.last_both_eyes_closed_end_time = 0 # NEW: Track end of last "both closed" event for double click
+        self.running = False; self._internal_tracking_active = False; self.cam = None; self.inference_worker = None; self.active_inference_backend = None
+        self.capture_thread = None # CameraCaptureThread feeding frames from self.cam
+        self.active_capture_mode = None # Mode negotiated for the open camera (None = driver default)
+        self.active_high_res_capture = False # Whether that mode was negotiated with high-res capture preferred
+        self.frame_submit_seq = 0 # Increases for every frame sent to the inference worker
+        self.last_result_seq = 0 # Seq of the newest inference result applied; older results are dropped
+        self.stale_results_dropped = 0
+        self.typical_result_age = None # Running average of capture-to-result age (s) of in-order results
+        self.last_inference_ms = 0
+        self.gaze_processor = GazeClickProcessor(self.smooth_cursor, self.smooth_cursor.screen_width, self.smooth_cursor.screen_height) # Gaze mapping, blink timers, click detection
+        self.landmark_recorder = None # LandmarkRecorder while "Record Landmarks" is checked
         self.available_cameras = []
-        self.last_valid_gaze_normalized = None
+        self.cameras_from_cache = False # True while available_cameras came from the config cache unverified
+        self.camera_discovery = CameraDiscoveryWorker(self)
+        self.camera_discovery.finished.connect(self.handle_cameras_discovered)
+        self.startup_worker = StartupWorker(self); self.startup_worker.task_finished.connect(self._on_startup_task_finished)
+        self.startup_pending = set() # Names of startup tasks still running
+        self.startup_camera_request = None # (camera index, capture mode, high res) of the startup camera open
+        self.is_closing = False
 
         # Timing & Performance
-        self.timer = QTimer(self); self.timer.timeout.connect(self.update_frame)
+        self.frame_scheduler = FrameArrivalScheduler(self); self.frame_scheduler.frame_ready.connect(self._on_frame_arrival)
+        self.timer = QTimer(self); self.timer.timeout.connect(self._frame_watchdog) # Frame loop runs on arrival; this only covers stalled feeds
+        self.last_face_time = 0.0 # perf_counter() of the last result with a face (frame rate selection)
         self.frame_processing_time = 0; self.last_frame_time = time.perf_counter()
+        self.load_controller = LoadSheddingController() # Steps quality down when frames take longer than the camera interval
         self.fps_history = deque(maxlen=10) # For smoothing FPS display
+        self.latency_stats = StageLatencyStats(stages=LIVE_LATENCY_STAGES) # Rolling per-stage timings for the "Stages" panel
+        self.e2e_stats = StageLatencyStats(stages=END_TO_END_STAGES) # Frame-to-cursor-move latency breakdown
+        self.latency_panel_timer = QTimer(self); self.latency_panel_timer.timeout.connect(self.refresh_latency_panel)
 
         self.error_dialog = QErrorMessage(self); self.error_dialog.setWindowTitle("CursorViaCam Error")
         self.tutorial_state = TUTORIAL_STATE_IDLE
@@ -757,15 +2600,83 @@ class CursorViaCamApp(QWidget):
 
         # Center window on screen
         self.center_window()
-        # Initialize MediaPipe and Camera
-        self.initialize_dependencies()
         # Update performance display initially
         self.update_performance_display()
         self.update_status("Initializing", COLOR_START)
-
-        # Set final UI state based on initialization success and tutorial status
-        if self.cam and self.cam.isOpened() and self.face_mesh:
-            self.timer.start(15) # Start processing frames immediately
+        # Load MediaPipe, open the camera and create the cursor backend in the background; the window shows meanwhile
+        self.set_settings_controls_enabled(False); self.start_button.setEnabled(False); self.rerun_tutorial_button.setVisible(False)
+        self.start_background_initialization()
+
+
+    # --- Background Startup ---
+    def start_background_initialization(self):
+        """Starts the slow startup steps on worker threads; _finish_startup runs when the last one reports back."""
+        self.startup_pending = {"inference", "cursor"}
+        backend = self.settings.get("inference_backend", "face_mesh")
+        print(f"Initializing MediaPipe {INFERENCE_BACKENDS.get(backend, backend)}...")
+        self.startup_worker.start("inference", lambda: load_inference_worker(backend))
+        self.startup_worker.start("cursor", lambda: create_cursor_sink(self.cursor_backend))
+        if self.cameras_from_cache: self._start_startup_camera_open(self.settings.get("capture_mode"))
+        else: self.startup_pending.add("cameras"); self.startup_worker.start("cameras", discover_cameras)
+        self._update_startup_progress()
+
+    def _start_startup_camera_open(self, capture_mode):
+        """Opens the configured camera on a startup worker; capture_mode is the mode previously negotiated for it."""
+        cam_index, high_res = self.settings.get("camera_index", 0), bool(self.settings.get("high_res_capture", False))
+        self.startup_camera_request = (cam_index, capture_mode, high_res)
+        backend = self._camera_backend(cam_index)
+        self.startup_pending.add("camera")
+        self.startup_worker.start("camera", lambda: open_camera(cam_index, backend, capture_mode, high_res))
+
+    def _update_startup_progress(self):
+        if self.startup_pending:
+            self.update_status("Loading " + ", ".join(STARTUP_TASK_LABELS[n] for n in sorted(self.startup_pending)) + "...", COLOR_START)
+
+    def _on_startup_task_finished(self, name, result, error):
+        """Slot for StartupWorker: adopts each finished startup step on the GUI thread."""
+        self.startup_pending.discard(name)
+        if self.is_closing: # Window closed while loading: just release what arrived
+            if name == "inference" and result: result[0].close()
+            elif name == "camera" and result and result[0] is not None: result[0].release()
+            return
+        if name == "inference":
+            if error is None: self._adopt_inference_worker(*result)
+            else: self._report_inference_failure(error)
+        elif name == "cursor":
+            if error is not None: print(f"Warning: Cursor backend could not be created ({error}).")
+            else:
+                self.smooth_cursor.set_cursor_sink(result)
+                self.gaze_processor.screen_w, self.gaze_processor.screen_h = self.smooth_cursor.screen_width, self.smooth_cursor.screen_height
+        elif name == "cameras":
+            cameras = result if error is None else []
+            print(f"Detected {len(cameras)} camera(s).")
+            self.available_cameras = cameras; self.cameras_from_cache = False
+            if cameras: self.store_camera_cache(cameras)
+            else: print("Warning: No cameras detected!"); self.show_error_message("No working cameras detected.")
+            self.fill_camera_selector()
+            if cameras:
+                previous = self.startup_camera_request # Set when this is a re-detection after the cached camera failed
+                self._start_startup_camera_open(None if previous and previous[0] != self.settings.get("camera_index", 0) else self.settings.get("capture_mode"))
+        elif name == "camera":
+            cam_index, stored_mode, high_res = self.startup_camera_request
+            cam, mode = result if error is None else (None, None)
+            if cam is not None:
+                self._adopt_camera(cam, mode, high_res)
+                if mode != stored_mode or self.settings.get("capture_mode") != stored_mode:
+                    self.settings["capture_mode"] = mode
+                    self.save_current_profile_settings() # Persist the newly negotiated mode
+            elif self.cameras_from_cache:
+                # The cached camera list is stale (device unplugged/renumbered): detect again and retry
+                print("Cached camera failed to open. Re-detecting cameras...")
+                self.startup_pending.add("cameras"); self.startup_worker.start("cameras", discover_cameras)
+        self._update_startup_progress()
+        if not self.startup_pending: self._finish_startup()
+
+    def _finish_startup(self):
+        """Sets the final UI state once the inference worker and camera are known to be up (or not)."""
+        print(f"Startup ready after {STARTUP_PROFILER.mark('ready') * 1000:.0f} ms.")
+        if self.cam and self.cam.isOpened() and self.inference_worker:
+            self.timer.start(FRAME_WATCHDOG_INTERVAL_MS) # Frames are processed as they arrive
             self._internal_tracking_active = True
             if not self.tutorial_completed:
                 # Start tutorial automatically if not completed
@@ -780,17 +2691,20 @@ class CursorViaCamApp(QWidget):
         else:
              # Initialization failed
              self._internal_tracking_active = False
-             error_msg = "CAM/MP Error" if not (self.cam and self.cam.isOpened() and self.face_mesh) else ("CAM Error" if not (self.cam and self.cam.isOpened()) else "MP Init Fail")
+             error_msg = "CAM/MP Error" if not (self.cam and self.cam.isOpened() and self.inference_worker) else ("CAM Error" if not (self.cam and self.cam.isOpened()) else "MP Init Fail")
              QTimer.singleShot(500, lambda: self.update_status(error_msg, COLOR_ERROR))
              self.set_settings_controls_enabled(False) # Disable settings
              self.start_button.setEnabled(False) # Disable start
              self.rerun_tutorial_button.setVisible(False) # Hide tutorial button
+        self.startup_finished.emit()
 
 
     # --- Mapping Helper Functions ---
     def _level_to_padding(self, level): return _level_to_padding_static(level)
     def _padding_to_level(self, padding): return _padding_to_level_static(padding)
     def _level_to_gap_px(self, level): return _level_to_gap_px_static(level)
+    def _tracking_params(self):
+        return TrackingParams(self.rect_padding, self.outer_rect_gap, self.blink_threshold, self.long_blink_threshold, self.double_blink_interval)
 
     def center_window(self):
         """Centers the application window on the primary screen."""
@@ -804,13 +2718,6 @@ class CursorViaCamApp(QWidget):
             self.move(window_geometry.topLeft())
         except Exception as e: print(f"Error centering window: {e}")
 
-    def initialize_dependencies(self):
-        """Initializes Face Mesh and the selected Camera."""
-        self.initialize_face_mesh()
-        # Use the camera index from the loaded settings
-        current_cam_index = self.settings.get("camera_index", 0)
-        self.init_camera(current_cam_index)
-
     # UPDATED apply_settings_to_runtime (Double Click Interval ADDED)
     def apply_settings_to_runtime(self):
         """Applies settings from self.settings dict to internal variables and SmoothCursor."""
@@ -824,14 +2731,18 @@ class CursorViaCamApp(QWidget):
         self.long_blink_threshold = self.settings.get("long_blink_threshold", default_settings["long_blink_threshold"])
         self.double_blink_interval = self.settings.get("double_blink_interval", default_settings["double_blink_interval"]) # NEW
         self.enable_cursor_highlight = self.settings.get("enable_cursor_highlight", default_settings["enable_cursor_highlight"])
+        self.preview_mode = self.settings.get("preview_mode", default_settings["preview_mode"])
 
         # Update SmoothCursor parameters
         self.smooth_cursor.set_smoothing_params(
-            window=self.settings.get("smooth_window_internal", default_settings["smooth_window_internal"])
+            window=self.settings.get("smooth_window_internal", default_settings["smooth_window_internal"]),
+            filter_kind=self.settings.get("smoothing_filter", default_settings["smoothing_filter"])
         )
         enable_sticking_setting = self.settings.get("enable_button_sticking", default_settings["enable_button_sticking"])
-        self.smooth_cursor.enable_sticking = enable_sticking_setting and IS_WINDOWS
-        if not self.smooth_cursor.enable_sticking: self.smooth_cursor.reset_sticking()
+        self.smooth_cursor.set_sticking(enable_sticking_setting and IS_WINDOWS)
+        self.smooth_cursor.set_prediction(self.settings.get("enable_prediction", default_settings["enable_prediction"]))
+        self.smooth_cursor.set_output_rate(self.settings.get("cursor_output_hz", default_settings["cursor_output_hz"]))
+        if self.inference_worker is not None: self.inference_worker.set_resolution(self.settings.get("inference_width", default_settings["inference_width"]))
 
         # Update highlighter visibility based on the new runtime setting
         # Ensure this runs after the highlighter object exists
@@ -872,10 +2783,27 @@ class CursorViaCamApp(QWidget):
         camera_feed_width, camera_feed_height = 540, 405 # Keep feed size
         self.camera_label.setFixedSize(camera_feed_width, camera_feed_height); self.camera_label.setStyleSheet("background-color: black; color: red; border: 1px solid gray;"); self.camera_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         left_layout.addWidget(self.camera_label, alignment=Qt.AlignmentFlag.AlignHCenter)
+        self.camera_label.installEventFilter(self) # Invalidates the preview surfaces on resize
 
         perf_layout = QHBoxLayout(); self.fps_label = QLabel("FPS: --"); self.proc_time_label = QLabel("Proc: -- ms")
-        perf_layout.addWidget(self.fps_label); perf_layout.addStretch(1); perf_layout.addWidget(self.proc_time_label)
-        left_layout.addLayout(perf_layout); left_layout.addStretch(1) # Push perf info down
+        self.latency_toggle_button = QPushButton("Stages \u25b8"); self.latency_toggle_button.setCheckable(True); self.latency_toggle_button.setFlat(True)
+        self.latency_toggle_button.setToolTip("Show per-stage latency percentiles (p50/p95/p99) over the last frames.")
+        self.load_label = QLabel(f"Quality: {LOAD_LEVELS[0]}")
+        self.load_label.setToolTip("Automatic load shedding. When frames take longer than the frame interval, quality steps down:\n" + " \u2192 ".join(LOAD_LEVELS) + "\nIt steps back up when there is headroom again.")
+        perf_layout.addWidget(self.fps_label); perf_layout.addStretch(1); perf_layout.addWidget(self.load_label); perf_layout.addStretch(1)
+        perf_layout.addWidget(self.proc_time_label); perf_layout.addWidget(self.latency_toggle_button)
+        left_layout.addLayout(perf_layout)
+
+        # Expandable per-stage latency panel (hidden by default; only refreshed while shown)
+        self.latency_panel = QFrame(); self.latency_panel.setFrameShape(QFrame.Shape.StyledPanel); self.latency_panel.setVisible(False)
+        latency_layout = QVBoxLayout(self.latency_panel); latency_layout.setContentsMargins(6, 4, 6, 4)
+        self.latency_table_label = QLabel("No samples yet."); latency_font = QFont("Monospace"); latency_font.setStyleHint(QFont.StyleHint.Monospace)
+        self.latency_table_label.setFont(latency_font); latency_layout.addWidget(self.latency_table_label)
+        latency_buttons = QHBoxLayout(); latency_buttons.addStretch(1)
+        self.latency_reset_button = QPushButton("Reset"); self.latency_reset_button.setToolTip("Discard collected timings.")
+        self.latency_export_button = QPushButton("Export..."); self.latency_export_button.setToolTip("Save percentiles and histograms to a JSON or CSV file.")
+        latency_buttons.addWidget(self.latency_reset_button); latency_buttons.addWidget(self.latency_export_button); latency_layout.addLayout(latency_buttons)
+        left_layout.addWidget(self.latency_panel); left_layout.addStretch(1) # Push perf info down
 
         # --- Right Side (Controls / Tutorial Stack) ---
         self.right_stack = QStackedWidget()
@@ -905,7 +2833,8 @@ class CursorViaCamApp(QWidget):
         grid_row = 0
         # Camera Selector
         grid_layout.addWidget(QLabel("Camera:"), grid_row, 0); self.camera_selector = QComboBox(); self.camera_selector.setToolTip("Select the camera device to use for tracking.")
-        self.populate_camera_selector(); grid_layout.addWidget(self.camera_selector, grid_row, 1, 1, 2); grid_row += 1
+        self.refresh_cameras_button = QPushButton("Refresh"); self.refresh_cameras_button.setToolTip("Detect cameras again (e.g. after plugging one in).")
+        self.populate_camera_selector(defer_discovery=True); grid_layout.addWidget(self.camera_selector, grid_row, 1); grid_layout.addWidget(self.refresh_cameras_button, grid_row, 2); grid_row += 1
         # Track Area Slider
         grid_layout.addWidget(QLabel("Track Area Level:"), grid_row, 0); self.padding_slider = QSlider(Qt.Orientation.Horizontal)
         self.padding_slider.setToolTip("Adjust Track Area Level: Controls dead zone size.\nHigher level = Smaller dead zone."); self.padding_slider.setRange(MIN_TRACK_AREA_LEVEL, MAX_TRACK_AREA_LEVEL)
@@ -919,6 +2848,34 @@ class CursorViaCamApp(QWidget):
         # Blink Sensitivity Selector
         grid_layout.addWidget(QLabel("Blink Sens:"), grid_row, 0); self.blink_selector = QComboBox(); self.blink_selector.setToolTip("Set sensitivity for blink detection.")
         self.blink_selector.addItems(list(BLINK_THRESHOLD_MAP.keys())); grid_layout.addWidget(self.blink_selector, grid_row, 1, 1, 2); grid_row += 1
+        # Smoothing Filter Selector
+        grid_layout.addWidget(QLabel("Smoothing:"), grid_row, 0); self.smoothing_selector = QComboBox()
+        self.smoothing_selector.setToolTip("Cursor smoothing filter.\nMoving Average: steady, lags by about half its window. One Euro: steady when still, quick when moving.\nKalman: follows steady motion with little lag.")
+        for filter_key, filter_label in SMOOTHING_FILTERS.items(): self.smoothing_selector.addItem(filter_label, userData=filter_key)
+        grid_layout.addWidget(self.smoothing_selector, grid_row, 1, 1, 2); grid_row += 1
+        # Preview Mode Selector
+        grid_layout.addWidget(QLabel("Preview:"), grid_row, 0); self.preview_selector = QComboBox()
+        self.preview_selector.setToolTip(f"Camera preview: full rate, {PREVIEW_REDUCED_RATE_HZ} Hz, fast (lower quality) scaling, or off.\nLower settings save CPU; tracking is unaffected.")
+        for mode_key, mode_label in PREVIEW_MODES.items(): self.preview_selector.addItem(mode_label, userData=mode_key)
+        grid_layout.addWidget(self.preview_selector, grid_row, 1, 1, 2); grid_row += 1
+        # Cursor Output Rate Selector
+        grid_layout.addWidget(QLabel("Cursor Rate:"), grid_row, 0); self.cursor_rate_selector = QComboBox()
+        self.cursor_rate_selector.setToolTip("How often the cursor is moved.\nHigher rates glide between camera frames for smoother motion, adding about one frame of lag; 'Per Frame' jumps once per frame.")
+        for rate_hz, rate_label in CURSOR_OUTPUT_RATES.items(): self.cursor_rate_selector.addItem(rate_label, userData=rate_hz)
+        grid_layout.addWidget(self.cursor_rate_selector, grid_row, 1, 1, 2); grid_row += 1
+        # Inference Backend Selector
+        grid_layout.addWidget(QLabel("Inference:"), grid_row, 0); self.inference_selector = QComboBox()
+        self.inference_selector.setToolTip(f"Face landmark model.\nFaceMesh: built in. FaceLandmarker: MediaPipe Tasks model run asynchronously, overlapping with capture\n(needs '{FACE_LANDMARKER_MODEL_PATH}' next to the app).")
+        for backend_key, backend_label in INFERENCE_BACKENDS.items(): self.inference_selector.addItem(backend_label, userData=backend_key)
+        grid_layout.addWidget(self.inference_selector, grid_row, 1, 1, 2); grid_row += 1
+        # Inference Resolution Selector & High-Res Capture
+        grid_layout.addWidget(QLabel("Inference Res:"), grid_row, 0); self.inference_res_selector = QComboBox()
+        self.inference_res_selector.setToolTip("Width frames are scaled down to before face landmark inference.\nLower is cheaper; tracking still uses full camera coordinates.")
+        for res_width, res_label in INFERENCE_RESOLUTIONS.items(): self.inference_res_selector.addItem(res_label, userData=res_width)
+        grid_layout.addWidget(self.inference_res_selector, grid_row, 1)
+        self.high_res_checkbox = QCheckBox("HD Capture")
+        self.high_res_checkbox.setToolTip("Capture at 720p/1080p when the camera supports it, for a sharper preview.\nPair with a lower inference resolution. Padding and gap are in camera pixels, so they may need adjusting.")
+        grid_layout.addWidget(self.high_res_checkbox, grid_row, 2); grid_row += 1
 
         # Configure grid column stretch factors
         grid_layout.setColumnStretch(0, 0); grid_layout.setColumnStretch(1, 1); grid_layout.setColumnStretch(2, 0)
@@ -933,6 +2890,12 @@ class CursorViaCamApp(QWidget):
         self.highlight_checkbox = QCheckBox("Cursor Highlighter")
         self.highlight_checkbox.setToolTip("Show a colored ring around the cursor indicating tracking status.")
         checkbox_layout.addWidget(self.highlight_checkbox)
+        self.prediction_checkbox = QCheckBox("Predictive Motion")
+        self.prediction_checkbox.setToolTip("Lead the cursor along the gaze motion to compensate for camera, inference and smoothing latency.")
+        checkbox_layout.addWidget(self.prediction_checkbox)
+        self.record_checkbox = QCheckBox("Record Landmarks")
+        self.record_checkbox.setToolTip(f"Record per-frame eye landmarks (no video) to '{LANDMARK_RECORD_DIR}/' for replay with --benchmark.")
+        checkbox_layout.addWidget(self.record_checkbox)
         control_layout.addLayout(checkbox_layout) # Add the checkbox layout
 
         control_layout.addStretch(1) # Push tutorial button down
@@ -1008,12 +2971,33 @@ class CursorViaCamApp(QWidget):
 
 
     # --- Camera Population & Selection ---
-    def populate_camera_selector(self):
-        """Detects available cameras and populates the camera selection dropdown."""
-        self.available_cameras = self.get_available_cameras()
-        self.camera_selector.clear()
+    def populate_camera_selector(self, force_discovery=False, defer_discovery=False):
+        """Fills the camera dropdown, from the camera cache when it knows the configured camera.
+
+        Cached entries are not re-probed here; the configured camera is revalidated when it is opened
+        (see _on_startup_task_finished). force_discovery probes all devices and refreshes the cache;
+        defer_discovery instead shows a placeholder and leaves probing to the startup worker.
+        """
+        saved_cam_index = self.settings.get("camera_index", 0)
+        cached_cameras = self.all_profiles_data.get("camera_cache", {}).get("cameras", [])
+        if not force_discovery and any(c['index'] == saved_cam_index for c in cached_cameras):
+            print(f"Using cached camera list ({len(cached_cameras)} device(s)).")
+            self.available_cameras = [dict(c) for c in cached_cameras]; self.cameras_from_cache = True
+        elif defer_discovery:
+            self.available_cameras = []; self.cameras_from_cache = False
+            self.camera_selector.blockSignals(True); self.camera_selector.clear(); self.camera_selector.addItem("Detecting cameras...")
+            self.camera_selector.setEnabled(False); self.camera_selector.blockSignals(False)
+            return
+        else:
+            self.available_cameras = self.get_available_cameras(); self.cameras_from_cache = False
+        self.fill_camera_selector()
+
+    def fill_camera_selector(self):
+        """Rebuilds the dropdown from self.available_cameras without triggering a camera switch."""
         saved_cam_index = self.settings.get("camera_index", 0)
         qt_index_to_select = -1 # Default to no selection
+        self.camera_selector.blockSignals(True)
+        self.camera_selector.clear()
 
         if self.available_cameras:
             for i, cam_info in enumerate(self.available_cameras):
@@ -1043,48 +3027,50 @@ class CursorViaCamApp(QWidget):
             # No cameras found
             self.camera_selector.addItem("No Cameras Found")
             self.camera_selector.setEnabled(False) # Disable selector
+        self.camera_selector.blockSignals(False)
 
-    def get_available_cameras(self, max_to_check=5):
-        """Checks multiple camera indices using OpenCV to find available devices."""
-        available = []; print("Detecting cameras...")
-        for i in range(max_to_check):
-            cap_test = None; backend_name = "Default"; name = f"Camera {i}"
-            preferred_api = cv2.CAP_DSHOW if IS_WINDOWS else cv2.CAP_ANY # Prefer DSHOW on Windows
-
-            try:
-                # Try preferred backend first
-                cap_test = cv2.VideoCapture(i, preferred_api)
-                if cap_test and cap_test.isOpened():
-                    backend_name = "DSHOW" if preferred_api == cv2.CAP_DSHOW else "OS Default"
-                else: # If preferred failed, try system default (CAP_ANY)
-                    if cap_test: cap_test.release(); cap_test = None # Release failed attempt
-                    # print(f"  Camera {i}: Preferred backend ({preferred_api}) failed. Trying CAP_ANY.")
-                    cap_test = cv2.VideoCapture(i, cv2.CAP_ANY)
-                    if cap_test and cap_test.isOpened():
-                        backend_name = "CAP_ANY"
-                    else:
-                        # print(f"  Camera {i}: Both backends failed.")
-                        if cap_test: cap_test.release(); cap_test = None
-                        continue # Skip this index if both fail
-
-                # If successfully opened with either backend
-                if cap_test and cap_test.isOpened():
-                    name = f"Camera {i} ({backend_name})"
-                    ret, frame = cap_test.read() # Try reading a frame
-                    if ret and frame is not None:
-                        h, w, _ = frame.shape
-                        if w > 0 and h > 0: # Check for valid dimensions
-                            available.append({'index': i, 'name': name, 'backend': backend_name}); print(f"  Found: {name} ({w}x{h})")
-                        else: print(f"  Skipping {name}: Invalid resolution {w}x{h}")
-                    else: print(f"  Skipping {name}: Failed to read frame")
-            except Exception as e: print(f"Error checking camera {i}: {e}")
-            finally:
-                # Ensure camera is released
-                if cap_test and cap_test.isOpened(): cap_test.release()
-
+    def get_available_cameras(self, max_to_check=CAMERA_DISCOVERY_MAX_INDEX):
+        """Probes camera indices concurrently and stores the working ones in the camera cache."""
+        print("Detecting cameras...")
+        available = discover_cameras(max_to_check)
         if not available: print("Warning: No cameras detected!"); self.show_error_message("No working cameras detected.")
+        else: self.store_camera_cache(available)
         return available
 
+    def store_camera_cache(self, cameras):
+        """Saves the known-good cameras and their working backends for the next startup."""
+        self.all_profiles_data["camera_cache"] = validate_camera_cache({"cameras": cameras})
+        save_profiles(self.all_profiles_data)
+
+    def _camera_backend(self, index):
+        """Returns the backend that last worked for camera `index` ("Default" if unknown)."""
+        cam_info = next((c for c in self.available_cameras if c['index'] == index), None)
+        return cam_info.get('backend', 'Default') if cam_info else "Default"
+
+    def refresh_cameras(self):
+        """Re-detects cameras in the background; the open camera is kept without being re-probed."""
+        if not self._is_ok_to_change_settings(): return
+        skip_indices = ()
+        if self.cam and self.cam.isOpened(): skip_indices = (self.settings.get("camera_index", 0),) # Busy: cannot be re-opened
+        if self.camera_discovery.start(skip_indices=skip_indices):
+            self.refresh_cameras_button.setEnabled(False); self.refresh_cameras_button.setText("Scanning...")
+
+    def handle_cameras_discovered(self, cameras):
+        """Slot for CameraDiscoveryWorker: updates the camera list and cache."""
+        self.refresh_cameras_button.setText("Refresh"); self.refresh_cameras_button.setEnabled(self._is_ok_to_change_settings())
+        if self.cam and self.cam.isOpened(): # Keep the entry of the camera skipped because it is in use
+            open_index = self.settings.get("camera_index", 0)
+            open_info = next((c for c in self.available_cameras if c['index'] == open_index), None)
+            if open_info and not any(c['index'] == open_index for c in cameras):
+                cameras = sorted(cameras + [open_info], key=lambda c: c['index'])
+        print(f"Camera refresh found {len(cameras)} device(s).")
+        self.available_cameras = cameras; self.cameras_from_cache = False
+        if cameras: self.store_camera_cache(cameras)
+        self.fill_camera_selector()
+        # The configured camera disappeared and nothing is open: switch to the selected one
+        if cameras and not (self.cam and self.cam.isOpened()) and self._is_ok_to_change_settings():
+            self.handle_camera_change(self.camera_selector.currentIndex(), called_internally=True)
+
     def show_error_message(self, message):
         """Displays an error message in a popup dialog."""
         # Ensure error dialog exists
@@ -1099,19 +3085,31 @@ class CursorViaCamApp(QWidget):
         # Buttons
         self.start_button.clicked.connect(self.start_tracking)
         self.stop_button.clicked.connect(self.stop_tracking)
+        self.latency_toggle_button.toggled.connect(self.toggle_latency_panel)
+        self.latency_reset_button.clicked.connect(self.reset_latency_stats)
+        self.latency_export_button.clicked.connect(self.export_latency_stats)
         # Profile Management
         self.profile_combo.activated.connect(self.select_profile) # User selects from dropdown
         self.save_profile_button.clicked.connect(self.save_profile_as)
         self.delete_profile_button.clicked.connect(self.delete_profile)
         # Settings Controls
         self.camera_selector.currentIndexChanged.connect(self.update_camera_selection) # User OR programmatic change
+        self.refresh_cameras_button.clicked.connect(self.refresh_cameras)
         self.padding_slider.valueChanged.connect(self.update_padding_level_display) # Update label continuously
         self.padding_slider.sliderReleased.connect(self.save_padding_level_setting) # Save on release
         self.gap_level_slider.valueChanged.connect(self.update_gap_level_display) # Update label continuously
         self.gap_level_slider.sliderReleased.connect(self.save_gap_level_setting) # Save on release
         self.blink_selector.activated.connect(self.update_blink_threshold_selection) # User selects from dropdown
+        self.smoothing_selector.activated.connect(self.update_smoothing_filter_selection)
+        self.inference_selector.activated.connect(self.update_inference_backend_selection)
+        self.inference_res_selector.activated.connect(self.update_inference_resolution_selection) # Allowed any time (tracking/tutorial)
+        self.high_res_checkbox.stateChanged.connect(self.toggle_high_res_capture)
+        self.preview_selector.activated.connect(self.update_preview_mode_selection) # Allowed any time (tracking/tutorial)
+        self.cursor_rate_selector.activated.connect(self.update_cursor_rate_selection) # Allowed any time (tracking/tutorial)
         self.sticking_checkbox.stateChanged.connect(self.toggle_sticking) # Checkbox toggled
         self.highlight_checkbox.stateChanged.connect(self.toggle_highlight) # Highlight checkbox toggled
+        self.prediction_checkbox.stateChanged.connect(self.toggle_prediction)
+        self.record_checkbox.stateChanged.connect(self.toggle_landmark_recording) # Session-only, not a profile setting
         # Tutorial Controls
         self.rerun_tutorial_button.clicked.connect(lambda: self.run_tutorial())
         self.tutorial_skip_button.clicked.connect(self.mark_tutorial_skipped)
@@ -1132,7 +3130,7 @@ class CursorViaCamApp(QWidget):
         qt_cam_idx_to_select = self.camera_selector.findData(saved_cam_index) # Find item by stored system index
         if qt_cam_idx_to_select != -1:
             self.camera_selector.setCurrentIndex(qt_cam_idx_to_select)
-        elif self.camera_selector.count() > 0: # If saved index not found, select first item
+        elif self.available_cameras: # If saved index not found, select first item (the list may still be being detected)
              print(f"Warning: Saved camera index {saved_cam_index} not found in UI selector. Setting UI to first.")
              self.camera_selector.setCurrentIndex(0)
 
@@ -1152,6 +3150,19 @@ class CursorViaCamApp(QWidget):
         blink_idx = self.blink_selector.findText(blink_level_str)
         if blink_idx != -1: self.blink_selector.setCurrentIndex(blink_idx)
         else: self.blink_selector.setCurrentIndex(self.blink_selector.findText("Medium"))
+        filter_idx = self.smoothing_selector.findData(self.settings.get("smoothing_filter", "moving_average"))
+        self.smoothing_selector.setCurrentIndex(filter_idx if filter_idx != -1 else 0)
+        backend_idx = self.inference_selector.findData(self.settings.get("inference_backend", "face_mesh"))
+        self.inference_selector.setCurrentIndex(backend_idx if backend_idx != -1 else 0)
+        res_idx = self.inference_res_selector.findData(self.settings.get("inference_width", 0))
+        self.inference_res_selector.setCurrentIndex(res_idx if res_idx != -1 else 0)
+        self.high_res_checkbox.setChecked(bool(self.settings.get("high_res_capture", False)))
+
+        # Preview Selector
+        preview_idx = self.preview_selector.findData(self.settings.get("preview_mode", "Full"))
+        self.preview_selector.setCurrentIndex(preview_idx if preview_idx != -1 else 0)
+        rate_idx = self.cursor_rate_selector.findData(self.settings.get("cursor_output_hz", 0))
+        self.cursor_rate_selector.setCurrentIndex(rate_idx if rate_idx != -1 else 0)
 
         # Sticking Checkbox
         enable_sticking = self.settings.get("enable_button_sticking", IS_WINDOWS) and IS_WINDOWS
@@ -1162,6 +3173,7 @@ class CursorViaCamApp(QWidget):
         enable_highlight = self.settings.get("enable_cursor_highlight", False)
         self.highlight_checkbox.setChecked(enable_highlight)
         # Highlight checkbox is always enabled if the control panel is enabled
+        self.prediction_checkbox.setChecked(bool(self.settings.get("enable_prediction", False)))
 
         self.block_setting_signals(False) # Re-enable signals
 
@@ -1170,8 +3182,9 @@ class CursorViaCamApp(QWidget):
         """Blocks or unblocks signals for settings-related widgets to prevent loops."""
         widgets_to_block = [
             self.padding_slider, self.gap_level_slider,
-            self.blink_selector, self.sticking_checkbox, self.highlight_checkbox, # Added highlight checkbox
-            self.camera_selector, self.profile_combo,
+            self.blink_selector, self.sticking_checkbox, self.highlight_checkbox, self.prediction_checkbox,
+            self.camera_selector, self.profile_combo, self.preview_selector, self.cursor_rate_selector, self.smoothing_selector, self.inference_selector,
+            self.inference_res_selector, self.high_res_checkbox,
         ]
         for widget in widgets_to_block:
             if widget:
@@ -1247,6 +3260,8 @@ class CursorViaCamApp(QWidget):
 
         # Check if the loaded profile requires a camera change and handle it
         self._check_and_handle_camera_change_for_profile()
+        self._check_capture_resolution_for_profile()
+        self._check_inference_backend_for_profile()
 
         # Save the updated active profile name and potentially updated old profile data
         save_profiles(self.all_profiles_data)
@@ -1307,6 +3322,8 @@ class CursorViaCamApp(QWidget):
             self.apply_settings_to_runtime() # Apply Default settings to runtime vars AND highlighter
             self.apply_settings_to_ui()    # Apply Default settings to UI widgets
             self._check_and_handle_camera_change_for_profile() # Check if Default profile needs camera change
+            self._check_capture_resolution_for_profile() # ...a different capture resolution
+            self._check_inference_backend_for_profile() # ...and a different inference backend
             self.update_status(f"Profile '{profile_to_delete}' deleted", COLOR_IDLE)
 
     # --- Helper for Settings Changes ---
@@ -1429,20 +3446,24 @@ class CursorViaCamApp(QWidget):
         print(f"Switching camera to index {actual_cam_index} ({selected_cam_info['name']})...")
         selected_backend_name = selected_cam_info.get('backend', 'Default')
 
-        if self.init_camera(actual_cam_index, preferred_backend=selected_backend_name):
+        # A stored capture mode only belongs to the camera it was negotiated for
+        stored_mode = self.settings.get("capture_mode") if actual_cam_index == current_setting_cam_index else None
+        if self.init_camera(actual_cam_index, preferred_backend=selected_backend_name, capture_mode=stored_mode):
             # --- Success ---
             print(f"Camera {actual_cam_index} initialized successfully.")
             self.settings["camera_index"] = actual_cam_index # Update setting in memory
+            mode_changed = self.active_capture_mode != self.settings.get("capture_mode")
+            self.settings["capture_mode"] = self.active_capture_mode # Stored next to camera_index
             # Save the setting ONLY if the change was initiated by the user via UI OR if internally corrected
             if not called_internally: # User action always saves
                  self.save_current_profile_settings()
-            elif called_internally and current_setting_cam_index != actual_cam_index: # Profile load corrected
-                 print("Saving corrected camera index from profile load.")
+            elif called_internally and (current_setting_cam_index != actual_cam_index or mode_changed): # Profile load corrected
+                 print("Saving corrected camera index/capture mode from profile load.")
                  self.save_current_profile_settings() # Save the correction
 
             self.update_status("Camera Changed", COLOR_IDLE)
             self._internal_tracking_active = True # Mark system as ready
-            if not self.timer.isActive(): self.timer.start(15) # Ensure timer is running
+            if not self.timer.isActive(): self.timer.start(FRAME_WATCHDOG_INTERVAL_MS) # Ensure the watchdog is running
             # Restart tracking if it was running before and tutorial is not active
             if was_running and self._is_ok_to_change_settings():
                 QTimer.singleShot(100, self.start_tracking)
@@ -1555,6 +3576,83 @@ class CursorViaCamApp(QWidget):
                 self.apply_settings_to_runtime() # Apply change
                 self.save_current_profile_settings() # Save change
 
+    def update_smoothing_filter_selection(self, index):
+        """Handles smoothing filter dropdown change (user interaction)."""
+        if self.smoothing_selector.signalsBlocked(): return
+        if not self._is_ok_to_change_settings():
+            QMessageBox.warning(self, "Tutorial Active", "Please complete or skip the tutorial before changing settings.")
+            self.smoothing_selector.blockSignals(True)
+            self.smoothing_selector.setCurrentIndex(max(0, self.smoothing_selector.findData(self.settings.get("smoothing_filter", "moving_average"))))
+            self.smoothing_selector.blockSignals(False)
+            return
+        filter_kind = self.smoothing_selector.itemData(index)
+        if filter_kind in SMOOTHING_FILTERS:
+            self.settings["smoothing_filter"] = filter_kind
+            self.apply_settings_to_runtime() # Apply change
+            self.save_current_profile_settings() # Save change
+
+    def update_inference_backend_selection(self, index):
+        """Handles inference backend dropdown change (user interaction); restarts the inference worker."""
+        if self.inference_selector.signalsBlocked(): return
+        if not self._is_ok_to_change_settings():
+            QMessageBox.warning(self, "Tutorial Active", "Please complete or skip the tutorial before changing settings.")
+            self.inference_selector.blockSignals(True)
+            self.inference_selector.setCurrentIndex(max(0, self.inference_selector.findData(self.settings.get("inference_backend", "face_mesh"))))
+            self.inference_selector.blockSignals(False)
+            return
+        backend = self.inference_selector.itemData(index)
+        if backend not in INFERENCE_BACKENDS: return
+        self.settings["inference_backend"] = backend
+        self._check_inference_backend_for_profile()
+        if self.active_inference_backend != backend: # Fell back to FaceMesh: show and store what is actually running
+            self.settings["inference_backend"] = self.active_inference_backend or "face_mesh"
+            self.inference_selector.blockSignals(True)
+            self.inference_selector.setCurrentIndex(max(0, self.inference_selector.findData(self.settings["inference_backend"])))
+            self.inference_selector.blockSignals(False)
+        self.save_current_profile_settings()
+
+    def update_inference_resolution_selection(self, index):
+        """Handles inference resolution dropdown change. Takes effect from the next frame, so it is allowed while tracking."""
+        if self.inference_res_selector.signalsBlocked(): return
+        res_width = self.inference_res_selector.itemData(index)
+        if res_width not in INFERENCE_RESOLUTIONS: return
+        self.settings["inference_width"] = res_width
+        self.apply_settings_to_runtime()
+        if self._is_ok_to_change_settings(): self.save_current_profile_settings() # Otherwise saved with the profile later
+
+    def toggle_high_res_capture(self, state_int):
+        """Handles HD capture checkbox change; renegotiates the camera's capture mode."""
+        if self.high_res_checkbox.signalsBlocked() or state_int == 1: return
+        if not self._is_ok_to_change_settings():
+            QMessageBox.warning(self, "Tutorial Active", "Please complete or skip the tutorial before changing settings.")
+            self.high_res_checkbox.blockSignals(True)
+            self.high_res_checkbox.setChecked(bool(self.settings.get("high_res_capture", False)))
+            self.high_res_checkbox.blockSignals(False)
+            return
+        self.settings["high_res_capture"] = (state_int == Qt.CheckState.Checked.value)
+        self.settings["capture_mode"] = None # Negotiated under the other preference
+        self._check_capture_resolution_for_profile()
+        self.save_current_profile_settings()
+
+    def update_preview_mode_selection(self, index):
+        """Handles preview mode dropdown change. Only affects drawing, so it is allowed while tracking."""
+        if self.preview_selector.signalsBlocked(): return
+        mode = self.preview_selector.itemData(index)
+        if mode not in PREVIEW_MODES: return
+        self.settings["preview_mode"] = mode
+        self.apply_settings_to_runtime()
+        if mode == "Off": self.display_error_on_feed("Preview Off")
+        if self._is_ok_to_change_settings(): self.save_current_profile_settings() # Otherwise saved with the profile later
+
+    def update_cursor_rate_selection(self, index):
+        """Handles cursor output rate dropdown change. Takes effect immediately, so it is allowed while tracking."""
+        if self.cursor_rate_selector.signalsBlocked(): return
+        rate_hz = self.cursor_rate_selector.itemData(index)
+        if rate_hz not in CURSOR_OUTPUT_RATES: return
+        self.settings["cursor_output_hz"] = rate_hz
+        self.apply_settings_to_runtime()
+        if self._is_ok_to_change_settings(): self.save_current_profile_settings() # Otherwise saved with the profile later
+
     def toggle_sticking(self, state_int):
         """Handles button sticking checkbox change."""
         if not self.sticking_checkbox.signalsBlocked():
@@ -1581,6 +3679,39 @@ class CursorViaCamApp(QWidget):
             self.apply_settings_to_runtime() # Apply change
             self.save_current_profile_settings() # Save change
 
+    def toggle_prediction(self, state_int):
+        """Handles predictive motion checkbox change."""
+        if self.prediction_checkbox.signalsBlocked() or state_int == 1: return
+        if not self._is_ok_to_change_settings():
+            QMessageBox.warning(self, "Tutorial Active", "Please complete or skip the tutorial before changing settings.")
+            self.prediction_checkbox.blockSignals(True)
+            self.prediction_checkbox.setChecked(bool(self.settings.get("enable_prediction", False)))
+            self.prediction_checkbox.blockSignals(False)
+            return
+        self.settings["enable_prediction"] = (state_int == Qt.CheckState.Checked.value)
+        self.apply_settings_to_runtime()
+        self.save_current_profile_settings()
+
+    def toggle_landmark_recording(self, state_int):
+        """Starts or stops writing landmark records for every processed frame."""
+        if state_int == Qt.CheckState.Checked.value and self.landmark_recorder is None:
+            path = os.path.join(LANDMARK_RECORD_DIR, time.strftime("landmarks_%Y%m%d_%H%M%S.npy"))
+            try:
+                os.makedirs(LANDMARK_RECORD_DIR, exist_ok=True)
+                self.landmark_recorder = LandmarkRecorder(path)
+                print(f"Recording landmarks to {path}")
+            except (IOError, OSError) as e:
+                self.show_error_message(f"Cannot start landmark recording:\n{e}")
+                self.record_checkbox.blockSignals(True); self.record_checkbox.setChecked(False); self.record_checkbox.blockSignals(False)
+        elif state_int == Qt.CheckState.Unchecked.value:
+            self._stop_landmark_recording()
+
+    def _stop_landmark_recording(self):
+        if self.landmark_recorder is None: return
+        try: self.landmark_recorder.close(); print(f"Saved {self.landmark_recorder.count} landmark records to {self.landmark_recorder.path}")
+        except (IOError, OSError) as e: print(f"Error closing landmark recording: {e}")
+        self.landmark_recorder = None
+
     def toggle_highlight(self, state_int):
         """Handles cursor highlight checkbox change."""
         if not self.highlight_checkbox.signalsBlocked():
@@ -1605,7 +3736,7 @@ class CursorViaCamApp(QWidget):
             # If enabling, try to update position immediately
             if enabled:
                  try:
-                     x, y = pyautogui.position()
+                     x, y = self.smooth_cursor.cursor.position()
                      self.cursor_highlighter.update_position(x, y)
                      # Set initial color based on current status
                      # Determine current status color more reliably
@@ -1640,65 +3771,89 @@ class CursorViaCamApp(QWidget):
 
     # --- Core Logic Methods ---
     def initialize_face_mesh(self):
-        """Initializes the MediaPipe Face Mesh model."""
-        if self.face_mesh:
-            try: self.face_mesh.close(); self.face_mesh = None
+        """Initializes the profile's inference backend (INFERENCE_BACKENDS) in a background inference worker."""
+        if self.inference_worker:
+            try: self.inference_worker.close(); self.inference_worker = None
             except Exception as e: print(f"Error closing previous FaceMesh: {e}")
-        print("Initializing MediaPipe Face Mesh..."); self.face_mesh = None
-        try:
-            # Adjusted confidence slightly
-            self.face_mesh = MP_FACE_MESH.FaceMesh(max_num_faces=1, refine_landmarks=True, min_detection_confidence=0.6, min_tracking_confidence=0.6)
-            print("Face Mesh Initialized.")
-        except Exception as e:
-            print(f"FATAL: Error initializing FaceMesh: {e}"); self.face_mesh = None
-            self.show_error_message(f"Failed to initialize MediaPipe Face Mesh:\n{e}\nTracking disabled.")
+        backend = self.settings.get("inference_backend", "face_mesh")
+        print(f"Initializing MediaPipe {INFERENCE_BACKENDS.get(backend, backend)}..."); self.inference_worker = None
+        try: self._adopt_inference_worker(*create_inference_worker_with_fallback(backend))
+        except Exception as e: self._report_inference_failure(e)
+
+    def _adopt_inference_worker(self, worker, backend, fallback_error=None):
+        """Installs a freshly created inference worker (from initialize_face_mesh or the startup loader)."""
+        if fallback_error is not None:
+            requested = self.settings.get("inference_backend", "face_mesh")
+            self.show_error_message(f"{INFERENCE_BACKENDS.get(requested, requested)} could not be started:\n{fallback_error}\nUsing FaceMesh instead.")
+        self.inference_worker = worker
+        self.inference_worker.result_ready.connect(self.handle_inference_result)
+        self.active_inference_backend = backend
+        self.inference_worker.set_resolution(self.settings.get("inference_width", 0))
+        self._apply_load_level(self.load_controller.level)
+        print("Face Mesh Initialized.")
+
+    def _report_inference_failure(self, e):
+        print(f"FATAL: Error initializing FaceMesh: {e}"); self.inference_worker = None
+        self.show_error_message(f"Failed to initialize MediaPipe Face Mesh:\n{e}\nTracking disabled.")
+
+    def _check_inference_backend_for_profile(self):
+        """Restarts the inference worker if the profile selects a different backend than the running one."""
+        if self.settings.get("inference_backend", "face_mesh") == self.active_inference_backend: return
+        was_running = self.running
+        if self.running: self.stop_tracking()
+        self.last_result_seq = self.frame_submit_seq # Ignore results still queued from the old worker
+        self.initialize_face_mesh()
+        if was_running and self.inference_worker and self._is_ok_to_change_settings(): QTimer.singleShot(100, self.start_tracking)
+
+    def _check_capture_resolution_for_profile(self):
+        """Reopens the camera if the profile's high-res capture preference differs from the open camera's."""
+        if bool(self.settings.get("high_res_capture", False)) == self.active_high_res_capture or not (self.cam and self.cam.isOpened()): return
+        was_running = self.running
+        if self.running: self.stop_tracking()
+        cam_index = self.settings.get("camera_index", 0)
+        print(f"Reopening camera {cam_index} for {'high-res' if self.settings.get('high_res_capture') else 'standard'} capture...")
+        if self.init_camera(cam_index, preferred_backend=self._camera_backend(cam_index), capture_mode=self.settings.get("capture_mode")):
+            if self.active_capture_mode != self.settings.get("capture_mode"):
+                self.settings["capture_mode"] = self.active_capture_mode; self.save_current_profile_settings()
+            if was_running and self._is_ok_to_change_settings(): QTimer.singleShot(100, self.start_tracking)
+        else:
+            self._internal_tracking_active = False
+            self.update_status("CAM REOPEN FAIL!", COLOR_ERROR); self.display_error_on_feed("Failed to Reopen Camera")
+
+    def init_camera(self, index, preferred_backend="Default", capture_mode=None):
+        """Attempts to initialize the camera at the given index and negotiate its capture mode.
 
-    def init_camera(self, index, preferred_backend="Default"):
-        """Attempts to initialize the camera at the given index."""
+        capture_mode is a previously negotiated mode for this camera; the chosen mode is left in
+        self.active_capture_mode for the caller to persist.
+        """
+        self._stop_capture_thread() # Must stop reading before the device is released
         if self.cam and self.cam.isOpened():
             print("Releasing previous camera..."); self.cam.release(); self.cam = None
 
-        print(f"Attempting camera index {index} (Preferred Backend: {preferred_backend})...")
-        self.cam = None; success = False
-        # Define potential backend APIs to try
-        backends_to_try = []
-        if IS_WINDOWS: backends_to_try.append((cv2.CAP_DSHOW, "DSHOW"))
-        backends_to_try.append((cv2.CAP_ANY, "CAP_ANY")) # Always try default
-
-        for api, backend_str in backends_to_try:
-            # Only retry CAP_ANY if it wasn't the preferred backend that failed
-            if preferred_backend != "Default" and api == cv2.CAP_ANY and any(b[1] == preferred_backend for b in backends_to_try):
-                 if self.cam is None: # Check if preferred backend failed
-                     print(f"  Skipping CAP_ANY retry as preferred backend {preferred_backend} already tried.")
-                     # Continue # Actually, let's allow trying CAP_ANY anyway as a fallback
-                 else: pass # Preferred succeeded or wasn't tried yet.
+        self.cam = None; self.active_capture_mode = None
+        high_res = bool(self.settings.get("high_res_capture", False))
+        cam, mode = open_camera(index, preferred_backend, capture_mode, high_res)
+        if cam is None: return False
+        self._adopt_camera(cam, mode, high_res)
+        return True
 
+    def _adopt_camera(self, cam, capture_mode, high_res):
+        """Makes an opened camera (see open_camera) the current one and starts reading from it."""
+        self.cam = cam; self.active_capture_mode = capture_mode; self.active_high_res_capture = high_res
+        self.load_controller.capture_mode = self.active_capture_mode; self.load_controller.reset()
+        self._start_capture_thread()
 
-            print(f"  Trying backend: {backend_str} ({api})")
-            try:
-                self.cam = cv2.VideoCapture(index, api)
-                if self.cam and self.cam.isOpened():
-                    ret_test, frame_test = self.cam.read()
-                    if not ret_test or frame_test is None:
-                        print(f"    Backend {backend_str}: Failed initial frame read.")
-                        self.cam.release(); self.cam = None; continue
-                    h, w, _ = frame_test.shape
-                    if w <= 0 or h <= 0:
-                        print(f"    Backend {backend_str}: Invalid resolution {w}x{h}.")
-                        self.cam.release(); self.cam = None; continue
-                    print(f"    Camera {index} OK ({w}x{h}). Using Backend: {backend_str}")
-                    success = True; break # Success!
-                else:
-                    print(f"    Backend {backend_str}: Failed to open.")
-                    if self.cam: self.cam.release(); self.cam = None;
-            except Exception as e_cam_try:
-                print(f"    Backend {backend_str}: Error during init/read: {e_cam_try}")
-                if self.cam: self.cam.release(); self.cam = None;
+    def _start_capture_thread(self):
+        """Starts a capture thread reading from the current camera."""
+        self._stop_capture_thread()
+        if not (self.cam and self.cam.isOpened()): return
+        self.capture_thread = CameraCaptureThread(self.cam, on_frame=self.frame_scheduler.notify)
+        self.capture_thread.start()
 
-        if not success:
-            print(f"Error: Failed to open camera {index} with all attempted backends.")
-            return False
-        return True
+    def _stop_capture_thread(self):
+        """Stops the capture thread, if any, so the camera can be safely released."""
+        if self.capture_thread is not None:
+            self.capture_thread.stop(); self.capture_thread = None
 
 
     # --- Status & Performance Update ---
@@ -1742,9 +3897,38 @@ class CursorViaCamApp(QWidget):
         now = time.perf_counter(); elapsed = now - self.last_frame_time; self.last_frame_time = now
         if elapsed > 1e-6: # Avoid division by zero
             current_fps = 1.0 / elapsed; self.fps_history.append(current_fps)
-            avg_fps = sum(self.fps_history) / len(self.fps_history); self.fps_label.setText(f"FPS: {avg_fps:.1f}")
-        # Display processing time from the end of the last update_frame call
-        self.proc_time_label.setText(f"Proc: {self.frame_processing_time:.1f} ms")
+            avg_fps = sum(self.fps_history) / len(self.fps_history)
+            dropped = self.capture_thread.dropped_frames if self.capture_thread else 0
+            self.fps_label.setText(f"FPS: {avg_fps:.1f} (Dropped: {dropped})")
+        # Display processing time of the last process_frame_result call and its inference time
+        self.proc_time_label.setText(f"Proc: {self.frame_processing_time:.1f} ms | Inf: {self.last_inference_ms:.1f} ms")
+
+    def toggle_latency_panel(self, shown):
+        """Shows/hides the per-stage latency panel; percentiles are only computed while it is shown."""
+        self.latency_panel.setVisible(shown)
+        self.latency_toggle_button.setText("Stages \u25be" if shown else "Stages \u25b8")
+        if shown: self.refresh_latency_panel(); self.latency_panel_timer.start(LATENCY_PANEL_REFRESH_MS)
+        else: self.latency_panel_timer.stop()
+
+    def refresh_latency_panel(self):
+        text = self.latency_stats.format_table() + "\n\nEnd-to-end (frame -> cursor move):\n" + self.e2e_stats.format_table()
+        if self.smooth_cursor.target_stats.summary(): text += "\n\nButton sticking targets:\n" + self.smooth_cursor.target_stats.format_table()
+        self.latency_table_label.setText(text)
+
+    def reset_latency_stats(self):
+        self.latency_stats.clear(); self.e2e_stats.clear(); self.smooth_cursor.target_stats.clear(); self.refresh_latency_panel()
+
+    def export_latency_stats(self):
+        """Saves the current per-stage percentiles and histograms to a user-chosen JSON/CSV file."""
+        default_name = time.strftime("cursorviacam_latency_%Y%m%d_%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(self, "Export Stage Latency", default_name, "JSON (*.json);;CSV (*.csv)")
+        if not path: return
+        machine = {"platform": platform.platform(), "processor": platform.processor(), "python": platform.python_version(),
+                   "capture_mode": self.active_capture_mode, "profile": self.active_profile_name}
+        try:
+            self.latency_stats.export(path, extra={"machine": machine}, sections={"end_to_end": self.e2e_stats, "sticking_targets": self.smooth_cursor.target_stats})
+            print(f"Exported stage latency to {path}")
+        except (IOError, OSError) as e: self.show_error_message(f"Failed to export latency statistics:\n{e}")
 
     # --- Start/Stop Tracking ---
     def start_tracking(self):
@@ -1754,7 +3938,7 @@ class CursorViaCamApp(QWidget):
             return
         if self.running: return # Already running
         # Check if system is ready (camera and mediapipe initialized)
-        if not (self.cam and self.cam.isOpened() and self.face_mesh and self._internal_tracking_active):
+        if not (self.cam and self.cam.isOpened() and self.inference_worker and self._internal_tracking_active):
             self.update_status("System Not Ready", COLOR_ERROR); self.show_error_message("Cannot start: Camera or MediaPipe not ready."); return
 
         print("Tracking started.")
@@ -1764,11 +3948,10 @@ class CursorViaCamApp(QWidget):
         self.set_settings_controls_enabled(False); self.rerun_tutorial_button.setVisible(False)
         self.update_status("Starting...", COLOR_START)
         # Reset state variables for a clean tracking session
-        self.smooth_cursor.last_smoothed_gaze_target = None; self.smooth_cursor.last_raw_position = None
-        self.smooth_cursor.position_history.clear(); self.smooth_cursor.reset_sticking()
-        self.blink_start_time = 0; self.both_eyes_closed_start_time = 0
-        self.last_both_eyes_closed_end_time = 0 # Reset double click timer state
-        self.was_out_of_bounds = True; self.last_valid_gaze_normalized = None
+        self.smooth_cursor.reset_smoothing(); self.smooth_cursor.reset_sticking(); self.smooth_cursor.cursor.invalidate()
+        self.gaze_processor.reset() # Blink/double click timers, bounds and gaze state
+        self.load_controller.reset() # Keep the current quality level, but measure the session afresh
+        self.last_face_time = time.perf_counter(); self._update_frame_schedule() # Full rate until the face is known to be missing
         # Update status to "Tracking" after a short delay
         QTimer.singleShot(200, lambda: self.update_status("Tracking", COLOR_RUN) if self.running else None)
 
@@ -1777,7 +3960,7 @@ class CursorViaCamApp(QWidget):
         if not self.running: return # Already stopped
         print("Tracking stopped."); self.running = False
         # Determine if system is ready to start again
-        can_start_again = (self.cam and self.cam.isOpened() and self.face_mesh and self._internal_tracking_active)
+        can_start_again = (self.cam and self.cam.isOpened() and self.inference_worker and self._internal_tracking_active)
         # Update UI state
         self.start_button.setEnabled(can_start_again); self.stop_button.setEnabled(False)
         # Check if tutorial is finished to decide whether to re-enable settings
@@ -1790,8 +3973,9 @@ class CursorViaCamApp(QWidget):
             self.update_status("Tutorial Active", COLOR_TUTORIAL) # Status already handled by update_status logic
 
         # Reset state variables
-        self.smooth_cursor.reset_sticking(); self.was_out_of_bounds = True; self.both_eyes_closed_start_time = 0
-        self.blink_start_time = 0; self.last_both_eyes_closed_end_time = 0 # Reset double click timer state
+        self.smooth_cursor.reset_sticking(); self.smooth_cursor.cancel_glide(); self.gaze_processor.was_out_of_bounds = True
+        self.gaze_processor.reset_click_timers() # Reset blink/double click timer state
+        self._update_frame_schedule()
         # Update highlighter color to idle/error state when stopping
         if self.enable_cursor_highlight and self.cursor_highlighter:
              idle_color = COLOR_ERROR if not can_start_again else COLOR_IDLE
@@ -1806,8 +3990,8 @@ class CursorViaCamApp(QWidget):
         """Enables/disables settings controls, handling platform specifics."""
         widgets_to_toggle = [
             self.profile_combo, self.save_profile_button, self.delete_profile_button,
-            self.camera_selector, self.padding_slider, self.gap_level_slider,
-            self.blink_selector, self.sticking_checkbox, self.highlight_checkbox, # Added highlight checkbox
+            self.camera_selector, self.refresh_cameras_button, self.padding_slider, self.gap_level_slider,
+            self.blink_selector, self.smoothing_selector, self.inference_selector, self.high_res_checkbox, self.sticking_checkbox, self.highlight_checkbox, self.prediction_checkbox,
             self.padding_value_label, self.gap_level_value_label
         ]
         # Handle camera selector based on camera availability
@@ -1817,6 +4001,7 @@ class CursorViaCamApp(QWidget):
         # Toggle other widgets
         for widget in widgets_to_toggle:
             if widget == self.camera_selector: continue # Handled above
+            if widget == self.refresh_cameras_button and self.camera_discovery.is_running(): continue # Re-enabled when the scan ends
             if widget:
                 # Sticking checkbox only enabled on Windows AND if main toggle is enabled
                 can_enable_widget = enabled and (IS_WINDOWS if widget == self.sticking_checkbox else True)
@@ -1831,10 +4016,10 @@ class CursorViaCamApp(QWidget):
 
     # --- update_frame (STATUS FIX INTEGRATED) ---
     def update_frame(self):
-        """Main processing loop: Capture frame, detect face/eyes, calculate gaze, move cursor, detect clicks."""
-        start_time_frame = time.perf_counter()
-        self.update_performance_display() # Update FPS/Proc time display
+        """Frame loop: take the newest captured frame and hand it to the inference worker.
 
+        Results come back asynchronously through handle_inference_result.
+        """
         # --- Determine if Tutorial is Active ---
         is_tutorial_active = not (self.tutorial_state == TUTORIAL_STATE_IDLE or
                                self.tutorial_state == TUTORIAL_STATE_COMPLETE or
@@ -1852,9 +4037,9 @@ class CursorViaCamApp(QWidget):
                                     "System Not Ready" in current_status_text
                 if not sys_error_detected:
                     error_msg = "System Not Ready" # Generic error if specific cause unknown
-                    if not (self.cam and self.cam.isOpened() and self.face_mesh): error_msg = "CAM/MP Error"
+                    if not (self.cam and self.cam.isOpened() and self.inference_worker): error_msg = "CAM/MP Error"
                     elif not (self.cam and self.cam.isOpened()): error_msg = "CAM Error"
-                    elif not self.face_mesh: error_msg = "MP Init Fail"
+                    elif not self.inference_worker: error_msg = "MP Init Fail"
                     self.update_status(error_msg, COLOR_ERROR)
                 # Also update highlighter if enabled
                 if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_ERROR))
@@ -1868,7 +4053,7 @@ class CursorViaCamApp(QWidget):
                  self.start_button.setEnabled(False)
                  if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_ERROR))
              return
-        if not self.face_mesh:
+        if not self.inference_worker:
              if self.running: self.stop_tracking()
              self._internal_tracking_active = False
              if not is_tutorial_active:
@@ -1880,186 +4065,143 @@ class CursorViaCamApp(QWidget):
 
         # --- Frame Capture and Initial Processing ---
         try:
-            ret, frame = self.cam.read()
-            if not ret or frame is None:
-                 if not is_tutorial_active:
-                     if "Frame Read Err" not in self.status_label.text():
-                         self.update_status("Frame Read Err", COLOR_ERROR); self.display_error_on_feed("Frame Read Fail")
-                     if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_ERROR))
-                 return
+            # Frames are read by the capture thread; only take the newest one, never block here
+            captured = self.capture_thread.get_latest_frame(count_dropped=self.frame_scheduler.full_rate) if self.capture_thread else None
+            if captured is None:
+                 if self.capture_thread is None or self.capture_thread.feed_broken:
+                     if not is_tutorial_active:
+                         if "Frame Read Err" not in self.status_label.text():
+                             self.update_status("Frame Read Err", COLOR_ERROR); self.display_error_on_feed("Frame Read Fail")
+                         if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_ERROR))
+                 return # No new frame since the last tick
             # Removed clearing error here - handled by the unified status logic below
 
-            frame = cv2.flip(frame, 1); frame_h, frame_w, _ = frame.shape
+            flip_start = time.perf_counter()
+            if captured.driver_ms is not None: self.e2e_stats.add("driver", captured.driver_ms)
+            self.e2e_stats.add("buffer", (flip_start - captured.timestamp) * 1000 - (captured.driver_ms or 0.0))
+            # One RGB buffer per frame: MediaPipe reads it, overlays are drawn into it, the preview wraps it
+            frame = cv2.flip(captured.frame, 1); cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame); frame_h, frame_w, _ = frame.shape
+            self.latency_stats.add("read", captured.read_ms); self.latency_stats.add("flip", (time.perf_counter() - flip_start) * 1000)
             if frame_h <= 0 or frame_w <= 0: return # Invalid frame
 
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB); rgb_frame.flags.writeable = False
-            output = self.face_mesh.process(rgb_frame); rgb_frame.flags.writeable = True
-            bgr_frame_draw = frame
+            self.frame_submit_seq += 1
+            self.inference_worker.submit(self.frame_submit_seq, captured.timestamp, frame) # Never waits on MediaPipe
 
         except Exception as e:
-            print(f"Error in frame read/MP process: {e}")
-            if not is_tutorial_active:
-                if "Process Error" not in self.status_label.text(): self.update_status("Process Error", COLOR_WARN)
-                if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_WARN))
-            self.last_valid_gaze_normalized = None
+            print(f"Error in frame read/submit: {e}")
+            self._show_process_error(is_tutorial_active)
             self.display_frame(frame if 'frame' in locals() and frame is not None else None)
-            return
-
-        # --- Define Tracking and Clicking Areas ---
-        rect_left = max(0, self.rect_padding); rect_right = min(frame_w - 1, frame_w - self.rect_padding)
-        rect_top = max(0, self.rect_padding); rect_bottom = min(frame_h - 1, frame_h - self.rect_padding)
-        rect_valid = (rect_right > rect_left and rect_bottom > rect_top)
-        outer_left = max(0, rect_left - self.outer_rect_gap); outer_top = max(0, rect_top - self.outer_rect_gap)
-        outer_right = min(frame_w - 1, rect_right + self.outer_rect_gap); outer_bottom = min(frame_h - 1, rect_bottom + self.outer_rect_gap)
-        outer_valid = (outer_right > outer_left and outer_bottom > outer_top)
 
-        # --- Face and Landmark Processing ---
-        face_detected = False; target_x_px, target_y_px = -1, -1; mid_x_norm, mid_y_norm = -1.0, -1.0
-        left_click, mid_click, double_click = False, False, False # Initialize click flags for this frame
-        # Initialize gaze_in_click_bounds here
-        gaze_in_click_bounds = False
+    def _on_frame_arrival(self):
+        """Slot for FrameArrivalScheduler.frame_ready: runs the frame loop for the newly arrived frame."""
+        self.frame_scheduler.acknowledge()
+        self.update_frame()
+
+    def _frame_watchdog(self):
+        """Runs the frame loop if no frame has arrived recently, so a stalled or broken feed is still reported."""
+        if (time.perf_counter() - self.frame_scheduler.last_wake_time) * 1000 >= FRAME_WATCHDOG_INTERVAL_MS: self.update_frame()
+
+    def _update_frame_schedule(self):
+        """Picks the frame loop rate: every frame while a face is tracked (or in the tutorial), reduced otherwise."""
+        if not (self.running or not self._is_ok_to_change_settings()): rate = FRAME_RATE_IDLE_HZ # Stopped, no tutorial
+        elif time.perf_counter() - self.last_face_time > FRAME_NO_FACE_GRACE: rate = FRAME_RATE_NO_FACE_HZ
+        else: rate = None
+        if self.load_controller.level >= LOAD_LEVELS.index("Frame Skipping"):
+            skip_rate = load_processed_fps(self.active_capture_mode, self.load_controller.level)
+            rate = skip_rate if rate is None else min(rate, skip_rate)
+        self.frame_scheduler.set_rate(rate)
+
+    def _finish_frame_timing(self, result, start_time_frame):
+        """Records the frame's handling time and lets the load shedding controller react to it."""
+        self.frame_processing_time = (time.perf_counter() - start_time_frame) * 1000
+        self.latency_stats.add("total", self.frame_processing_time)
+        # Inference runs on its own thread, overlapping with handling on the GUI thread: the slower of the two limits the frame rate
+        self._update_load_level(max(result.inference_ms, self.frame_processing_time))
+
+    def _update_load_level(self, work_ms):
+        """Feeds one frame's work time to the load shedding controller and applies a level change."""
+        level = self.load_controller.update(work_ms, time.perf_counter())
+        if level is not None: self._apply_load_level(level, log=True)
+
+    def _apply_load_level(self, level, log=False):
+        """Applies a LOAD_LEVELS index to inference, preview and frame rate, and shows it."""
+        if log:
+            print(f"Load shedding: quality -> {LOAD_LEVELS[level]} (level {level}; work {self.load_controller.trigger_ms:.1f} ms avg, "
+                  f"budget {self.load_controller.budget_ms:.1f} ms, next step up after {self.load_controller.up_hold:.0f} s of headroom)")
+        if self.inference_worker is not None:
+            self.inference_worker.set_quality(LOAD_SHED_INPUT_SCALE if level >= LOAD_LEVELS.index("Low-Res Inference") else 1.0,
+                                              level < LOAD_LEVELS.index("No Iris Refinement"))
+        self._update_frame_schedule()
+        self.load_label.setText(f"Quality: {LOAD_LEVELS[level]}")
+        self.load_label.setStyleSheet(f"color: {COLOR_WARN};" if level else "")
+
+    def _show_process_error(self, is_tutorial_active):
+        """Reflects a frame processing failure in the status label and highlighter."""
+        if not is_tutorial_active:
+            if "Process Error" not in self.status_label.text(): self.update_status("Process Error", COLOR_WARN)
+            if self.enable_cursor_highlight: self.cursor_highlighter.update_color(QColor(COLOR_WARN))
+        self.gaze_processor.last_valid_gaze_normalized = None
+
+    def handle_inference_result(self, result):
+        """Slot for FaceMeshInferenceWorker.result_ready: drops out-of-order results and ones far older than usual."""
+        if not self._internal_tracking_active: return # Camera switch or shutdown in progress
+        if result.seq <= self.last_result_seq: self.stale_results_dropped += 1; return # Out of order: a newer result was applied
+        age = time.perf_counter() - result.timestamp
+        self.typical_result_age = age if self.typical_result_age is None else self.typical_result_age + INFERENCE_AGE_EMA_WEIGHT * (age - self.typical_result_age)
+        if age > max(INFERENCE_MAX_RESULT_AGE, INFERENCE_STALE_AGE_FACTOR * self.typical_result_age): # e.g. results queued up behind a GUI stall
+            self.stale_results_dropped += 1
+            self._update_load_level(result.inference_ms) # The inference work was still spent
+            return
+        self.last_result_seq = result.seq
+        self.last_inference_ms = result.inference_ms
+        self.latency_stats.add("queue", result.queue_ms); self.latency_stats.add("inference", result.inference_ms)
+        self.latency_stats.add("deliver", (time.perf_counter() - result.done_time) * 1000)
+        self.update_performance_display() # Update FPS/Proc time display (once per processed frame)
+        self.process_frame_result(result)
+
+    def _record_end_to_end(self, result, handling_start):
+        """Adds the latency breakdown of a frame that moved the cursor to e2e_stats."""
+        move_time = self.smooth_cursor.last_move_time
+        submit_time = result.done_time - (result.queue_ms + result.inference_ms) / 1000.0
+        capture_to_cursor = (move_time - result.timestamp) * 1000
+        smoothing_lag = self.smooth_cursor.last_move_smoothing_lag_ms or 0.0
+        self.e2e_stats.add_many({"inference_path": (handling_start - submit_time) * 1000, "to_cursor": (move_time - handling_start) * 1000,
+                                 "capture_to_cursor": capture_to_cursor, "smoothing_lag": smoothing_lag,
+                                 "effective": capture_to_cursor + smoothing_lag})
+        self.smooth_cursor.record_pipeline_latency(capture_to_cursor / 1000.0)
+
+    def process_frame_result(self, result):
+        """Per-frame logic on the GUI thread: run GazeClickProcessor, dispatch clicks, update status, draw feedback."""
+        start_time_frame = time.perf_counter()
 
-        # --- Determine current state flags ---
-        in_movement_bounds = False
+        # --- Determine if Tutorial is Active ---
+        is_tutorial_active = not (self.tutorial_state == TUTORIAL_STATE_IDLE or
+                               self.tutorial_state == TUTORIAL_STATE_COMPLETE or
+                               self.tutorial_state == TUTORIAL_STATE_SKIPPED)
 
-        if output.multi_face_landmarks:
-            face_detected = True
-            landmarks = output.multi_face_landmarks[0].landmark
-            l_iris_idx, r_iris_idx = 473, 468
-            l_top, l_bot, r_top, r_bot = 159, 145, 386, 374
-            max_lmk = max(l_iris_idx, r_iris_idx, l_top, l_bot, r_top, r_bot)
+        rgb_frame_draw = result.frame; frame_h, frame_w, _ = rgb_frame_draw.shape
+        if result.error is not None:
+            print(f"Error in MP process: {result.error}")
+            self._show_process_error(is_tutorial_active)
+            self.display_frame(rgb_frame_draw)
+            return
 
-            if len(landmarks) > max_lmk:
-                # --- Gaze Calculation ---
-                try:
-                    l_cx, l_cy = landmarks[l_iris_idx].x, landmarks[l_iris_idx].y; r_cx, r_cy = landmarks[r_iris_idx].x, landmarks[r_iris_idx].y
-                    mid_x_norm, mid_y_norm = (l_cx + r_cx) / 2, (l_cy + r_cy) / 2
-                    self.last_valid_gaze_normalized = (mid_x_norm, mid_y_norm)
-                    target_x_px = int(mid_x_norm * frame_w); target_y_px = int(mid_y_norm * frame_h)
-                    target_x_px = max(0, min(target_x_px, frame_w - 1)); target_y_px = max(0, min(target_y_px, frame_h - 1))
-                    # Determine bounds check flags based on gaze calculation success
-                    in_movement_bounds = rect_valid and (rect_left <= target_x_px <= rect_right and rect_top <= target_y_px <= rect_bottom)
-                    gaze_in_click_bounds = outer_valid and target_x_px != -1 and (outer_left <= target_x_px <= outer_right and outer_top <= target_y_px <= outer_bottom)
-
-                except (IndexError, TypeError) as e_gaze:
-                     self.last_valid_gaze_normalized = None; target_x_px, target_y_px = -1,-1; mid_x_norm, mid_y_norm = -1.0, -1.0
-                     in_movement_bounds = False # Cannot be in bounds if gaze calc failed
-                     gaze_in_click_bounds = False
-                     # Status will be handled by the unified logic below
-
-
-                # --- Cursor Movement Logic (Only if running AND NOT in tutorial) ---
-                if self.running and not is_tutorial_active and mid_x_norm != -1.0:
-                    screen_x, screen_y = -1.0, -1.0
-                    if in_movement_bounds:
-                        if self.was_out_of_bounds:
-                             self.smooth_cursor.position_history.clear(); self.smooth_cursor.last_smoothed_gaze_target = None; self.smooth_cursor.last_raw_position = None; # print("Re-entered bounds, smoother reset.")
-                        # Status is handled below
-                        effective_left = rect_left + EDGE_MAP_MARGIN_PX; effective_right = rect_right - EDGE_MAP_MARGIN_PX
-                        effective_top = rect_top + EDGE_MAP_MARGIN_PX; effective_bottom = rect_bottom - EDGE_MAP_MARGIN_PX
-                        if effective_right > effective_left and effective_bottom > effective_top:
-                            effective_range_x = float(effective_right - effective_left); effective_range_y = float(effective_bottom - effective_top)
-                            norm_x_raw = (float(target_x_px) - effective_left) / effective_range_x; norm_y_raw = (float(target_y_px) - effective_top) / effective_range_y
-                            norm_x = max(0.0, min(1.0, norm_x_raw)); norm_y = max(0.0, min(1.0, norm_y_raw))
-                            screen_x = norm_x * float(SCREEN_W); screen_y = norm_y * float(SCREEN_H)
-                        else: # Fallback if margin too large
-                            range_x, range_y = float(rect_right - rect_left), float(rect_bottom - rect_top)
-                            if range_x > 0 and range_y > 0:
-                                norm_x = max(0.0, min(1.0, (float(target_x_px) - rect_left) / range_x)); norm_y = max(0.0, min(1.0, (float(target_y_px) - rect_top) / range_y))
-                                screen_x = norm_x * float(SCREEN_W); screen_y = norm_y * float(SCREEN_H)
-                        self.was_out_of_bounds = False
-                    else: # Out of movement bounds (but face detected)
-                         # Status handled below
-                         self.was_out_of_bounds = True; self.smooth_cursor.reset_sticking()
-
-                    if screen_x != -1.0 and screen_y != -1.0:
-                        screen_x = max(0.0, min(screen_x, float(SCREEN_W - 1))); screen_y = max(0.0, min(screen_y, float(SCREEN_H - 1)))
-                        self.smooth_cursor.update_position(np.array([screen_x, screen_y]))
-                elif not self.running and not is_tutorial_active:
-                     # Status handled below
-                     pass
-
-
-                # --- Blink/Click Detection Logic (Always run if landmarks are good, needed for tutorial too) ---
-                if self._internal_tracking_active: # Check if system is generally active
-                    try:
-                        l_y_top, l_y_bot = landmarks[l_top].y, landmarks[l_bot].y; r_y_top, r_y_bot = landmarks[r_top].y, landmarks[r_bot].y
-                        l_v_dist = abs(l_y_top - l_y_bot); r_v_dist = abs(r_y_top - r_y_bot)
-                        is_l_closed = l_v_dist < self.blink_threshold; is_r_closed = r_v_dist < self.blink_threshold
-                        currently_both_closed = is_l_closed and is_r_closed
-                        current_time = time.time()
-                        # gaze_in_click_bounds already calculated above
-
-                        # --- Double Click (Rapid Both Eyes Closed Twice) ---
-                        if currently_both_closed:
-                            if self.both_eyes_closed_start_time == 0: # Just closed both eyes
-                                self.both_eyes_closed_start_time = current_time
-                                # Check if this closure is within the interval of the *last* closure ending
-                                if self.last_both_eyes_closed_end_time != 0 and (current_time - self.last_both_eyes_closed_end_time) <= self.double_blink_interval and gaze_in_click_bounds:
-                                    double_click = True
-                                    # Reset timers immediately after detecting double click
-                                    self.both_eyes_closed_start_time = 0
-                                    self.last_both_eyes_closed_end_time = 0
-                        else: # Both eyes are not currently closed
-                            if self.both_eyes_closed_start_time != 0: # Both eyes were closed, now just opened
-                                duration_both_closed = current_time - self.both_eyes_closed_start_time
-                                # Record the time this "both closed" event ended
-                                self.last_both_eyes_closed_end_time = current_time
-
-                                # --- Middle Click (Hold Both Eyes) --- Check duration *after* opening
-                                # Only trigger if double click wasn't already detected this frame
-                                if not double_click and duration_both_closed >= MIDDLE_CLICK_HOLD_DURATION and gaze_in_click_bounds:
-                                    mid_click = True
-                                    # Reset timers as the hold action is complete
-                                    self.both_eyes_closed_start_time = 0
-                                    self.last_both_eyes_closed_end_time = 0 # Reset end time too, middle click ends sequence
-                                else:
-                                    # Reset only the start time, keep the end time for potential double click
-                                    self.both_eyes_closed_start_time = 0
-
-
-                        # --- Left Click (Long Left Eye Only Blink) ---
-                        # Only process if double or middle click didn't happen
-                        if not double_click and not mid_click:
-                             if is_l_closed and not is_r_closed: # Left eye just closed or is held closed
-                                 if self.blink_start_time == 0: self.blink_start_time = current_time
-                             else: # Left eye is open OR both eyes are closed (handled above)
-                                 # If a left blink was in progress (blink_start_time is set), process its end
-                                 if self.blink_start_time != 0:
-                                     duration = current_time - self.blink_start_time
-                                     blink_ended_in_bounds = gaze_in_click_bounds # Check bounds *at the moment eye opens*
-
-                                     # Check only for LONG blink (Single Click)
-                                     if blink_ended_in_bounds and duration >= self.long_blink_threshold:
-                                         left_click = True
-                                     # else: # Short blink ended in bounds, or any blink ended out of bounds - do nothing
-                                         # print(f"Ignoring short/OOB left blink ({duration:.2f}s)") # Debug
-
-                                     # Reset the single blink timer *after* processing the end event
-                                     self.blink_start_time = 0
-
-                    except (IndexError, TypeError) as e_blink:
-                         print(f"Click logic error: {e_blink}")
-                         # Status handled below
-                         # Reset all blink timers on error
-                         self.blink_start_time=0; self.both_eyes_closed_start_time=0; self.last_both_eyes_closed_end_time = 0
-
-            else: # Not enough landmarks
-                 face_detected = True # Face structure detected, but not enough landmarks
-                 self.last_valid_gaze_normalized = None
-                 in_movement_bounds = False # Cannot be in bounds if gaze calc failed
-                 gaze_in_click_bounds = False
-                 self.blink_start_time=0; self.both_eyes_closed_start_time=0; self.last_both_eyes_closed_end_time = 0
-                 self.was_out_of_bounds = True; self.smooth_cursor.reset_sticking()
-                 # Status handled below
-        else: # No face detected
-            face_detected = False # Explicitly set flag
-            self.last_valid_gaze_normalized = None
-            in_movement_bounds = False # Cannot be in bounds if face not detected
-            gaze_in_click_bounds = False
-            self.blink_start_time=0; self.both_eyes_closed_start_time=0; self.last_both_eyes_closed_end_time = 0
-            self.was_out_of_bounds = True; self.smooth_cursor.reset_sticking()
-            # Status handled below
+        if self.landmark_recorder is not None:
+            try: self.landmark_recorder.write(result.timestamp, frame_w, frame_h, result.landmarks)
+            except (IOError, OSError, ValueError) as e_rec:
+                print(f"Landmark recording failed: {e_rec}"); self.record_checkbox.setChecked(False) # Stops and closes it
+
+        # --- Gaze, Cursor Movement and Click Detection ---
+        outcome = self.gaze_processor.process(result.landmarks, frame_w, frame_h, self._tracking_params(),
+                                              move_cursor=self.running and not is_tutorial_active,
+                                              detect_clicks=self._internal_tracking_active, frame_time=result.timestamp)
+        self.latency_stats.add_many(outcome.stage_ms); ui_start = time.perf_counter()
+        if outcome.cursor_moved: self._record_end_to_end(result, start_time_frame)
+        if outcome.face_detected: self.last_face_time = start_time_frame
+        self._update_frame_schedule()
+        face_detected = outcome.face_detected; in_movement_bounds = outcome.in_movement_bounds
+        rect_valid, outer_valid = outcome.rect_valid, outcome.outer_valid
+        left_click, mid_click, double_click = outcome.left_click, outcome.mid_click, outcome.double_click
 
         # --- Determine Desired Status (Unified Logic) ---
         desired_status_text = ""
@@ -2084,7 +4226,7 @@ class CursorViaCamApp(QWidget):
             if not face_detected:
                 desired_status_text = "No Face!"
                 desired_status_color = COLOR_ERROR
-            elif self.last_valid_gaze_normalized is None: # Gaze calculation failed (e.g., not enough landmarks)
+            elif not outcome.gaze_valid: # Gaze calculation failed (e.g., not enough landmarks)
                  desired_status_text = "Gaze Error"
                  desired_status_color = COLOR_WARN
             elif not rect_valid or not outer_valid: # Invalid configuration somehow
@@ -2130,34 +4272,31 @@ class CursorViaCamApp(QWidget):
             # Check in order: double -> middle -> left
             if double_click:
                 print(">>> PyAutoGUI: Double Click")
-                try: pyautogui.doubleClick(_pause=False)
+                try: self.smooth_cursor.cursor.double_click()
                 except Exception as e_click: print(f"Error during pyautogui doubleClick: {e_click}")
                 self.smooth_cursor.reset_sticking() # Reset sticking after any click
                 action_taken = True
             elif mid_click:
                  print(">>> PyAutoGUI: Middle Click")
-                 try: pyautogui.middleClick(_pause=False)
+                 try: self.smooth_cursor.cursor.middle_click()
                  except Exception as e_click: print(f"Error during pyautogui middleClick: {e_click}")
                  self.smooth_cursor.reset_sticking()
                  action_taken = True
             elif left_click:
                  print(">>> PyAutoGUI: Left Click")
-                 try: pyautogui.click(_pause=False)
+                 try: self.smooth_cursor.cursor.click()
                  except Exception as e_click: print(f"Error during pyautogui click: {e_click}")
                  self.smooth_cursor.reset_sticking() # Reset sticking after any click
                  action_taken = True
 
         # If an action was taken (either tutorial advance or actual click), ensure relevant timers are reset
-        if action_taken:
-            self.blink_start_time = 0
-            self.both_eyes_closed_start_time = 0
-            self.last_both_eyes_closed_end_time = 0
+        if action_taken: self.gaze_processor.reset_click_timers()
 
 
         # --- Update Cursor Highlighter ---
         if self.enable_cursor_highlight and self.cursor_highlighter:
             try:
-                cursor_x, cursor_y = pyautogui.position() # Get *actual* cursor pos for highlight
+                cursor_x, cursor_y = self.smooth_cursor.cursor.position() # Modelled position (OS queried at a low rate)
                 self.cursor_highlighter.update_position(cursor_x, cursor_y)
                 # Use the *final* determined status color for the frame
                 self.cursor_highlighter.update_color(QColor(final_frame_status_color_hex))
@@ -2165,28 +4304,35 @@ class CursorViaCamApp(QWidget):
                 # print(f"Error updating highlighter: {e_highlight}") # Debug only
                 self.cursor_highlighter.hide() # Hide on error getting position etc.
 
+        overlay_start = time.perf_counter(); self.latency_stats.add("ui", (overlay_start - ui_start) * 1000)
+        if not self._preview_due(): # Overlay only exists for the preview: skip both
+            self._finish_frame_timing(result, start_time_frame)
+            return
+
         # --- Drawing on Frame (Visual Feedback) ---
         # Determine inner rect color based on the final status color derived this frame
-        cv_inner_color = hex_to_bgr(final_frame_status_color_hex)
-        cv_outer_color = hex_to_bgr(COLOR_INFO_BLUE) # Click area always blue outline
-        if rect_valid: cv2.rectangle(bgr_frame_draw, (rect_left, rect_top), (rect_right, rect_bottom), cv_inner_color, 2)
-        if outer_valid: cv2.rectangle(bgr_frame_draw, (outer_left, outer_top), (outer_right, outer_bottom), cv_outer_color, 1)
-        if target_x_px != -1:
+        cv_inner_color = hex_to_rgb(final_frame_status_color_hex)
+        cv_outer_color = hex_to_rgb(COLOR_INFO_BLUE) # Click area always blue outline
+        if rect_valid: cv2.rectangle(rgb_frame_draw, outcome.rect[:2], outcome.rect[2:], cv_inner_color, 2)
+        if outer_valid: cv2.rectangle(rgb_frame_draw, outcome.outer_rect[:2], outcome.outer_rect[2:], cv_outer_color, 1)
+        if outcome.target_px is not None:
              # Gaze color matches inner rect color (status/tutorial)
              gaze_color = cv_inner_color
-             cv2.circle(bgr_frame_draw, (target_x_px, target_y_px), 5, gaze_color, -1)
-             cv2.circle(bgr_frame_draw, (target_x_px, target_y_px), 6, (255, 255, 255), 1) # White outline
+             cv2.circle(rgb_frame_draw, outcome.target_px, 5, gaze_color, -1)
+             cv2.circle(rgb_frame_draw, outcome.target_px, 6, (255, 255, 255), 1) # White outline
 
         # --- Display Frame and Timing ---
-        self.display_frame(bgr_frame_draw)
+        display_start = time.perf_counter(); self.latency_stats.add("overlay", (display_start - overlay_start) * 1000)
+        self.display_frame(rgb_frame_draw)
         end_time_frame = time.perf_counter()
-        self.frame_processing_time = (end_time_frame - start_time_frame) * 1000
+        self.latency_stats.add("display", (end_time_frame - display_start) * 1000)
+        self._finish_frame_timing(result, start_time_frame)
 
 
     # --- Tutorial Methods (Highlight Info ADDED, Renumbered, Robustness Improved) ---
     def run_tutorial(self, current_state=TUTORIAL_STATE_SHOWING_INTRO):
         """Starts or continues the interactive tutorial."""
-        if not (self._internal_tracking_active and self.face_mesh and self.cam and self.cam.isOpened()):
+        if not (self._internal_tracking_active and self.inference_worker and self.cam and self.cam.isOpened()):
             QMessageBox.warning(self, "Tutorial Error", "Cannot start tutorial: Camera or MediaPipe not ready.")
             self.mark_tutorial_skipped(); return
 
@@ -2200,6 +4346,7 @@ class CursorViaCamApp(QWidget):
         self.start_button.setEnabled(False); self.stop_button.setEnabled(False)
         self.rerun_tutorial_button.setVisible(False)
         if self.running: self.stop_tracking()
+        self.last_face_time = time.perf_counter(); self._update_frame_schedule() # Blink steps need every frame
 
         # Switch to tutorial panel
         self.right_stack.setCurrentWidget(self.tutorial_widget)
@@ -2212,9 +4359,7 @@ class CursorViaCamApp(QWidget):
         ]
         if current_state in waiting_states_for_reset:
              print(f"Tutorial: Resetting blink/click timers for state {current_state}")
-             self.blink_start_time = 0
-             self.both_eyes_closed_start_time = 0
-             self.last_both_eyes_closed_end_time = 0
+             self.gaze_processor.reset_click_timers()
 
         # Configure UI elements for the current state
         text, instruction, next_visible, next_text, next_action, skip_visible = "", "", False, "Next", None, True
@@ -2337,9 +4482,10 @@ class CursorViaCamApp(QWidget):
 
         # Re-enable controls based on system readiness
         self.set_settings_controls_enabled(True)
-        can_start = (self.cam and self.cam.isOpened() and self.face_mesh and self._internal_tracking_active)
+        can_start = (self.cam and self.cam.isOpened() and self.inference_worker and self._internal_tracking_active)
         self.start_button.setEnabled(can_start); self.stop_button.setEnabled(self.running) # Stop button only enabled if it was somehow left running
         self.rerun_tutorial_button.setVisible(True)
+        self._update_frame_schedule()
 
         # Update status label and highlighter color to reflect idle/ready state
         final_status_color = COLOR_ERROR if not can_start else COLOR_IDLE
@@ -2352,28 +4498,67 @@ class CursorViaCamApp(QWidget):
     def mark_tutorial_skipped(self): self._end_tutorial(skipped=True)
 
     # --- Frame Display & UI Update Helpers ---
-    def display_frame(self, frame_bgr):
-        """Displays the processed BGR frame in the camera label."""
-        if frame_bgr is None: self.display_error_on_feed("No Frame Data"); return
+    def _preview_due(self):
+        """True if the current frame should be drawn: honours the preview mode, its rate limit and window visibility."""
+        if self.preview_mode == "Off" or self.isMinimized() or not self.isVisible(): return False
+        window_handle = self.windowHandle()
+        if window_handle is not None and not window_handle.isExposed(): return False # Fully covered (where the platform reports it)
+        reduced = self.preview_mode == "Reduced" or self.load_controller.level >= LOAD_LEVELS.index("Reduced Preview")
+        if reduced and time.perf_counter() - self.last_preview_time < 1.0 / PREVIEW_REDUCED_RATE_HZ: return False
+        return True
+
+    def _next_preview_surface(self):
+        """Returns the cached label-sized surface to draw next, creating both surfaces if needed.
+
+        Surfaces alternate so the one being painted is never the pixmap the label currently
+        shares, which would force Qt to copy it (copy-on-write) on every frame.
+        """
+        if self.preview_surfaces is None:
+            self.preview_surfaces = [QPixmap(self.camera_label.size()) for _ in range(2)]
+            for surface in self.preview_surfaces: surface.fill(Qt.GlobalColor.black)
+            self.preview_letterbox = None
+        self.preview_surface_index ^= 1
+        return self.preview_surfaces[self.preview_surface_index]
+
+    def _letterbox_rect(self, frame_w, frame_h):
+        """Returns the centered, aspect-preserving QRect for a frame inside camera_label (cached per frame size)."""
+        if self.preview_letterbox is None or self.preview_letterbox[0] != (frame_w, frame_h):
+            label_w, label_h = self.camera_label.width(), self.camera_label.height()
+            scale = min(label_w / frame_w, label_h / frame_h)
+            w, h = max(1, round(frame_w * scale)), max(1, round(frame_h * scale))
+            self.preview_letterbox = ((frame_w, frame_h), QRect((label_w - w) // 2, (label_h - h) // 2, w, h))
+            for surface in self.preview_surfaces or []: surface.fill(Qt.GlobalColor.black) # Clear the old video area/bars
+        return self.preview_letterbox[1]
+
+    def eventFilter(self, watched, event):
+        """Drops the cached preview surfaces when camera_label is resized (rebuilt on the next frame)."""
+        if watched is getattr(self, 'camera_label', None) and event.type() == QEvent.Type.Resize:
+            self.preview_surfaces = None; self.preview_letterbox = None
+        return super().eventFilter(watched, event)
+
+    def display_frame(self, frame_rgb):
+        """Displays the processed RGB frame in the camera label (wrapped by QImage without conversion)."""
+        if frame_rgb is None: self.display_error_on_feed("No Frame Data"); return
         try:
-            h, w, ch = frame_bgr.shape; bytes_per_line = ch * w
+            h, w, ch = frame_rgb.shape
             if h <= 0 or w <= 0: return
-            rgb_image = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+            self.last_preview_time = time.perf_counter()
+            target_rect = self._letterbox_rect(w, h)
+            smooth = self.preview_mode != "Fast"
+            if not smooth and (target_rect.width() < w or target_rect.height() < h): # Shrink first so Qt draws label-sized data unscaled
+                frame_rgb = cv2.resize(frame_rgb, (target_rect.width(), target_rect.height()), interpolation=cv2.INTER_NEAREST)
+                h, w, ch = frame_rgb.shape
+            # Zero-copy wrap: frame_rgb stays alive until drawImage below has used it
+            qt_image = QImage(frame_rgb.data, w, h, frame_rgb.strides[0], QImage.Format.Format_RGB888)
             if qt_image.isNull(): self.display_error_on_feed("Frame Convert Error"); return
-            pixmap = QPixmap.fromImage(qt_image)
-            scaled_pixmap = pixmap.scaled(self.camera_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            # Create a black background pixmap matching the label size
-            bg_pixmap = QPixmap(self.camera_label.size())
-            bg_pixmap.fill(Qt.GlobalColor.black)
-            # Paint the scaled video frame onto the black background, centered
-            painter = QPainter(bg_pixmap)
-            x = (bg_pixmap.width() - scaled_pixmap.width()) // 2
-            y = (bg_pixmap.height() - scaled_pixmap.height()) // 2
-            painter.drawPixmap(QPoint(x, y), scaled_pixmap)
+            # Paint the video into the letterbox area of the cached surface (the black bars are already there)
+            surface = self._next_preview_surface()
+            painter = QPainter(surface)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, smooth)
+            painter.drawImage(target_rect, qt_image)
             painter.end()
-            # Set the final composited pixmap on the label
-            self.camera_label.setPixmap(bg_pixmap); self.camera_label.setText("") # Clear any previous error text
+            if self.camera_label.text(): self.camera_label.setText("") # Clear any previous error text (also clears the pixmap)
+            self.camera_label.setPixmap(surface)
         except Exception as e:
             print(f"Error displaying frame: {e}"); self.display_error_on_feed(f"Frame Display Error:\n{e}")
 
@@ -2381,11 +4566,13 @@ class CursorViaCamApp(QWidget):
     def display_error_on_feed(self, text):
          """Displays an error message directly on the camera feed label."""
          try:
-             pixmap = QPixmap(self.camera_label.size()); pixmap.fill(Qt.GlobalColor.black)
+             pixmap = self._next_preview_surface(); pixmap.fill(Qt.GlobalColor.black)
+             self.preview_letterbox = None # The next frame repaints the bars over the text
              painter = QPainter(pixmap); painter.setPen(Qt.GlobalColor.red); font = painter.font(); font.setPointSize(12); font.setBold(True); painter.setFont(font)
              text_rect = pixmap.rect().adjusted(10, 10, -10, -10)
              painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap, text); painter.end()
-             self.camera_label.setPixmap(pixmap); self.camera_label.setText("")
+             if self.camera_label.text(): self.camera_label.setText("")
+             self.camera_label.setPixmap(pixmap)
          except Exception as e:
              print(f"Error displaying error on feed: {e}")
              # Fallback: Set text directly on label
@@ -2423,10 +4610,27 @@ class CursorViaCamApp(QWidget):
         if hasattr(self, 'blink_selector'):
             blink_level = self.blink_selector.currentText()
             self.settings["blink_threshold_level"] = blink_level if blink_level in BLINK_THRESHOLD_MAP else "Medium"
+        if hasattr(self, 'smoothing_selector'):
+            filter_kind = self.smoothing_selector.currentData()
+            self.settings["smoothing_filter"] = filter_kind if filter_kind in SMOOTHING_FILTERS else "moving_average"
         if hasattr(self, 'sticking_checkbox'):
             self.settings["enable_button_sticking"] = self.sticking_checkbox.isChecked() and IS_WINDOWS
         if hasattr(self, 'highlight_checkbox'):
             self.settings["enable_cursor_highlight"] = self.highlight_checkbox.isChecked() # Get highlight state
+        if hasattr(self, 'prediction_checkbox'):
+            self.settings["enable_prediction"] = self.prediction_checkbox.isChecked()
+        if hasattr(self, 'preview_selector'):
+            self.settings["preview_mode"] = self.preview_selector.currentData() or "Full"
+        if hasattr(self, 'inference_selector'):
+            self.settings["inference_backend"] = self.inference_selector.currentData() or "face_mesh"
+        if hasattr(self, 'inference_res_selector'):
+            res_width = self.inference_res_selector.currentData()
+            self.settings["inference_width"] = res_width if res_width in INFERENCE_RESOLUTIONS else 0
+        if hasattr(self, 'high_res_checkbox'):
+            self.settings["high_res_capture"] = self.high_res_checkbox.isChecked()
+        if hasattr(self, 'cursor_rate_selector'):
+            rate_hz = self.cursor_rate_selector.currentData()
+            self.settings["cursor_output_hz"] = rate_hz if rate_hz in CURSOR_OUTPUT_RATES else 0
 
         if hasattr(self, 'camera_selector'):
             qt_cam_idx = self.camera_selector.currentIndex()
@@ -2455,6 +4659,7 @@ class CursorViaCamApp(QWidget):
     def closeEvent(self, event):
         """Handles application closing: stops tracking, saves settings, releases resources."""
         print("Closing application...")
+        self.is_closing = True # Startup tasks still running release their results instead of adopting them
         self.running = False; self._internal_tracking_active = False
         if self.timer.isActive(): self.timer.stop()
 
@@ -2489,9 +4694,13 @@ class CursorViaCamApp(QWidget):
                  self.all_profiles_data["profiles"][self.active_profile_name] = self.settings.copy()
              save_profiles(self.all_profiles_data) # Save profile data + incomplete tutorial status
 
+        self._stop_landmark_recording()
+        self.smooth_cursor.set_output_rate(0) # Stops the interpolation thread
+        self.smooth_cursor.set_sticking(False) # Stops the target enumeration thread
         # Release hardware
+        self._stop_capture_thread()
         if self.cam is not None and self.cam.isOpened(): print("Releasing camera..."); self.cam.release(); self.cam = None
-        if self.face_mesh is not None: print("Closing MediaPipe..."); self.face_mesh.close(); self.face_mesh = None
+        if self.inference_worker is not None: print("Closing MediaPipe..."); self.inference_worker.close(); self.inference_worker = None
 
         print("Exiting."); event.accept()
 
@@ -2506,12 +4715,376 @@ def hex_to_bgr(hex_color):
         return (b, g, r) # BGR for OpenCV
     except Exception: return (128, 128, 128) # Default grey on error
 
+def hex_to_rgb(hex_color):
+    """Converts a hex color string to an RGB tuple (for drawing on the shared RGB frame buffer)."""
+    return hex_to_bgr(hex_color)[::-1]
+
+# --- Headless Pipeline Benchmark ---
+BENCHMARK_STAGES = ("read", "flip", "inference", "mapping", "smoothing", "clicks")
+BENCHMARK_DEFAULT_FPS = 30.0 # Frame rate assumed for landmark dumps (and videos without timestamps)
+BENCHMARK_DEFAULT_FRAME_SIZE = (640, 480) # Frame size landmark dumps are mapped against (rect_padding is in pixels)
+
+class HeadlessPipelineRunner:
+    """Replays a video, landmark recording or landmark dump through GazeClickProcessor without Qt, a camera or the real cursor.
+
+    Clicks and moves go to a FakeCursorSink. Blink timing uses the source timestamps, so click
+    detection behaves as it would live no matter how fast frames are processed.
+    """
+    def __init__(self, settings, screen_size=(1920, 1080)):
+        default_settings = get_default_settings()
+        self.cursor = FakeCursorSink(*screen_size)
+        smooth_cursor = SmoothCursor(self.cursor)
+        smooth_cursor.set_smoothing_params(window=settings.get("smooth_window_internal", default_settings["smooth_window_internal"]),
+                                           filter_kind=settings.get("smoothing_filter", default_settings["smoothing_filter"]))
+        smooth_cursor.enable_sticking = False # Sticking enumerates real windows; not part of the pipeline under test
+        smooth_cursor.set_prediction(settings.get("enable_prediction", default_settings["enable_prediction"]))
+        self.processor = GazeClickProcessor(smooth_cursor, *screen_size)
+        self.params = tracking_params_from_settings(settings)
+        self.inference_width = settings.get("inference_width", default_settings["inference_width"]) # Used by run_video
+        self.latency = StageLatencyStats(window=None) # Keep every sample for the final report
+        self.frames = 0; self.faces = 0; self.wall_seconds = 0.0
+        self.trace = [] # (timestamp, screen_x, screen_y) before smoothing; x/y None when the cursor was not driven
+        self.gaze_trace = [] # (x, y) gaze point in frame pixels per frame; None without a valid gaze
+
+    def _process(self, landmarks, frame_w, frame_h, timestamp, stage_ms):
+        outcome = self.processor.process(landmarks, frame_w, frame_h, self.params, now=timestamp, frame_time=timestamp)
+        self.trace.append((timestamp,) + (outcome.screen_pos or (None, None)))
+        gaze = self.processor.last_valid_gaze_normalized if outcome.gaze_valid else None
+        self.gaze_trace.append((gaze[0] * frame_w, gaze[1] * frame_h) if gaze is not None else None)
+        stage_ms.update(outcome.stage_ms)
+        self.latency.add_many(stage_ms)
+        if outcome.double_click: self.cursor.double_click()
+        elif outcome.mid_click: self.cursor.middle_click()
+        elif outcome.left_click: self.cursor.click()
+        if outcome.left_click or outcome.mid_click or outcome.double_click:
+            self.processor.smooth_cursor.reset_sticking(); self.processor.reset_click_timers()
+        self.frames += 1; self.faces += outcome.face_detected
+
+    def run_video(self, path, max_frames=None, use_roi=ENABLE_FACE_ROI_CROP):
+        """Runs capture-side stages (read, flip, FaceMesh) and the tracking logic for each video frame."""
+        cap = import_cv2().VideoCapture(path)
+        if not cap.isOpened(): raise IOError(f"Cannot open video '{path}'")
+        fps = cap.get(cv2.CAP_PROP_FPS) or BENCHMARK_DEFAULT_FPS
+        detector = FaceMeshDetector(FaceRoiTracker() if use_roi else None)
+        detector.inference_width = self.inference_width
+        start = time.perf_counter()
+        try:
+            while max_frames is None or self.frames < max_frames:
+                t0 = time.perf_counter()
+                ret, frame = cap.read()
+                t1 = time.perf_counter()
+                if not ret or frame is None: break
+                frame = cv2.flip(frame, 1); cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame) # Same conversion as the live loop
+                t2 = time.perf_counter()
+                landmarks = detector.detect(frame)
+                t3 = time.perf_counter()
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 or self.frames / fps
+                self._process(landmarks, frame.shape[1], frame.shape[0], timestamp,
+                              {"read": (t1 - t0) * 1000, "flip": (t2 - t1) * 1000, "inference": (t3 - t2) * 1000})
+        finally:
+            self.wall_seconds += time.perf_counter() - start
+            detector.close(); cap.release()
+
+    def run_landmarks(self, path, fps=BENCHMARK_DEFAULT_FPS, frame_size=BENCHMARK_DEFAULT_FRAME_SIZE, max_frames=None):
+        """Runs the tracking logic on a .npy dump of shape (frames, points, 2|3); NaN frames mean no face."""
+        dump = np.load(path, mmap_mode="r")
+        if dump.ndim != 3 or dump.shape[2] < 2: raise ValueError(f"Landmark dump '{path}' must have shape (frames, points, 2|3)")
+        frame_w, frame_h = frame_size
+        start = time.perf_counter()
+        for i in range(len(dump) if max_frames is None else min(len(dump), max_frames)):
+            t0 = time.perf_counter()
+            landmarks = np.asarray(dump[i])
+            if np.isnan(landmarks[0, 0]): landmarks = None
+            self._process(landmarks, frame_w, frame_h, i / fps, {"read": (time.perf_counter() - t0) * 1000})
+        self.wall_seconds += time.perf_counter() - start
+
+    def run_recording(self, path, speed=None, max_frames=None):
+        """Replays a LandmarkRecorder file through the tracking logic, skipping capture and inference.
+
+        With speed None records are processed as fast as possible; otherwise the recorded frame
+        spacing is reproduced divided by speed (1.0 = real time). Click timing always follows the
+        recorded timestamps.
+        """
+        records = load_landmark_recording(path)
+        count = len(records) if max_frames is None else min(len(records), max_frames)
+        if count == 0: return
+        first_timestamp = float(records[0]["timestamp"])
+        start = time.perf_counter()
+        for i in range(count):
+            record = records[i]
+            timestamp = float(record["timestamp"])
+            if speed:
+                delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - start)
+                if delay > 0: time.sleep(delay)
+            t0 = time.perf_counter()
+            landmarks = np.asarray(record["points"]) if record["face"] else None
+            frame_w, frame_h = int(record["frame_size"][0]), int(record["frame_size"][1])
+            self._process(landmarks, frame_w, frame_h, timestamp, {"read": (time.perf_counter() - t0) * 1000})
+        self.wall_seconds += time.perf_counter() - start
+
+    def report(self):
+        """Returns throughput and per-stage latency (mean/p50/p95/p99/max ms) as a dict."""
+        summary = self.latency.summary()
+        stages = {stage: summary[stage] for stage in BENCHMARK_STAGES if stage in summary}
+        return {"frames": self.frames, "frames_with_face": int(self.faces), "wall_seconds": self.wall_seconds,
+                "fps": self.frames / self.wall_seconds if self.wall_seconds > 0 else 0.0,
+                "stages": stages, "cursor_moves": self.cursor.moves, "clicks": dict(self.cursor.clicks)}
+
+def print_benchmark_report(report):
+    print(f"Frames: {report['frames']} ({report['frames_with_face']} with face) in {report['wall_seconds']:.2f}s -> {report['fps']:.1f} fps")
+    print(f"{'Stage':<10} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<10} {stats['mean_ms']:8.3f} {stats['p50_ms']:8.3f} {stats['p95_ms']:8.3f} {stats['p99_ms']:8.3f} {stats['max_ms']:8.3f}")
+    print(f"Cursor moves: {report['cursor_moves']} | Clicks: {report['clicks']}")
+
+def run_benchmark_cli(args):
+    """Entry point for --benchmark: runs the headless pipeline on a video, landmark recording or .npy landmark dump."""
+    profiles = ensure_profiles_loaded().get("profiles", {})
+    profile_name = args.profile or ACTIVE_PROFILE_NAME
+    if profile_name not in profiles: print(f"Error: Profile '{profile_name}' not found."); return 2
+    runner = HeadlessPipelineRunner(profiles[profile_name])
+    print(f"Benchmarking '{args.benchmark}' with profile '{profile_name}'...")
+    try:
+        if args.benchmark.lower().endswith(".npy") and np.load(args.benchmark, mmap_mode="r").dtype.names:
+            runner.run_recording(args.benchmark, speed=args.speed, max_frames=args.max_frames) # LandmarkRecorder file
+        elif args.benchmark.lower().endswith(".npy"):
+            frame_w, frame_h = (int(v) for v in args.frame_size.lower().split("x"))
+            runner.run_landmarks(args.benchmark, fps=args.fps, frame_size=(frame_w, frame_h), max_frames=args.max_frames)
+        else:
+            runner.run_video(args.benchmark, max_frames=args.max_frames)
+    except (IOError, ValueError) as e: print(f"Error: {e}"); return 2
+    report = runner.report()
+    print_benchmark_report(report)
+    if args.compare_filters:
+        window = profiles[profile_name].get("smooth_window_internal", get_default_settings()["smooth_window_internal"])
+        report["filters"] = compare_smoothing_filters(runner.trace, window)
+        print_filter_comparison(report["filters"])
+    if args.compare_resolutions:
+        if args.benchmark.lower().endswith(".npy"): print("--compare-resolutions needs a video source: landmark files skip inference.")
+        else:
+            report["resolutions"] = compare_inference_resolutions(args.benchmark, profiles[profile_name], max_frames=args.max_frames)
+            print_resolution_comparison(report["resolutions"])
+    if args.json:
+        try:
+            with open(args.json, "w") as file: json.dump(report, file, indent=4)
+            print(f"Report written to {args.json}")
+        except IOError as e: print(f"Error writing report: {e}"); return 2
+    return 0
+
+def _trace_segments(trace):
+    """Splits a runner trace into (timestamps, points) arrays of continuous cursor driving (no gaps or missing targets)."""
+    segments = []; times = []; points = []
+    for timestamp, x, y in list(trace) + [(None, None, None)]:
+        gap = x is None or (times and not 0 < timestamp - times[-1] < CURSOR_GLIDE_MAX_INTERVAL)
+        if gap and len(times) >= 3: segments.append((np.array(times), np.array(points, dtype=np.float64)))
+        if gap: times = []; points = []
+        if x is not None: times.append(timestamp); points.append((x, y))
+    return segments
+
+def _measured_lag_frames(raw, smoothed):
+    """Delay (frames) at which the smoothed series best matches the raw one (least mean squared error)."""
+    best_shift, best_error = 0, np.inf
+    for shift in range(min(FILTER_COMPARE_MAX_LAG_FRAMES, len(raw) - 2) + 1):
+        error = np.mean(np.sum((smoothed[shift:] - raw[:len(raw) - shift]) ** 2, axis=1))
+        if error < best_error: best_shift, best_error = shift, error
+    return best_shift
+
+def _series_jitter_px(series):
+    """Median frame-to-frame change in velocity (second difference) over a list of (n, 2) point arrays."""
+    return float(np.median(np.concatenate([np.hypot(*np.diff(points, n=2, axis=0).T) for points in series])))
+
+def compare_smoothing_filters(trace, window):
+    """Replays the raw (pre-smoothing) cursor targets of a benchmark run through every smoothing filter.
+
+    jitter_px is the median frame-to-frame change in velocity of the output (second difference, so
+    saccades barely count; lower is steadier), lag_ms the delay at which the output best matches the raw targets, us_per_update the
+    filter's own cost. The "raw" row is the unfiltered input for reference.
+    """
+    segments = _trace_segments(trace)
+    if not segments: return {}
+    frame_ms = float(np.median(np.concatenate([np.diff(times) for times, _ in segments]))) * 1000
+    results = {"raw": {"jitter_px": _series_jitter_px([points for _, points in segments]), "lag_ms": 0.0, "us_per_update": 0.0}}
+    for kind in SMOOTHING_FILTERS:
+        outputs = []; elapsed = 0.0; updates = 0; lag_frames = []
+        for times, points in segments:
+            smoothing_filter = create_smoothing_filter(kind, window)
+            start = time.perf_counter()
+            smoothed = np.array([smoothing_filter.update(point, timestamp) for timestamp, point in zip(times, points)])
+            elapsed += time.perf_counter() - start; updates += len(points)
+            outputs.append(smoothed); lag_frames.extend([_measured_lag_frames(points, smoothed)] * len(points))
+        results[kind] = {"jitter_px": _series_jitter_px(outputs), "lag_ms": float(np.mean(lag_frames)) * frame_ms, "us_per_update": elapsed / updates * 1e6}
+    return results
+
+def print_filter_comparison(results):
+    if not results: print("No continuous cursor movement in the source: nothing to compare."); return
+    print(f"{'Filter':<15} {'jitter px':>10} {'lag ms':>8} {'us/update':>10}")
+    for kind, stats in results.items():
+        print(f"{SMOOTHING_FILTERS.get(kind, kind):<15} {stats['jitter_px']:10.2f} {stats['lag_ms']:8.1f} {stats['us_per_update']:10.1f}")
+
+def _gaze_segments(gaze_trace):
+    """Splits a runner gaze trace into (n, 2) arrays of consecutive frames with a valid gaze (at least 3 long)."""
+    segments = []; points = []
+    for point in list(gaze_trace) + [None]:
+        if point is not None: points.append(point); continue
+        if len(points) >= 3: segments.append(np.array(points, dtype=np.float64))
+        points = []
+    return segments
+
+def compare_inference_resolutions(path, settings, max_frames=None):
+    """Runs a video through the headless pipeline once per INFERENCE_RESOLUTIONS width.
+
+    Per width: inference cost (mean/p95 ms), share of frames with a face, gaze jitter_px (as in
+    compare_smoothing_filters, on the unsmoothed gaze point in frame pixels) and deviation_px, the
+    mean distance of the gaze point from the capture-resolution run on the same frames.
+    """
+    results = {}; reference = None
+    for width in sorted(INFERENCE_RESOLUTIONS, key=lambda w: w or float("inf"), reverse=True): # Capture resolution first
+        runner = HeadlessPipelineRunner(dict(settings, inference_width=width))
+        runner.run_video(path, max_frames=max_frames)
+        inference = runner.report()["stages"].get("inference", {})
+        segments = _gaze_segments(runner.gaze_trace)
+        if reference is None: reference = runner.gaze_trace
+        pairs = [(a, b) for a, b in zip(reference, runner.gaze_trace) if a is not None and b is not None]
+        results[width] = {"inference_mean_ms": inference.get("mean_ms", 0.0), "inference_p95_ms": inference.get("p95_ms", 0.0),
+                          "face_ratio": runner.faces / runner.frames if runner.frames else 0.0,
+                          "jitter_px": _series_jitter_px(segments) if segments else float("nan"),
+                          "deviation_px": float(np.mean([np.hypot(a[0] - b[0], a[1] - b[1]) for a, b in pairs])) if pairs else float("nan")}
+    return results
+
+def print_resolution_comparison(results):
+    print(f"{'Inference res':<14} {'mean ms':>8} {'p95 ms':>8} {'face %':>7} {'jitter px':>10} {'dev px':>8}")
+    for width, stats in results.items():
+        print(f"{INFERENCE_RESOLUTIONS.get(width, width):<14} {stats['inference_mean_ms']:8.2f} {stats['inference_p95_ms']:8.2f} {stats['face_ratio'] * 100:7.1f} "
+              f"{stats['jitter_px']:10.2f} {stats['deviation_px']:8.2f}")
+
+def benchmark_cursor_backends(calls=CURSOR_BENCHMARK_CALLS):
+    """Times move_to and position per call for every cursor backend that can be created here.
+
+    Moves the real cursor by one pixel back and forth around its current position (restored
+    afterwards); clicks are not exercised. Returns {backend: {"move_to": stats, "position": stats}}.
+    """
+    results = {}
+    for name, sink_class in CURSOR_SINKS.items():
+        if name == "pyautogui" and import_pyautogui() is None: print("pyautogui: unavailable, skipped"); continue
+        try: sink = sink_class()
+        except Exception as e_sink: print(f"{name}: unavailable ({e_sink}), skipped"); continue
+        try:
+            start_x, start_y = sink.position()
+            timings = {"move_to": np.empty(calls), "position": np.empty(calls)}
+            for i in range(calls):
+                t0 = time.perf_counter(); sink.move_to(start_x + (i & 1), start_y); t1 = time.perf_counter()
+                sink.position(); t2 = time.perf_counter()
+                timings["move_to"][i] = t1 - t0; timings["position"][i] = t2 - t1
+            sink.move_to(start_x, start_y)
+        except Exception as e_run: print(f"{name}: failed ({e_run}), skipped"); continue
+        results[name] = {op: {"mean_us": float(values.mean() * 1e6), "p50_us": float(np.percentile(values, 50) * 1e6),
+                              "p99_us": float(np.percentile(values, 99) * 1e6)} for op, values in timings.items()}
+    return results
+
+def print_cursor_benchmark(results):
+    print(f"{'Backend':<10} {'Operation':<9} {'mean':>9} {'p50':>9} {'p99':>9}  (us/call)")
+    for name, ops in results.items():
+        for op, stats in ops.items():
+            print(f"{name:<10} {op:<9} {stats['mean_us']:9.1f} {stats['p50_us']:9.1f} {stats['p99_us']:9.1f}")
+
+def benchmark_target_index(count=STICK_TARGET_BENCHMARK_COUNT, queries=STICK_TARGET_BENCHMARK_QUERIES, churn=0.05, radius=100):
+    """Times ClickTargetIndex refreshes and nearest queries on SyntheticTargetProvider targets against a linear scan.
+
+    Every query result is checked against the linear scan; returns a dict of timings and the mismatch count.
+    """
+    screen_w, screen_h = 1920, 1080
+    provider = SyntheticTargetProvider(count, (screen_w, screen_h), churn=churn)
+    index = ClickTargetIndex()
+    t0 = time.perf_counter(); index.refresh(provider.targets(screen_w, screen_h)); build_ms = (time.perf_counter() - t0) * 1000
+    refresh_times, changes = [], []
+    for _ in range(20):
+        targets = provider.targets(screen_w, screen_h)
+        t0 = time.perf_counter(); changes.append(index.refresh(targets)); refresh_times.append(time.perf_counter() - t0)
+    centers = [(left + (right - left) // 2, top + (bottom - top) // 2) for left, top, right, bottom in targets.values()]
+    points = provider.rng.uniform((0, 0), (screen_w, screen_h), size=(queries, 2))
+    grid_times, linear_times = np.empty(queries), np.empty(queries); mismatches = 0
+    for i, (x, y) in enumerate(points):
+        t0 = time.perf_counter(); found = index.nearest((x, y), radius); t1 = time.perf_counter()
+        in_range = [((cx - x) ** 2 + (cy - y) ** 2, (cx, cy)) for cx, cy in centers if (cx - x) ** 2 + (cy - y) ** 2 <= radius * radius]
+        expected = min(in_range)[0] if in_range else None
+        t2 = time.perf_counter()
+        grid_times[i] = t1 - t0; linear_times[i] = t2 - t1
+        got = None if found is None else float((found[0] - x) ** 2 + (found[1] - y) ** 2)
+        if (got is None) != (expected is None) or (got is not None and abs(got - expected) > 1e-6): mismatches += 1
+    # Sticking checks against a slow provider: enumerating inline (as before) vs. reading the worker's snapshot.
+    # Each path gets its own provider (same seed): targets() mutates the provider and its RNG without a lock
+    slow_provider = SyntheticTargetProvider(count, (screen_w, screen_h), churn=churn, delay=STICK_TARGET_BENCHMARK_DELAY)
+    worker_provider = SyntheticTargetProvider(count, (screen_w, screen_h), churn=churn, delay=STICK_TARGET_BENCHMARK_DELAY)
+    inline_index = ClickTargetIndex(); inline_refresh_time = None; inline_times, worker_times = [], []
+    worker = ClickTargetWorker(worker_provider, (screen_w, screen_h), interval=STICK_TARGET_BENCHMARK_DELAY); worker.start()
+    try:
+        end_time = time.perf_counter() + 4 * STICK_TARGET_BENCHMARK_DELAY
+        while time.perf_counter() < end_time:
+            x, y = points[len(inline_times) % queries]
+            t0 = time.perf_counter()
+            if inline_refresh_time is None or t0 - inline_refresh_time >= STICK_TARGET_BENCHMARK_DELAY:
+                inline_refresh_time = t0; inline_index.refresh(slow_provider.targets(screen_w, screen_h))
+            inline_index.nearest((x, y), radius); t1 = time.perf_counter()
+            snapshot = worker.snapshot
+            if snapshot is not None: snapshot.index.nearest((x, y), radius)
+            t2 = time.perf_counter()
+            inline_times.append(t1 - t0); worker_times.append(t2 - t1)
+            time.sleep(0.01) # Roughly a sticking check per frame
+    finally: worker.stop()
+    return {"targets": len(index), "build_ms": build_ms, "refresh_ms": float(np.mean(refresh_times) * 1000), "changes_per_refresh": float(np.mean(changes)),
+            "grid_query_us": float(grid_times.mean() * 1e6), "linear_query_us": float(linear_times.mean() * 1e6), "mismatches": mismatches,
+            "inline_check_max_ms": float(np.max(inline_times) * 1000), "worker_check_max_ms": float(np.max(worker_times) * 1000)}
+
+def print_target_benchmark(results):
+    print(f"Targets: {results['targets']} | build {results['build_ms']:.2f} ms | refresh {results['refresh_ms']:.2f} ms ({results['changes_per_refresh']:.0f} changes)")
+    print(f"Nearest query: grid {results['grid_query_us']:.1f} us | linear scan {results['linear_query_us']:.1f} us | mismatches: {results['mismatches']}")
+    print(f"Worst sticking check with a {STICK_TARGET_BENCHMARK_DELAY * 1000:.0f} ms enumeration: inline {results['inline_check_max_ms']:.2f} ms | background worker {results['worker_check_max_ms']:.2f} ms")
+# --- End Headless Pipeline Benchmark ---
+
+def print_startup_profile(profiler):
+    """Prints the stages recorded by a StartupProfiler in the order they started (start times are from module load)."""
+    print(f"{'Stage':<26}{'Thread':<22}{'Start ms':>10}{'Took ms':>10}")
+    for name, thread, start, end in sorted(profiler.stages, key=lambda stage: stage[2]):
+        print(f"{name:<26}{thread:<22}{start * 1000:>10.1f}{(end - start) * 1000:>10.1f}")
+
 # --- Main Execution ---
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="CursorViaCam: control the cursor with your eyes.")
+    parser.add_argument("--benchmark", metavar="SOURCE", help="Run the tracking pipeline headless on a video file, landmark recording or .npy landmark dump and exit")
+    parser.add_argument("--speed", type=float, default=None, help="Replay a landmark recording at this multiple of real time (default: as fast as possible)")
+    parser.add_argument("--profile", help="Profile whose settings the benchmark uses (default: active profile)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop the benchmark after this many frames")
+    parser.add_argument("--fps", type=float, default=BENCHMARK_DEFAULT_FPS, help="Frame rate of a landmark dump")
+    parser.add_argument("--frame-size", default="%dx%d" % BENCHMARK_DEFAULT_FRAME_SIZE, help="Frame size (WxH) a landmark dump is mapped against")
+    parser.add_argument("--json", metavar="FILE", help="Also write the benchmark report to FILE")
+    parser.add_argument("--compare-filters", action="store_true", help="With --benchmark: also compare jitter and lag of every smoothing filter on the run's cursor trace")
+    parser.add_argument("--compare-resolutions", action="store_true",
+                        help="With --benchmark on a video: rerun it at every inference resolution and compare inference cost and gaze jitter")
+    parser.add_argument("--cursor-backend", choices=["auto"] + [name for name in CURSOR_SINKS if name != "recording"], default=CURSOR_BACKEND,
+                        help="How the cursor is moved and clicked (default: %(default)s)")
+    parser.add_argument("--cursor-benchmark", type=int, nargs="?", const=CURSOR_BENCHMARK_CALLS, metavar="CALLS",
+                        help="Time per-call cost of every available cursor backend and exit (moves the cursor by one pixel)")
+    parser.add_argument("--target-benchmark", type=int, nargs="?", const=STICK_TARGET_BENCHMARK_COUNT, metavar="TARGETS",
+                        help="Time the button sticking target index on synthetic targets against a linear scan and exit")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Start normally, print how long each startup stage took once the camera and face model are ready, and exit")
+    return parser.parse_known_args(argv) # Unknown arguments are left for Qt
+
+STARTUP_PROFILER.add("module body", _BASE_IMPORTS_END, time.perf_counter())
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv[1:])
+    if args.benchmark: sys.exit(run_benchmark_cli(args))
+    if args.cursor_benchmark: print_cursor_benchmark(benchmark_cursor_backends(args.cursor_benchmark)); sys.exit(0)
+    if args.target_benchmark: print_target_benchmark(benchmark_target_index(args.target_benchmark)); sys.exit(0)
+    with STARTUP_PROFILER.stage("QApplication"): app = QApplication(sys.argv[:1] + qt_args)
     # Set App Style (Optional - for better consistency across platforms)
     # app.setStyle('Fusion')
-    window = CursorViaCamApp()
-    window.show()
+    ensure_profiles_loaded()
+    with STARTUP_PROFILER.stage("build window"): window = CursorViaCamApp(cursor_backend=args.cursor_backend)
+    window.show(); STARTUP_PROFILER.mark("window shown")
+    QTimer.singleShot(0, lambda: STARTUP_PROFILER.mark("first event loop pass"))
+    if args.startup_profile:
+        window.startup_finished.connect(lambda: (print_startup_profile(STARTUP_PROFILER), window.close()))
     sys.exit(app.exec())
 # <<< End of Python Code >>>
\ No newline at end of file